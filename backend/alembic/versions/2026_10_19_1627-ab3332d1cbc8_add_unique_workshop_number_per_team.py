@@ -0,0 +1,67 @@
+"""Add unique workshop number per team
+
+Revision ID: ab3332d1cbc8
+Revises: 4f94edb9a644
+Create Date: 2026-10-19 16:27:58.468843
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ab3332d1cbc8"
+down_revision: Union[str, None] = "4f94edb9a644"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_duplicates() -> None:
+    """Fail with the duplicate workshop numbers, if any, which have to be
+    merged or renumbered by hand before the constraint can be created."""
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT team_id, workshop_number, array_agg(id ORDER BY id) "
+            "FROM workshops GROUP BY team_id, workshop_number "
+            "HAVING count(*) > 1 ORDER BY team_id, workshop_number"
+        )
+    )
+    lines = [
+        f"team {team_id}, workshop {number}: ids {ids}"
+        for team_id, number, ids in duplicates
+    ]
+    if lines:
+        raise RuntimeError(
+            "Duplicate workshop numbers per team, merge or renumber them "
+            "before upgrading:\n" + "\n".join(lines)
+        )
+
+
+def upgrade() -> None:
+    # the constraint was declared in the schema but never created
+    _check_duplicates()
+    op.create_unique_constraint(
+        "unique_workshop_number_per_team",
+        "workshops",
+        ["team_id", "workshop_number"],
+    )
+    # the index of the constraint replaces the plain index
+    op.drop_index(
+        "ix_workshops_team_id_workshop_number", table_name="workshops"
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_workshops_team_id_workshop_number",
+        "workshops",
+        ["team_id", "workshop_number"],
+        unique=False,
+    )
+    op.drop_constraint(
+        "unique_workshop_number_per_team", "workshops", type_="unique"
+    )
@@ -0,0 +1,73 @@
+"""Add unique team and child names
+
+Revision ID: 829766ab1045
+Revises: ab3332d1cbc8
+Create Date: 2026-10-19 16:30:29.097675
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "829766ab1045"
+down_revision: Union[str, None] = "ab3332d1cbc8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _check_duplicates() -> None:
+    """Fail with the duplicate team names and child names per team, if any,
+    which have to be renamed or merged by hand before the constraints can
+    be created."""
+    connection = op.get_bind()
+    teams = connection.execute(
+        sa.text(
+            "SELECT name, array_agg(id ORDER BY id) FROM teams "
+            "GROUP BY name HAVING count(*) > 1 ORDER BY name"
+        )
+    )
+    children = connection.execute(
+        sa.text(
+            "SELECT team_id, first_name, last_name, array_agg(id ORDER BY id) "
+            "FROM children GROUP BY team_id, first_name, last_name "
+            "HAVING count(*) > 1 ORDER BY team_id, first_name, last_name"
+        )
+    )
+    lines = [f"team {name!r}: ids {ids}" for name, ids in teams] + [
+        f"child {first_name!r} {last_name!r} in team {team_id}: ids {ids}"
+        for team_id, first_name, last_name, ids in children
+    ]
+    if lines:
+        raise RuntimeError(
+            "Duplicate names, rename or merge them before upgrading:\n"
+            + "\n".join(lines)
+        )
+
+
+def upgrade() -> None:
+    # uniqueness used to be checked by the services before inserting,
+    # so duplicates may have been created by concurrent requests
+    _check_duplicates()
+    op.create_unique_constraint("unique_team_name", "teams", ["name"])
+    op.create_unique_constraint(
+        "unique_child_name_per_team",
+        "children",
+        ["team_id", "first_name", "last_name"],
+    )
+    # the index of the constraint replaces the plain index
+    op.drop_index("ix_children_team_id", table_name="children")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_children_team_id", "children", ["team_id"], unique=False
+    )
+    op.drop_constraint(
+        "unique_child_name_per_team", "children", type_="unique"
+    )
+    op.drop_constraint("unique_team_name", "teams", type_="unique")
@@ -0,0 +1,66 @@
+"""Add sync columns and tombstones
+
+Revision ID: 231310ccc951
+Revises: 829766ab1045
+Create Date: 2026-10-19 16:41:41.131613
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "231310ccc951"
+down_revision: Union[str, None] = "829766ab1045"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column(
+            "resource_type", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("resource_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "resource_path", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tombstones_deleted_at", "tombstones", ["deleted_at"], unique=False
+    )
+    # existing records count as updated now, the application
+    # sets the timestamp of new records
+    for table in ["attendances", "workshops"]:
+        op.add_column(
+            table,
+            sa.Column(
+                "last_updated_at",
+                sa.DateTime(),
+                nullable=False,
+                server_default=sa.func.now(),
+            ),
+        )
+        op.alter_column(table, "last_updated_at", server_default=None)
+    op.create_index(
+        "ix_attendances_last_updated_at",
+        "attendances",
+        ["last_updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attendances_last_updated_at", table_name="attendances")
+    op.drop_column("workshops", "last_updated_at")
+    op.drop_column("attendances", "last_updated_at")
+    op.drop_index("ix_tombstones_deleted_at", table_name="tombstones")
+    op.drop_table("tombstones")
@@ -0,0 +1,69 @@
+"""Add materialized stats views
+
+Revision ID: 9b979b527544
+Revises: 231310ccc951
+Create Date: 2026-10-19 17:11:57.533080
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b979b527544"
+down_revision: Union[str, None] = "231310ccc951"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# copies of the queries in app/core/database/views.py at this revision
+TEAM_STATS = """
+SELECT
+    teams.id AS team_id,
+    teams.implementing_partner_id,
+    teams.community_id,
+    teams.resource_path,
+    teams.is_active,
+    (
+        SELECT COUNT(*) FROM children
+        WHERE children.team_id = teams.id AND children.is_active
+    ) AS children,
+    (
+        SELECT COALESCE(MAX(workshops.workshop_number), 0) FROM workshops
+        WHERE workshops.team_id = teams.id
+    ) AS progress
+FROM teams
+"""
+
+WORKSHOP_STATS = """
+SELECT
+    workshops.team_id,
+    teams.resource_path,
+    workshops.workshop_number,
+    COUNT(attendances.id) AS attendances,
+    SUM(CASE WHEN attendances.attendance = 'present' THEN 1 ELSE 0 END) AS present
+FROM workshops
+JOIN teams ON teams.id = workshops.team_id
+LEFT JOIN attendances ON attendances.workshop_id = workshops.id
+GROUP BY workshops.team_id, teams.resource_path, workshops.workshop_number
+"""
+
+
+def upgrade() -> None:
+    op.execute(f"CREATE MATERIALIZED VIEW team_stats AS {TEAM_STATS}")
+    op.execute(f"CREATE MATERIALIZED VIEW workshop_stats AS {WORKSHOP_STATS}")
+    # concurrent refreshes, which do not block reads, need a unique index
+    op.create_index("ix_team_stats_unique", "team_stats", ["team_id"], unique=True)
+    op.create_index(
+        "ix_workshop_stats_unique",
+        "workshop_stats",
+        ["team_id", "workshop_number"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW workshop_stats")
+    op.execute("DROP MATERIALIZED VIEW team_stats")
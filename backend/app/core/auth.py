@@ -1,8 +1,6 @@
 import logging
 from typing import Any
 
-import httpx
-import jwt
 from core.context import CurrentUser
 from core.database.session import SessionDependency
 from core.settings import SettingsDependency
@@ -16,6 +14,9 @@ class BearerTokenHandler(HTTPBearer):
     """FastAPI dependency for JWT token. Requirement of this token
     is enabled/disabled in the backend via environment variable `FEATURE_AUTH0`.
 
+    PyJWT and httpx are imported on first use, which keeps them and
+    the cryptography backend out of the startup time of the API.
+
     Headers to be sent in the request:
     ```
     headers = {
@@ -49,6 +50,9 @@ class BearerTokenHandler(HTTPBearer):
         """Verify the bearer token and optionally the scopes,
         and return the decoded token."""
         self.settings = settings
+        # sub-requests of a batch request share the user of the batch
+        if hasattr(request.state, "current_user"):
+            return request.state.current_user
         if not self.settings.FEATURE_AUTH0:
             return
 
@@ -118,6 +122,8 @@ class BearerTokenHandler(HTTPBearer):
     ) -> Any | None:
         """Verify JWT token with public key and audience.
         Returns verified token content."""
+        import jwt
+
         try:
             return jwt.decode(
                 jwt=token,
@@ -137,6 +143,8 @@ class BearerTokenHandler(HTTPBearer):
     def _get_unverified_headers(self, token: str) -> dict[str, str] | None:
         """Get unverified token headers containing type,
         algorithm and key identifier."""
+        import jwt
+
         try:
             return jwt.get_unverified_header(token)
         except jwt.exceptions.DecodeError:
@@ -146,6 +154,9 @@ class BearerTokenHandler(HTTPBearer):
         self, token: str, kid: str, pub_key_url: str
     ) -> str | None:
         """Get public key from Auth0 server with which token was signed."""
+        import httpx
+        import jwt
+
         pub_key = None
         async with httpx.AsyncClient() as client:
             response = await client.get(pub_key_url)
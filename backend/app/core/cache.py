@@ -0,0 +1,126 @@
+"""In-process cache for rendered responses of read endpoints."""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable
+from enum import Enum
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings
+
+
+class CacheTag(str, Enum):
+    """Tags of cached responses by the resources they contain."""
+
+    communities: str = "communities"
+    teams: str = "teams"
+
+
+def user_tag(user_id: str) -> str:
+    """Tag of all cached responses of a user."""
+    return f"user:{user_id}"
+
+
+class ResponseCache(ABC):
+    """Interface of a response cache, implement this to plug in
+    another backend in `get_response_cache`.
+
+    Entries are tagged, e.g. with the resources they contain and the
+    user they belong to, so that writes can invalidate all entries
+    of a resource or a user at once."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Get a cached response body, or None if not cached."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, tags: Iterable[str]) -> None:
+        """Cache a response body with tags."""
+
+    @abstractmethod
+    def invalidate(self, *tags: str) -> None:
+        """Remove all entries with any of the tags."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries."""
+
+
+class LRUResponseCache(ResponseCache):
+    """Thread safe in-memory cache of at most `max_size` entries, evicting
+    the least recently used entry first. Entries expire after `ttl` seconds,
+    which bounds how stale an entry can be on workers that did not see
+    the write that invalidated it."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, bytes, frozenset[str]]] = (
+            OrderedDict()
+        )
+        self._keys_by_tag: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, tags: Iterable[str]) -> None:
+        if self.max_size <= 0:
+            return
+        tags = frozenset(tags)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its tags, the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._keys_by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+
+@lru_cache
+def _get_response_cache(max_size: int, ttl: float) -> ResponseCache:
+    """Get a cached response cache per size and TTL."""
+    return LRUResponseCache(max_size=max_size, ttl=ttl)
+
+
+def get_response_cache(settings: BaseSettings) -> ResponseCache:
+    """Get the response cache singleton for the given settings."""
+    return _get_response_cache(
+        max_size=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TTL
+    )
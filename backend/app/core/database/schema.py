@@ -1,7 +1,13 @@
-"""Database schema for all tables in the database."""
+"""Database schema for all tables in the database.
+
+Deletes of related records are left to the ON DELETE clauses of the foreign
+keys (`passive_deletes`), instead of the ORM loading and deleting each related
+record. Only related records that happen to be loaded are deleted by the ORM."""
+
+from datetime import datetime
 
 from models._metadata import _MetadataPropertiesOut
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.schema import Computed
 from sqlmodel import Field, Relationship, SQLModel, UniqueConstraint
 
@@ -11,15 +17,19 @@ class ImplementingPartner(SQLModel, _MetadataPropertiesOut, table=True):
     that implements the Little Lions program in a community."""
 
     __tablename__ = "implementing_partners"
+    # fetch the generated resource path with INSERT/UPDATE .. RETURNING
+    __mapper_args__ = {"eager_defaults": True}
     id: int = Field(default=None, primary_key=True)
     name: str = Field(sa_column=Column("name", String, unique=True))
 
+    # the foreign key of communities restricts deletes, so communities
+    # have to be deleted explicitly before their implementing partner
     communities: list["Community"] = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"},
+        sa_relationship_kwargs={"cascade": "delete", "passive_deletes": True},
         back_populates="implementing_partner",
     )
     teams: list["Team"] = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"},
+        sa_relationship_kwargs={"cascade": "delete", "passive_deletes": True},
         back_populates="implementing_partner",
     )
 
@@ -44,16 +54,21 @@ class Community(SQLModel, _MetadataPropertiesOut, table=True):
     """Schema for community in database."""
 
     __tablename__ = "communities"
+    # fetch the generated resource path with INSERT/UPDATE .. RETURNING
+    __mapper_args__ = {"eager_defaults": True}
     id: int = Field(default=None, primary_key=True)
 
     name: str = Field(sa_column=Column("name", String, unique=True))
     teams: list["Team"] = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"}, back_populates="community"
+        sa_relationship_kwargs={"cascade": "delete", "passive_deletes": True},
+        back_populates="community",
     )
 
     implementing_partner_id: int = Field(
         sa_column=Column(
-            Integer, ForeignKey("implementing_partners.id", ondelete="RESTRICT")
+            Integer,
+            ForeignKey("implementing_partners.id", ondelete="RESTRICT"),
+            index=True,
         )
     )
     implementing_partner: "ImplementingPartner" = Relationship(
@@ -87,26 +102,35 @@ class Team(SQLModel, _MetadataPropertiesOut, table=True):
     that the team follows are linked to the team as well."""
 
     __tablename__ = "teams"
+    __table_args__ = (UniqueConstraint("name", name="unique_team_name"),)
+    # fetch the generated resource path with INSERT/UPDATE .. RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     id: int = Field(default=None, primary_key=True)
     name: str = Field(description="Name of the team")
 
     implementing_partner_id: int = Field(
         sa_column=Column(
-            Integer, ForeignKey("implementing_partners.id", ondelete="CASCADE")
+            Integer,
+            ForeignKey("implementing_partners.id", ondelete="CASCADE"),
+            index=True,
         )
     )
     implementing_partner: "ImplementingPartner" = Relationship(back_populates="teams")
 
     community_id: int = Field(
-        sa_column=Column(Integer, ForeignKey("communities.id", ondelete="CASCADE"))
+        sa_column=Column(
+            Integer, ForeignKey("communities.id", ondelete="CASCADE"), index=True
+        )
     )
     community: "Community" = Relationship(back_populates="teams")
     children: list["Child"] | None = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"}, back_populates="team"
+        sa_relationship_kwargs={"cascade": "delete", "passive_deletes": True},
+        back_populates="team",
     )
     workshops: list["Workshop"] | None = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"}, back_populates="team"
+        sa_relationship_kwargs={"cascade": "delete", "passive_deletes": True},
+        back_populates="team",
     )
     # resource path cannot actually be null but otherwise
     # creation of the object fails when we do not pass a value
@@ -137,6 +161,12 @@ class Child(SQLModel, _MetadataPropertiesOut, table=True):
     """Schema for child model in database."""
 
     __tablename__ = "children"
+    # also serves as index for looking up children per team
+    __table_args__ = (
+        UniqueConstraint(
+            "team_id", "first_name", "last_name", name="unique_child_name_per_team"
+        ),
+    )
     id: int = Field(default=None, primary_key=True)
     first_name: str
     last_name: str
@@ -154,7 +184,8 @@ class Child(SQLModel, _MetadataPropertiesOut, table=True):
         sa_column=Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"))
     )
     attendances: list["Attendance"] = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"}, back_populates="child"
+        sa_relationship_kwargs={"cascade": "delete", "passive_deletes": True},
+        back_populates="child",
     )
 
 
@@ -162,16 +193,24 @@ class Attendance(SQLModel, table=True):
     """Data model for attendance of a child in a workshop."""
 
     __tablename__ = "attendances"
+    # attendance is aggregated per workshop
+    __table_args__ = (
+        Index("ix_attendances_workshop_id_attendance", "workshop_id", "attendance"),
+    )
 
     id: int = Field(default=None, primary_key=True)
     attendance: str
 
     child_id: int = Field(
-        sa_column=Column(Integer, ForeignKey("children.id", ondelete="CASCADE")),
+        sa_column=Column(
+            Integer, ForeignKey("children.id", ondelete="CASCADE"), index=True
+        ),
     )
     workshop_id: int = Field(
         sa_column=Column(Integer, ForeignKey("workshops.id", ondelete="CASCADE")),
     )
+    # attendance is synced incrementally by devices of coaches
+    last_updated_at: datetime = Field(default_factory=datetime.now, index=True)
 
     child: "Child" = Relationship(back_populates="attendances")
     workshop: "Workshop" = Relationship(back_populates="attendance")
@@ -182,7 +221,8 @@ class Workshop(SQLModel, table=True):
     on a given date in a given community."""
 
     __tablename__ = "workshops"
-    __table__args__ = (
+    # also serves as index for looking up workshops per team and by number
+    __table_args__ = (
         UniqueConstraint(
             "team_id", "workshop_number", name="unique_workshop_number_per_team"
         ),
@@ -197,12 +237,13 @@ class Workshop(SQLModel, table=True):
     team_id: int = Field(
         sa_column=Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"))
     )
+    # workshops are synced incrementally by devices of coaches
+    last_updated_at: datetime = Field(default_factory=datetime.now)
 
-    team: "Team" = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"}, back_populates="workshops"
-    )
+    team: "Team" = Relationship(back_populates="workshops")
     attendance: list["Attendance"] = Relationship(
-        sa_relationship_kwargs={"cascade": "delete"}, back_populates="workshop"
+        sa_relationship_kwargs={"cascade": "delete", "passive_deletes": True},
+        back_populates="workshop",
     )
 
 
@@ -237,7 +278,70 @@ class Role(SQLModel, table=True):
 
     __tablename__ = "roles"
     id: int = Field(default=None, primary_key=True)
-    user_id: str = Field(description="Auth0 user ID.")
+    user_id: str = Field(description="Auth0 user ID.", index=True)
     role: str = Field(description="Role of the user")
     level: str = Field(description="The level at which the role is assigned.")
     resource_path: str = Field(description="Path of resource")
+
+
+class Tombstone(SQLModel, table=True):
+    """Data model for deleted teams and children, so that devices that
+    sync incrementally can remove their copy. A deleted team implies that its
+    children, workshops and attendances are deleted, a deleted child implies
+    that its attendances are deleted."""
+
+    __tablename__ = "tombstones"
+    id: int = Field(default=None, primary_key=True)
+    resource_type: str = Field(description="Type of the deleted resource")
+    resource_id: int = Field(description="ID of the deleted resource")
+    # path of the team of the resource, to scope tombstones by role
+    resource_path: str = Field(description="Path of the team of the resource")
+    deleted_at: datetime = Field(default_factory=datetime.now, index=True)
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Data model for the responses to write requests with an `Idempotency-Key`
+    header, so that a client that retries a request, e.g. after a timeout,
+    gets the response of the original request instead of a conflict."""
+
+    __tablename__ = "idempotency_keys"
+    # keys are chosen by clients, so they are only unique per user
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="unique_idempotency_key_per_user"),
+    )
+    id: int = Field(default=None, primary_key=True)
+    user_id: str = Field(description="Auth0 user ID.")
+    key: str = Field(description="Value of the Idempotency-Key header")
+    request_hash: str = Field(description="Hash of the method, path and body")
+    # the key is claimed with an empty response in the transaction of the
+    # request, the response is recorded once it is known
+    status_code: int | None = Field(
+        default=None, description="Status code of the response, if known"
+    )
+    response: str | None = Field(default=None, description="Body of the response")
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+
+
+class RecentWrite(SQLModel, table=True):
+    """Data model for the last write of every user, so that their reads go
+    to the primary database until the read replica has caught up with it,
+    see core/database/session.py. Rows may be deleted once they are older
+    than the `READ_YOUR_WRITES_SECONDS`."""
+
+    __tablename__ = "recent_writes"
+    user_id: str = Field(primary_key=True, description="Auth0 user ID.")
+    written_at: float = Field(
+        index=True, description="Unix time of the last committed write"
+    )
+
+
+class RateLimit(SQLModel, table=True):
+    """Data model for the token buckets of the rate limit, when the workers
+    share them, see core/ratelimit.py. A bucket that is full is the same as
+    a missing one, so buckets may be deleted once they are full."""
+
+    __tablename__ = "rate_limits"
+    key: str = Field(primary_key=True, description="User and route of the bucket")
+    full_at: float = Field(
+        index=True, description="Unix time at which the bucket is full again"
+    )
@@ -1,32 +1,178 @@
+import base64
+import json
+import time
 from functools import lru_cache
 from typing import Annotated
 
+from core.database import schema
+from core.database.views import create_views
 from core.settings import get_settings
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine, make_url
 from sqlmodel import Session, SQLModel, create_engine
 
+# requests with these methods only read, so they may be served by the replica
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _get_user_id(request: Request) -> str:
+    """ID of the user of a request, read from the claims of the bearer token
+    without verifying it, since the session and thereby the verified user
+    are not known yet. Only used to pick a database, never to grant access."""
+    token = request.headers.get("authorization", "").removeprefix("Bearer ")
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * -len(payload)))
+        return str(claims.get("sub", ""))
+    except (IndexError, ValueError, AttributeError):
+        return ""
+
+
+def _wrote_recently(user_id: str, window: float) -> bool:
+    """Whether a user committed a write within the last `window` seconds,
+    according to the `recent_writes` table of the primary database. The
+    table is shared by all workers, and keyed by the user rather than the
+    token, so that it survives a token refresh."""
+    table = schema.RecentWrite.__table__
+    with get_engine().connect() as connection:
+        written_at = connection.execute(
+            select(table.c.written_at).where(table.c.user_id == user_id)
+        ).scalar()
+    return written_at is not None and time.time() - written_at < window
+
+
+def _record_write(user_id: str) -> None:
+    """Record that a user committed a write just now, see `_wrote_recently`."""
+    engine = get_engine()
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    table = schema.RecentWrite.__table__
+    now = time.time()
+    statement = (
+        dialect.insert(table)
+        .values(user_id=user_id, written_at=now)
+        .on_conflict_do_update(
+            index_elements=[table.c.user_id], set_={"written_at": now}
+        )
+    )
+    with engine.begin() as connection:
+        connection.execute(statement)
+
+
+def use_primary(request: Request) -> None:
+    """FastAPI dependency that sends the reads of a route to the primary
+    database, for reads that may not miss a write of any user, such as a
+    sync whose cursor only overlaps with the previous sync for a while.
+    Add it to the `dependencies` of the route, which run before the session
+    of the route is opened."""
+    request.state.use_primary = True
+
 
 @lru_cache
-def get_engine():
-    """Get a cached database engine."""
+def _create_engine(url: str, pool_size: int, max_overflow: int) -> Engine:
+    """Get a cached database engine per URL and pool size."""
+    if make_url(url).get_backend_name() == "sqlite":
+        # the pools of SQLite do not overflow
+        return create_engine(url)
+    return create_engine(url, pool_size=pool_size, max_overflow=max_overflow)
+
+
+def get_engine() -> Engine:
+    """Get a cached engine of the primary database."""
     settings = get_settings()
-    return create_engine(settings.POSTGRES_DATABASE_URL)
+    return _create_engine(
+        settings.POSTGRES_DATABASE_URL,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    )
+
+
+def get_read_engine() -> Engine:
+    """Get a cached engine of the read replica, or of
+    the primary database if no replica is configured."""
+    settings = get_settings()
+    return _create_engine(
+        settings.POSTGRES_READ_REPLICA_URL or settings.POSTGRES_DATABASE_URL,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    )
 
 
 def init_db():
     """Setup DB and add super users to it."""
     engine = get_engine()
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        create_views(connection)
+
+
+def _set_read_only(statement_timeout: float):
+    """Listener that makes every transaction of a session read only, with
+    a statement timeout in seconds (0 disables it). Postgres skips some
+    bookkeeping for read only transactions, and cancels statements that
+    run too long instead of letting them hold on to a connection. The
+    settings are local to the transaction, so they do not leak into
+    other sessions through the connection pool."""
+
+    def after_begin(session: Session, transaction, connection: Connection):
+        if connection.dialect.name != "postgresql" or transaction.nested:
+            return
+        statement = "SET TRANSACTION READ ONLY"
+        if statement_timeout:
+            timeout_ms = int(statement_timeout * 1000)
+            statement += f"; SET LOCAL statement_timeout = {timeout_ms}"
+        connection.exec_driver_sql(statement)
 
+    return after_begin
 
-def get_session() -> Session:
+
+def get_session(request: Request) -> Session:
     """Get a database session.
 
+    Reads are served by the read replica, unless the user committed a write
+    within the last `READ_YOUR_WRITES_SECONDS`, in which case the replica may
+    not have the write yet, or the route depends on `use_primary`. Writes
+    and their reads go to the primary database. Reads run in read only
+    transactions with the `READ_STATEMENT_TIMEOUT`. Sub-requests of a batch
+    request share the session of the batch, which is passed on in the
+    request state.
+
     Args:
-        engine: SQLModel engine."""
-    engine = get_engine()
-    with Session(bind=engine, autocommit=False, autoflush=False) as session:
-        yield session
+        request: Incoming request."""
+    shared_session = getattr(request.state, "session", None)
+    if shared_session is not None:
+        yield shared_session
+        return
+
+    settings = get_settings()
+    is_read = request.method in READ_METHODS
+    # without a replica every request uses the primary, so
+    # there is no need to keep track of recent writes
+    has_replica = settings.POSTGRES_READ_REPLICA_URL is not None
+    user_id = _get_user_id(request)
+    use_replica = is_read and not getattr(request.state, "use_primary", False)
+    if use_replica and has_replica:
+        use_replica = not _wrote_recently(user_id, settings.READ_YOUR_WRITES_SECONDS)
+    engine = get_read_engine() if use_replica else get_engine()
+
+    committed = []
+    try:
+        with Session(bind=engine, autocommit=False, autoflush=False) as session:
+            if is_read:
+                event.listen(
+                    session,
+                    "after_begin",
+                    _set_read_only(settings.READ_STATEMENT_TIMEOUT),
+                )
+            else:
+                event.listen(session, "after_commit", committed.append)
+            yield session
+    finally:
+        # once the session is closed, so that the request does
+        # not hold two connections of the pool at once
+        if committed and has_replica:
+            _record_write(user_id)
 
 
 SessionDependency = Annotated[Session, Depends(get_session)]
@@ -0,0 +1,106 @@
+"""Reporting views that aggregate teams, children, workshops and attendances
+per team, so that statistics over many teams do not load every team.
+
+On Postgres these are materialized views, created by a migration and
+refreshed by the `refresh_stats` job, so statistics are as old as the last
+refresh. On other databases, i.e. SQLite in tests and development, they
+are plain views that `create_views` creates next to the tables.
+
+The aggregates are per team rather than per community or implementing
+partner, so that they can be scoped to the teams a user has access to."""
+
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+# the migrations hold their own copy of these queries, change both
+TEAM_STATS = """
+SELECT
+    teams.id AS team_id,
+    teams.implementing_partner_id,
+    teams.community_id,
+    teams.resource_path,
+    teams.is_active,
+    (
+        SELECT COUNT(*) FROM children
+        WHERE children.team_id = teams.id AND children.is_active
+    ) AS children,
+    (
+        SELECT COALESCE(MAX(workshops.workshop_number), 0) FROM workshops
+        WHERE workshops.team_id = teams.id
+    ) AS progress
+FROM teams
+"""
+
+WORKSHOP_STATS = """
+SELECT
+    workshops.team_id,
+    teams.resource_path,
+    workshops.workshop_number,
+    COUNT(attendances.id) AS attendances,
+    SUM(CASE WHEN attendances.attendance = 'present' THEN 1 ELSE 0 END) AS present
+FROM workshops
+JOIN teams ON teams.id = workshops.team_id
+LEFT JOIN attendances ON attendances.workshop_id = workshops.id
+GROUP BY workshops.team_id, teams.resource_path, workshops.workshop_number
+"""
+
+# name -> (query, columns of the unique index that concurrent refreshes need)
+VIEWS = {
+    "team_stats": (TEAM_STATS, ["team_id"]),
+    "workshop_stats": (WORKSHOP_STATS, ["team_id", "workshop_number"]),
+}
+
+# the views are not part of the metadata of the tables, so that
+# `create_all` and Alembic do not treat them as tables
+metadata = MetaData()
+
+team_stats = Table(
+    "team_stats",
+    metadata,
+    Column("team_id", Integer),
+    Column("implementing_partner_id", Integer),
+    Column("community_id", Integer),
+    Column("resource_path", String),
+    Column("is_active", Boolean),
+    Column("children", Integer),
+    Column("progress", Integer),
+)
+
+workshop_stats = Table(
+    "workshop_stats",
+    metadata,
+    Column("team_id", Integer),
+    Column("resource_path", String),
+    Column("workshop_number", Integer),
+    Column("attendances", Integer),
+    Column("present", Integer),
+)
+
+
+def _is_materialized(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+
+def create_views(connection: Connection) -> None:
+    """Create the views that do not exist yet."""
+    kind = "MATERIALIZED VIEW" if _is_materialized(connection) else "VIEW"
+    for name, (query, unique_columns) in VIEWS.items():
+        connection.exec_driver_sql(f"CREATE {kind} IF NOT EXISTS {name} AS {query}")
+        if _is_materialized(connection):
+            connection.exec_driver_sql(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{name}_unique "
+                f"ON {name} ({', '.join(unique_columns)})"
+            )
+
+
+def refresh_views(connection: Connection) -> bool:
+    """Refresh the materialized views, without blocking reads of them.
+
+    Returns:
+        bool: Whether there were materialized views to refresh.
+    """
+    if not _is_materialized(connection):
+        return False
+    for name in VIEWS:
+        connection.exec_driver_sql(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}")
+    return True
@@ -1,52 +1,111 @@
 import logging
 import os
+from functools import lru_cache
 
-import resend
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from pydantic_settings import BaseSettings
 
 logger = logging.getLogger(__name__)
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+# maximum number of emails Resend accepts in a single batch request
+BATCH_SIZE = 100
+
+
+def _import_resend():
+    """Import the Resend SDK on first use rather than on startup,
+    since importing it is slow."""
+    import resend
+
+    return resend
+
+
+@lru_cache
+def get_template_environment() -> Environment:
+    """Get a cached Jinja2 environment for the email templates.
+    Templates are compiled on first load and kept in memory."""
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
+    )
+
 
 class EmailService:
     """Service to send emails."""
 
-    def __init__(self, settings: BaseSettings):
-        """Init the service."""
-        self.settings = settings
-        resend.api_key = self.settings.RESEND_API_KEY
-        self.template_dir = os.path.join(".", "templates")
-        self.register_template = os.path.join(self.template_dir, "register.html")
-        self.register_subject = "Digital Lions Invite"
+    register_subject = "Digital Lions Invite"
+    reset_password_subject = "Digital Lions Password Reset"
 
-        self.reset_password_template = os.path.join(
-            self.template_dir, "reset_password.html"
+    def __init__(self, api_key: str, sender: str):
+        """Init the service and compile the templates."""
+        self.api_key = api_key
+        self.sender = sender
+
+        environment = get_template_environment()
+        self.register_template: Template = environment.get_template("register.html")
+        self.reset_password_template: Template = environment.get_template(
+            "reset_password.html"
         )
-        self.reset_password_subject = "Digital Lions Password Reset"
-        self.sender = self.settings.RESEND_SENDER
+
+    @property
+    def _resend(self):
+        """Resend SDK configured with the API key."""
+        resend = _import_resend()
+        resend.api_key = self.api_key
+        return resend
 
     def send_reset_password_link(self, email: str, link: str):
         """Reset user pass."""
-        template = self._get_template(self.reset_password_template).replace(
-            "{{ reset_link }}", link
-        )
+        template = self.reset_password_template.render(reset_link=link)
         params = self._get_send_params(email, self.reset_password_subject, template)
-        email = resend.Emails.send(params)
+        email = self._resend.Emails.send(params)
         email_id = email["id"]
         logger.info(f"Password reset email sent to {email} with Resend id: {email_id}")
 
     def send_invite_link(self, email: str, link: str):
         """Send invite link (i.e. password reset link) to user."""
-        template = self._get_template(self.register_template).replace(
-            "{{ register_link }}", link
-        )
+        template = self.register_template.render(register_link=link)
         params = self._get_send_params(email, self.register_subject, template)
-        email = resend.Emails.send(params)
+        email = self._resend.Emails.send(params)
         email_id = email["id"]
         logger.info(f"Invite link sent to {email} with Resend id: {email_id}")
 
+    def send_invite_links(self, invites: list[tuple[str, str]]) -> list[str]:
+        """Send invite links to many users at once, using Resend batch
+        requests of at most `BATCH_SIZE` emails.
+
+        Args:
+            invites (list[tuple[str, str]]): List of (email, link) tuples.
+
+        Returns:
+            list[str]: Resend ID's of the sent emails.
+        """
+        params = self.render_invites(invites)
+        email_ids = []
+        resend = self._resend
+        for i in range(0, len(params), BATCH_SIZE):
+            response = resend.Batch.send(params[i : i + BATCH_SIZE])
+            email_ids.extend(email["id"] for email in response["data"])
+        logger.info(f"Invite links sent to {len(email_ids)} users")
+        return email_ids
+
+    def render_invites(self, invites: list[tuple[str, str]]) -> list[dict]:
+        """Render the invite template for a list of (email, link) tuples
+        and return the send params for each email."""
+        return [
+            self._get_send_params(
+                email,
+                self.register_subject,
+                self.register_template.render(register_link=link),
+            )
+            for email, link in invites
+        ]
+
     def _get_send_params(self, email_address: str, subject: str, template: str):
-        """Get email send params."""
-        params: resend.Emails.SendParams = {
+        """Get email send params, see `resend.Emails.SendParams`."""
+        params = {
             "from": self.sender,
             "to": [email_address],
             "subject": subject,
@@ -54,7 +113,15 @@ class EmailService:
         }
         return params
 
-    def _get_template(self, path: str):
-        """Get template from file."""
-        with open(path) as f:
-            return f.read()
+
+@lru_cache
+def _get_email_service(api_key: str, sender: str) -> EmailService:
+    """Get a cached email service per API key and sender."""
+    return EmailService(api_key=api_key, sender=sender)
+
+
+def get_email_service(settings: BaseSettings) -> EmailService:
+    """Get the email service singleton for the given settings."""
+    return _get_email_service(
+        api_key=settings.RESEND_API_KEY, sender=settings.RESEND_SENDER
+    )
@@ -21,11 +21,21 @@ class BadRequestError(BaseAPIException):
 
 
 class ChildAlreadyExistsError(BaseAPIException):
-    pass
+
+    message = "Child already exists"
+    status_code = status.HTTP_409_CONFLICT
 
 
 class ChildHasAttendanceError(BaseAPIException):
-    pass
+
+    message = "Child has attendance records"
+    status_code = status.HTTP_409_CONFLICT
+
+
+class ChildImportInvalidError(BaseAPIException):
+
+    message = "Invalid children import"
+    status_code = status.HTTP_400_BAD_REQUEST
 
 
 class ChildNotFoundError(BaseAPIException):
@@ -58,6 +68,18 @@ class CommunityNotFoundError(BaseAPIException):
     status_code = status.HTTP_404_NOT_FOUND
 
 
+class IdempotencyKeyInProgressError(BaseAPIException):
+
+    message = "Idempotency key in progress"
+    status_code = status.HTTP_409_CONFLICT
+
+
+class IdempotencyKeyReusedError(BaseAPIException):
+
+    message = "Idempotency key reused"
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 class ImplementingPartnerNotFoundError(BaseAPIException):
 
     message = "Implementing partner not found"
@@ -70,6 +92,12 @@ class ImplementingPartnerAlreadyExistsError(BaseAPIException):
     status_code = status.HTTP_409_CONFLICT
 
 
+class ImplementingPartnerHasCommunitiesError(BaseAPIException):
+
+    message = "Partner has communities"
+    status_code = status.HTTP_409_CONFLICT
+
+
 class ForbiddenError(BaseAPIException):
     pass
 
@@ -94,6 +122,17 @@ class ResourceNotFoundError(BaseAPIException):
     pass
 
 
+class RateLimitExceededError(BaseAPIException):
+
+    message = "Too many requests"
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+
+    def __init__(self, message: str = None, retry_after: float = 1):
+        """Clients should wait `retry_after` seconds before retrying."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class RoleAlreadyExistsError(BaseAPIException):
     pass
 
@@ -106,6 +145,18 @@ class RoleNotFoundForUserError(BaseAPIException):
     pass
 
 
+class ServiceOverloadedError(RateLimitExceededError):
+
+    message = "Service overloaded"
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+class SyncCursorInvalidError(BaseAPIException):
+
+    message = "Invalid sync cursor"
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
 class TeamAlreadyExistsError(BaseAPIException):
 
     message = "Team name already exists"
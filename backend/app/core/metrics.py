@@ -0,0 +1,64 @@
+"""In-process metrics, exposed in the Prometheus text format on `/metrics`."""
+
+import threading
+from collections.abc import Callable
+
+
+class Metrics:
+    """Thread safe registry of counters and gauges.
+
+    Counters are incremented where something happens, gauges are read from
+    a callback when the metrics are rendered. Every worker process has its
+    own registry, so a scrape of `/metrics` returns the metrics of the
+    worker that handles it."""
+
+    def __init__(self):
+        # name -> (type, description)
+        self._metrics: dict[str, tuple[str, str]] = {}
+        self._values: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str) -> None:
+        """Register a counter that starts at zero."""
+        self._metrics[name] = ("counter", description)
+        self._values.setdefault(name, {})
+
+    def gauge(self, name: str, description: str, get_value: Callable[[], float]):
+        """Register a gauge whose value is read when rendering."""
+        self._metrics[name] = ("gauge", description)
+        self._gauges[name] = get_value
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a registered counter, per combination of labels."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            values = self._values[name]
+            values[key] = values.get(key, 0) + value
+
+    def value(self, name: str, **labels: str) -> float:
+        """Current value of a counter or gauge."""
+        if name in self._gauges:
+            return self._gauges[name]()
+        return self._values[name].get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, (kind, description) in self._metrics.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "gauge":
+                lines.append(f"{name} {self._gauges[name]()}")
+                continue
+            with self._lock:
+                values = dict(self._values[name])
+            for labels, value in values.items():
+                label_str = ",".join(f'{key}="{val}"' for key, val in labels)
+                lines.append(
+                    f"{name}{{{label_str}}} {value}" if labels else f"{name} {value}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
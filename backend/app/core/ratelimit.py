@@ -0,0 +1,176 @@
+"""Rate limiting of requests per user and route, and shedding of the requests
+that a worker cannot handle at once."""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from core.database import schema
+from core.metrics import metrics
+from pydantic_settings import BaseSettings
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+metrics.counter("ratelimit_limited_total", "Requests rejected by the rate limit")
+metrics.counter("ratelimit_shed_total", "Requests rejected by the in flight cap")
+
+
+class RateLimitStore(ABC):
+    """Interface of the token buckets of the rate limit, implement this
+    to plug in another backend in `get_rate_limit_store`.
+
+    A bucket holds up to `burst` tokens and is refilled with `rate` tokens
+    per second, every request takes a token. The buckets are stored as the
+    moment at which they are full again (the generic cell rate algorithm),
+    so that taking a token is a single read and write of one value."""
+
+    # whether `acquire` does I/O, and should run in the thread pool
+    blocking: bool = False
+
+    @abstractmethod
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take a token from the bucket of a key.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds
+                until the bucket has a token again.
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Thread safe in-memory buckets of at most `max_size` keys. Every
+    worker process has its own buckets, so with several workers a client
+    may get up to `burst` requests per worker through at once."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        # key -> moment at which the bucket is full, in insertion order
+        self._full_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._full_at)
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        interval = 1 / rate
+        with self._lock:
+            full_at = max(self._full_at.pop(key, now), now)
+            wait = full_at + interval - now - burst * interval
+            if wait > 0:
+                self._full_at[key] = full_at
+                return wait
+            self._full_at[key] = full_at + interval
+            # full buckets are the same as missing ones, drop the
+            # least recently used first when there are too many
+            while len(self._full_at) > self.max_size:
+                del self._full_at[next(iter(self._full_at))]
+            return 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._full_at.clear()
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """Buckets in the `rate_limits` table, shared by all workers and
+    hosts. Every request costs a round trip to the primary database,
+    in a transaction of its own so that no row lock is held for long.
+
+    The store has an engine with a small pool of its own. The session of
+    the request already holds a connection of the pool of the app while
+    it waits for a token, so with a connection from the same pool requests
+    could hold every connection while they wait for another one."""
+
+    blocking = True
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        table = schema.RateLimit.__table__
+        now = time.time()
+        interval = 1 / rate
+        full_at = func.greatest(table.c.full_at, now)
+        statement = (
+            insert(table)
+            .values(key=key, full_at=now + interval)
+            .on_conflict_do_update(
+                index_elements=[table.c.key],
+                set_={"full_at": full_at + interval},
+                # leave an empty bucket as it is
+                where=full_at + interval - now <= burst * interval,
+            )
+            .returning(table.c.full_at)
+        )
+        with self.engine.begin() as connection:
+            if connection.execute(statement).first() is not None:
+                return 0
+            current = connection.execute(
+                select(table.c.full_at).where(table.c.key == key)
+            ).scalar_one()
+        return max(current + interval - now - burst * interval, 0)
+
+
+@lru_cache
+def _get_rate_limit_store(
+    kind: str, max_size: int, url: str, pool_size: int
+) -> RateLimitStore:
+    """Get a cached rate limit store per kind, size and database."""
+    if kind == "postgres":
+        engine = create_engine(url, pool_size=pool_size, max_overflow=0)
+        return PostgresRateLimitStore(engine=engine)
+    return MemoryRateLimitStore(max_size=max_size)
+
+
+def get_rate_limit_store(settings: BaseSettings) -> RateLimitStore:
+    """Get the rate limit store singleton for the given settings."""
+    return _get_rate_limit_store(
+        kind=settings.RATE_LIMIT_STORE,
+        max_size=settings.RATE_LIMIT_MEMORY_SIZE,
+        url=settings.POSTGRES_DATABASE_URL,
+        pool_size=settings.RATE_LIMIT_POOL_SIZE,
+    )
+
+
+class InFlightLimiter:
+    """Counts the requests that a worker handles at once, so that requests
+    beyond a cap are rejected right away instead of queueing for a database
+    connection, which would make every request of the worker slow. Only
+    touched from the event loop of the worker, so it needs no lock."""
+
+    def __init__(self):
+        self.in_flight = 0
+        metrics.gauge(
+            "ratelimit_in_flight",
+            "Requests that this worker handles at the moment",
+            lambda: self.in_flight,
+        )
+
+    def enter(self, limit: int) -> bool:
+        """Count a request in, unless `limit` requests are in flight
+        already, 0 for no limit. Every entered request must `leave`."""
+        if limit and self.in_flight >= limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def leave(self) -> None:
+        self.in_flight -= 1
+
+
+in_flight = InFlightLimiter()
+
+
+def pool_exhausted(engine: Engine, settings: BaseSettings) -> bool:
+    """Whether every connection that the pool of an engine may open, the
+    `DATABASE_POOL_SIZE` plus the `DATABASE_MAX_OVERFLOW`, is checked out,
+    so that the next session waits for another one to be returned."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return False
+    connections = settings.DATABASE_POOL_SIZE + settings.DATABASE_MAX_OVERFLOW
+    return pool.checkedout() >= connections
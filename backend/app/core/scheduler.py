@@ -0,0 +1,165 @@
+"""In-process scheduler of periodic background jobs, such as housekeeping."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from core.database.session import get_engine
+from core.metrics import metrics
+from core.threadpool import get_thread_pool
+from pydantic_settings import BaseSettings
+from sqlalchemy.engine import Connection
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+# key of the Postgres advisory lock of the leader, any constant that
+# is not used for another advisory lock on the same database
+LEADER_LOCK_ID = 4_712_001
+
+metrics.counter("scheduler_job_runs_total", "Runs of background jobs by status")
+metrics.counter("scheduler_job_seconds_total", "Seconds spent running background jobs")
+
+
+class Job(NamedTuple):
+    """Periodic job that gets a session and the settings, and returns
+    a short summary of what it did for the logs."""
+
+    name: str
+    func: Callable[[Session, BaseSettings], Any]
+    interval: float
+    description: str
+
+
+class Scheduler:
+    """Runs jobs every `interval` seconds in the background of the app.
+
+    Every worker process runs a scheduler, but only the leader runs jobs.
+    The leader is the worker that holds a Postgres advisory lock on a
+    connection of its own, which Postgres releases when the worker or its
+    connection dies, so that another worker takes over within a tick.
+    Other databases than Postgres have no advisory locks, so there every
+    worker is the leader, which is fine for a single development worker.
+
+    Jobs run in the thread pool and commit their own transaction, so they
+    should be idempotent: a job runs when a worker becomes the leader and
+    again after every interval, and a failed job is retried next interval."""
+
+    def __init__(self, tick: float = 10):
+        self.tick = tick
+        self.jobs: dict[str, Job] = {}
+        self.is_leader = False
+        self._lock_connection: Connection | None = None
+        self._last_run: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+        metrics.gauge(
+            "scheduler_leader",
+            "Whether this worker runs the background jobs",
+            lambda: int(self.is_leader),
+        )
+
+    def job(self, interval: float, description: str):
+        """Decorator that registers a function as a job, by its name."""
+
+        def register(func: Callable[[Session, BaseSettings], Any]):
+            name = func.__name__
+            self.jobs[name] = Job(name, func, interval, description)
+            return func
+
+        return register
+
+    def run_job(self, name: str, settings: BaseSettings) -> Any:
+        """Run a job now, in the calling thread, and record its metrics.
+
+        Raises:
+            KeyError: If there is no job with the name.
+        """
+        job = self.jobs[name]
+        start = time.perf_counter()
+        status = "failure"
+        try:
+            engine = get_engine()
+            with Session(bind=engine, autocommit=False, autoflush=False) as session:
+                result = job.func(session, settings)
+                session.commit()
+            status = "success"
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            metrics.increment("scheduler_job_runs_total", job=name, status=status)
+            metrics.increment("scheduler_job_seconds_total", duration, job=name)
+            logger.info(f"Job {name} finished with {status} in {duration:.2f}s")
+
+    def start(self, settings: BaseSettings) -> None:
+        """Start running due jobs in the background of the event loop."""
+        self._task = asyncio.create_task(self._run(settings))
+
+    async def stop(self) -> None:
+        """Stop running jobs and give up the leadership."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._release_leadership()
+
+    async def _run(self, settings: BaseSettings) -> None:
+        thread_pool = get_thread_pool(settings)
+        while True:
+            try:
+                if await thread_pool.run(self._elect):
+                    await self._run_due_jobs(settings)
+            except Exception:
+                logger.exception("Failed to run background jobs")
+                self._release_leadership()
+            await asyncio.sleep(self.tick)
+
+    async def _run_due_jobs(self, settings: BaseSettings) -> None:
+        thread_pool = get_thread_pool(settings)
+        for job in self.jobs.values():
+            last_run = self._last_run.get(job.name)
+            if last_run is not None and time.monotonic() - last_run < job.interval:
+                continue
+            self._last_run[job.name] = time.monotonic()
+            try:
+                result = await thread_pool.run(self.run_job, job.name, settings)
+                logger.info(f"Job {job.name}: {result}")
+            except Exception:
+                logger.exception(f"Job {job.name} failed")
+
+    def _elect(self) -> bool:
+        """Try to become the leader, or check that we still are."""
+        engine = get_engine()
+        if engine.dialect.name != "postgresql":
+            self.is_leader = True
+            return True
+
+        if self._lock_connection is None:
+            # outside of a transaction, so the idle connection does not hold
+            # back vacuum while the lock lives as long as the session
+            self._lock_connection = engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+        if self.is_leader:
+            # fails if the connection, and thereby the lock, was lost
+            self._lock_connection.exec_driver_sql("SELECT 1")
+            return True
+
+        self.is_leader = self._lock_connection.exec_driver_sql(
+            f"SELECT pg_try_advisory_lock({LEADER_LOCK_ID})"
+        ).scalar()
+        if self.is_leader:
+            logger.info("Became the leader that runs background jobs")
+            # jobs run when a worker becomes the leader
+            self._last_run.clear()
+        return self.is_leader
+
+    def _release_leadership(self) -> None:
+        """Close the lock connection, which releases the advisory lock. The
+        connection is discarded instead of returned to the pool, since the
+        lock lives as long as the database session."""
+        self.is_leader = False
+        if self._lock_connection is not None:
+            self._lock_connection.invalidate()
+            self._lock_connection.close()
+            self._lock_connection = None
@@ -1,5 +1,6 @@
+import os
 from functools import lru_cache
-from typing import Annotated, Any
+from typing import Annotated, Any, Literal
 
 from fastapi import Depends
 from pydantic import Field, model_validator
@@ -15,6 +16,75 @@ class Settings(BaseSettings):
 
     # database
     POSTGRES_DATABASE_URL: str
+    POSTGRES_READ_REPLICA_URL: str | None = Field(
+        default=None, description="Database to serve GET requests from, if any"
+    )
+    # reads of a user go to the primary for a while after they write,
+    # this should exceed the replication lag
+    READ_YOUR_WRITES_SECONDS: float = Field(
+        default=5, description="Seconds after a write that reads use the primary"
+    )
+    READ_STATEMENT_TIMEOUT: float = Field(
+        default=10, description="Seconds after which a query of a read is cancelled"
+    )
+    # connections per engine and worker, every thread of the thread pool may
+    # hold one and the scheduler holds one for its lock, so the pool should
+    # exceed the `THREAD_POOL_SIZE`, connections beyond the pool size are
+    # closed when they are returned
+    DATABASE_POOL_SIZE: int = Field(
+        default=4, description="Connections kept open per worker"
+    )
+    DATABASE_MAX_OVERFLOW: int = Field(
+        default=5, description="Connections opened beyond the pool size when busy"
+    )
+    # every worker has its own pools, so all workers together may open
+    # `SERVER_WORKERS` times the connections of one worker, which should stay
+    # below the `max_connections` of Postgres, 100 by default, minus those
+    # of other clients, e.g. 90 for a database of the app alone
+    DATABASE_MAX_CONNECTIONS: int | None = Field(
+        default=None,
+        description="Connections all workers may open to the primary, unchecked if unset",
+    )
+    # the schema is managed by Alembic migrations, see run.sh
+    DATABASE_CREATE_ALL: bool = Field(
+        default=False, description="Create missing tables on startup, for development"
+    )
+
+    # production server, see server.py, every worker process has its own
+    # connection pools and caches, so the database should accept
+    # `SERVER_WORKERS` times the connections of one worker
+    PORT: int = Field(default=8000, description="Port to serve the app on")
+    SERVER_WORKERS: int = Field(
+        default=0, description="Number of worker processes, 0 for one per CPU core"
+    )
+    SERVER_KEEP_ALIVE: int = Field(
+        default=5, description="Seconds to keep idle connections open"
+    )
+    SERVER_BACKLOG: int = Field(
+        default=2048, description="Maximum number of pending connections"
+    )
+    # recycling workers bounds the memory they can leak, the jitter
+    # avoids that all workers are recycled at the same time
+    SERVER_MAX_REQUESTS: int = Field(
+        default=10_000, description="Requests after which a worker is recycled"
+    )
+    SERVER_MAX_REQUESTS_JITTER: int = Field(
+        default=1_000, description="Random extra requests before recycling"
+    )
+    SERVER_GRACEFUL_TIMEOUT: int = Field(
+        default=30, description="Seconds a stopping worker may finish requests"
+    )
+
+    # blocking calls of async routes, and sync routes and dependencies,
+    # run in a pool of threads per worker, see core/threadpool.py
+    THREAD_POOL_SIZE: int = Field(
+        default=8, description="Maximum number of threads per worker"
+    )
+
+    # background jobs, see jobs.py, only one worker runs them at a time
+    SCHEDULER_ENABLED: bool = Field(
+        default=True, description="Run periodic background jobs"
+    )
 
     # feature flags
     FEATURE_AUTH0: bool | None = Field(
@@ -36,6 +106,54 @@ class Settings(BaseSettings):
     RESEND_API_KEY: str
     RESEND_SENDER: str
 
+    # response cache, a size of 0 disables the cache
+    RESPONSE_CACHE_SIZE: int = Field(
+        default=1024, description="Maximum number of cached responses"
+    )
+    RESPONSE_CACHE_TTL: float = Field(
+        default=300, description="Seconds after which a cached response expires"
+    )
+
+    # offline sync, tombstones older than the retention may be pruned,
+    # so older cursors get a full sync since deletions may have been missed
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = Field(
+        default=90, description="Days after which a sync cursor expires"
+    )
+
+    # responses to requests with an Idempotency-Key header are replayed to
+    # retries within the retention, and may be pruned afterwards
+    IDEMPOTENCY_KEY_RETENTION_HOURS: int = Field(
+        default=24, description="Hours during which a retry gets the same response"
+    )
+
+    # rate limit per user and route, with buckets per worker or shared by
+    # all workers in Postgres, see core/ratelimit.py
+    RATE_LIMIT_PER_SECOND: float = Field(
+        default=10, description="Sustained requests per second, 0 disables the limit"
+    )
+    RATE_LIMIT_BURST: int = Field(
+        default=50, description="Requests that may be made at once"
+    )
+    RATE_LIMIT_STORE: Literal["memory", "postgres"] = Field(
+        default="memory", description="Where the buckets of the rate limit are kept"
+    )
+    RATE_LIMIT_MEMORY_SIZE: int = Field(
+        default=10_000, description="Maximum number of buckets kept in memory"
+    )
+    # the postgres store has a pool of its own, see PostgresRateLimitStore
+    RATE_LIMIT_POOL_SIZE: int = Field(
+        default=2, description="Connections of the postgres store per worker"
+    )
+    # requests are shed with a 503 while the database pool is exhausted and
+    # calls wait for a thread, see routers/_limits.py, the cap on requests
+    # in flight bounds the memory of a worker on top of that
+    MAX_IN_FLIGHT_REQUESTS: int = Field(
+        default=200, description="Requests a worker handles at once, 0 for no cap"
+    )
+    SHED_RETRY_AFTER: int = Field(
+        default=1, description="Seconds after which rejected requests may retry"
+    )
+
     def model_post_init(self, __context) -> None:
         """Post init hook."""
         self.ALLOWED_ORIGINS = self.ALLOWED_ORIGINS.split(",")
@@ -53,6 +171,39 @@ class Settings(BaseSettings):
             )
         return self
 
+    @model_validator(mode="after")
+    def validate_pool_settings(self) -> Any:
+        """Validate that every thread can get a database connection, rather
+        than waiting for one while it holds a thread that others wait for,
+        and that all workers together stay within the connection budget."""
+        connections = self.DATABASE_POOL_SIZE + self.DATABASE_MAX_OVERFLOW
+        needed = self.THREAD_POOL_SIZE + int(self.SCHEDULER_ENABLED)
+        if connections < needed:
+            raise ValueError(
+                f"DATABASE_POOL_SIZE plus DATABASE_MAX_OVERFLOW ({connections}) "
+                f"should be at least THREAD_POOL_SIZE plus one for the "
+                f"scheduler ({needed})"
+            )
+
+        if self.DATABASE_MAX_CONNECTIONS is None:
+            return self
+        # the postgres rate limit store has a pool of its own
+        if self.RATE_LIMIT_STORE == "postgres":
+            connections += self.RATE_LIMIT_POOL_SIZE
+        total = self.server_workers * connections
+        if total > self.DATABASE_MAX_CONNECTIONS:
+            raise ValueError(
+                f"{self.server_workers} workers with {connections} connections "
+                f"each may open {total} connections, more than "
+                f"DATABASE_MAX_CONNECTIONS ({self.DATABASE_MAX_CONNECTIONS})"
+            )
+        return self
+
+    @property
+    def server_workers(self) -> int:
+        """Number of worker processes of the production server."""
+        return self.SERVER_WORKERS or os.cpu_count() or 1
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,100 @@
+"""Bounded thread pool for the blocking calls of async routes."""
+
+import time
+from collections.abc import Callable
+from functools import lru_cache, partial
+from typing import ParamSpec, TypeVar
+
+from anyio import CapacityLimiter, WouldBlock, to_thread
+from core.metrics import metrics
+from pydantic_settings import BaseSettings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+metrics.counter("threadpool_calls_total", "Calls run in the thread pool")
+metrics.counter(
+    "threadpool_saturated_total", "Calls that had to wait for a free thread"
+)
+metrics.counter(
+    "threadpool_wait_seconds_total", "Seconds that calls waited for a free thread"
+)
+
+
+class ThreadPool:
+    """Runs the blocking service calls of async routes in worker threads,
+    so that a slow query does not block the event loop and thereby every
+    other request of the worker.
+
+    The pool is the default thread limiter of anyio, which Starlette uses
+    for sync routes and dependencies, such as the database session, as well.
+    All blocking work of a worker therefore shares one bound of `size`
+    threads, and calls beyond it wait in line for a free thread."""
+
+    def __init__(self, size: int):
+        self.size = size
+        # limiter of the event loop of the worker, once known
+        self._limiter: CapacityLimiter | None = None
+
+    def start(self) -> None:
+        """Size the thread limiter of the running event loop to the pool,
+        before the first request runs a sync dependency on it."""
+        self._get_limiter()
+
+    def _get_limiter(self) -> CapacityLimiter:
+        """Thread limiter of the running event loop, sized to the pool."""
+        limiter = to_thread.current_default_thread_limiter()
+        if limiter.total_tokens != self.size:
+            limiter.total_tokens = self.size
+        self._limiter = limiter
+        return limiter
+
+    @property
+    def busy(self) -> int:
+        """Number of threads that run a call."""
+        return self._limiter.borrowed_tokens if self._limiter else 0
+
+    @property
+    def waiting(self) -> int:
+        """Number of calls that wait for a free thread."""
+        return self._limiter.statistics().tasks_waiting if self._limiter else 0
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run a blocking call in a thread of the pool and wait for its result."""
+        limiter = self._get_limiter()
+        metrics.increment("threadpool_calls_total")
+        # take the thread here rather than in `run_sync`, to know if we wait
+        borrower = object()
+        try:
+            limiter.acquire_on_behalf_of_nowait(borrower)
+        except WouldBlock:
+            metrics.increment("threadpool_saturated_total")
+            queued_at = time.perf_counter()
+            await limiter.acquire_on_behalf_of(borrower)
+            waited = time.perf_counter() - queued_at
+            metrics.increment("threadpool_wait_seconds_total", waited)
+        try:
+            # the call holds a thread of the pool already, so it should
+            # not take another one from the default limiter
+            return await to_thread.run_sync(
+                partial(func, *args, **kwargs), limiter=CapacityLimiter(1)
+            )
+        finally:
+            limiter.release_on_behalf_of(borrower)
+
+
+@lru_cache
+def _get_thread_pool(size: int) -> ThreadPool:
+    """Get a cached thread pool per size."""
+    pool = ThreadPool(size=size)
+    metrics.gauge("threadpool_size", "Threads in the thread pool", lambda: pool.size)
+    metrics.gauge("threadpool_busy", "Threads that run a call", lambda: pool.busy)
+    metrics.gauge(
+        "threadpool_waiting", "Calls that wait for a free thread", lambda: pool.waiting
+    )
+    return pool
+
+
+def get_thread_pool(settings: BaseSettings) -> ThreadPool:
+    """Get the thread pool singleton for the given settings."""
+    return _get_thread_pool(size=settings.THREAD_POOL_SIZE)
@@ -0,0 +1,122 @@
+"""Periodic background jobs of the app, and a CLI to run them by hand.
+
+The jobs run in the background of the app when `SCHEDULER_ENABLED` is set,
+see core/scheduler.py. To list the jobs or run one now, from the `app` folder:
+
+    python jobs.py list
+    python jobs.py run purge_tombstones
+"""
+
+import argparse
+import logging.config
+import time
+from datetime import datetime, timedelta
+
+from core.scheduler import Scheduler
+from core.settings import get_settings
+from pydantic_settings import BaseSettings
+from repositories.database import DatabaseRepositories
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+scheduler = Scheduler()
+
+
+@scheduler.job(interval=DAY, description="Delete tombstones past the retention")
+def purge_tombstones(session: Session, settings: BaseSettings) -> str:
+    """Delete the tombstones that no sync cursor can ask for anymore, since
+    cursors older than the retention get a full sync instead."""
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    deleted = DatabaseRepositories(session=session).tombstones.delete_older_than(
+        datetime.now() - retention
+    )
+    return f"Deleted {deleted} tombstones"
+
+
+@scheduler.job(interval=HOUR, description="Delete expired idempotency keys")
+def purge_idempotency_keys(session: Session, settings: BaseSettings) -> str:
+    """Delete the responses to idempotent requests that are past the
+    retention, since retries after it are applied again anyway."""
+    retention = timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS)
+    deleted = DatabaseRepositories(session=session).idempotency_keys.delete_older_than(
+        datetime.now() - retention
+    )
+    return f"Deleted {deleted} idempotency keys"
+
+
+@scheduler.job(interval=HOUR, description="Delete full rate limit buckets")
+def purge_rate_limits(session: Session, settings: BaseSettings) -> str:
+    """Delete the rate limit buckets that are full again, which are the same
+    as missing ones, so that the table only holds recently active clients."""
+    deleted = DatabaseRepositories(session=session).rate_limits.delete_full(time.time())
+    return f"Deleted {deleted} rate limit buckets"
+
+
+@scheduler.job(interval=HOUR, description="Delete past recent writes")
+def purge_recent_writes(session: Session, settings: BaseSettings) -> str:
+    """Delete the recent writes that are older than the read-your-writes
+    window, since they no longer send the reads of their user to the primary."""
+    deleted = DatabaseRepositories(session=session).recent_writes.delete_older_than(
+        time.time() - settings.READ_YOUR_WRITES_SECONDS
+    )
+    return f"Deleted {deleted} recent writes"
+
+
+@scheduler.job(interval=HOUR, description="Delete roles of users deleted in Auth0")
+def sync_auth0_users(session: Session, settings: BaseSettings) -> str:
+    """Delete the roles of users that no longer exist in Auth0, e.g. because
+    they were deleted in the Auth0 dashboard instead of through the API."""
+    if not settings.FEATURE_AUTH0:
+        return "Skipped, Auth0 is disabled"
+    from repositories.auth0 import Auth0Repository
+
+    roles = DatabaseRepositories(session=session).roles
+    # users that are invited while the users are listed may be missing from
+    # the list, so only the roles that existed before the listing are checked
+    role_ids = roles.read_ids()
+    # and no transaction is held open while listing
+    session.commit()
+    user_ids = Auth0Repository(settings).list_user_ids()
+    # an empty tenant is more likely a misconfiguration than that all users
+    # were deleted, so do not delete all roles in that case
+    if not user_ids:
+        return "Skipped, Auth0 has no users"
+    deleted = roles.delete_where_user_not_in(user_ids, role_ids=role_ids)
+    return f"Deleted {deleted} roles of {len(user_ids)} users"
+
+
+@scheduler.job(interval=10 * MINUTE, description="Refresh the stats views")
+def refresh_stats(session: Session, settings: BaseSettings) -> str:
+    """Refresh the materialized views behind the stats endpoints. Writes land
+    in any worker, so the views are refreshed on a schedule rather than after
+    every write, which keeps the refreshes off the request path."""
+    if not DatabaseRepositories(session=session).stats.refresh():
+        return "Skipped, the stats views are not materialized"
+    return "Refreshed the stats views"
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Run background jobs by hand.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the jobs")
+    run = commands.add_parser("run", help="Run a job now")
+    run.add_argument("job", choices=sorted(scheduler.jobs))
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for job in scheduler.jobs.values():
+            print(f"{job.name:<20} every {job.interval:>6.0f}s  {job.description}")
+        return
+
+    logging.config.fileConfig(get_settings().LOGGING_CONF)
+    result = scheduler.run_job(args.job, get_settings())
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
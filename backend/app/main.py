@@ -1,26 +1,35 @@
 import logging
 import logging.config
+import math
 import os
 from contextlib import asynccontextmanager
 from typing import Any
 
 from core import exceptions
 from core.database.session import init_db
+from core.email import get_email_service
 from core.settings import get_settings
+from core.threadpool import get_thread_pool
 from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from jobs import scheduler
 from models.generic import APIResponse
 from routers import (
+    batch,
     children,
     communities,
     health,
     implementing_partners,
+    metrics,
     roles,
+    stats,
+    sync,
     teams,
     users,
     workshops,
 )
+from routers._limits import LIMITS
+from routers._responses import APIJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -38,29 +47,42 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     setup_logger(settings)
 
-    logger.info("Starting db client...")
-    init_db()
+    if settings.DATABASE_CREATE_ALL:
+        logger.info("Creating missing database tables...")
+        init_db()
+
+    logger.info("Compiling email templates...")
+    get_email_service(settings)
+
+    get_thread_pool(settings).start()
+
+    if settings.SCHEDULER_ENABLED:
+        logger.info("Starting background jobs...")
+        scheduler.start(settings)
 
     yield
 
+    await scheduler.stop()
+
 
 app = FastAPI(
     title="Digital Lions API",
     version="0.1.0",
     root_path="/api/v1",
     lifespan=lifespan,
+    default_response_class=APIJSONResponse,
 )
 
 
 @app.exception_handler(status.HTTP_401_UNAUTHORIZED)
 async def unauthorized_exception_handler(request: Request, exc: HTTPException) -> Any:
     """Handle 401 unauthorized exceptions."""
-    return JSONResponse(
+    return APIJSONResponse(
         status_code=status.HTTP_401_UNAUTHORIZED,
         content=APIResponse(
             message="User is not authorized",
             detail=str(exc),
-        ).model_dump(),
+        ),
     )
 
 
@@ -68,12 +90,25 @@ async def unauthorized_exception_handler(request: Request, exc: HTTPException) -
 @app.exception_handler(status.HTTP_403_FORBIDDEN)
 async def forbidden_exception_handler(request: Request, exc: HTTPException) -> Any:
     """Handle 403 forbidden exceptions."""
-    return JSONResponse(
+    return APIJSONResponse(
         status_code=status.HTTP_403_FORBIDDEN,
         content=APIResponse(
             message="User does not have access",
             detail=str(exc),
-        ).model_dump(),
+        ),
+    )
+
+
+@app.exception_handler(exceptions.RateLimitExceededError)
+async def rate_limit_exception_handler(
+    request: Request, exc: exceptions.RateLimitExceededError
+) -> Any:
+    """Handle rate limited and shed requests, with the
+    seconds after which the client may retry."""
+    return APIJSONResponse(
+        status_code=exc.status_code,
+        content=APIResponse(message=exc.message, detail=exc.detail),
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
     )
 
 
@@ -85,17 +120,15 @@ async def catch_any_exception(request: Request, exc) -> Any:
     """
     logger.exception(exc)
     try:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=exc.status_code,
-            content=APIResponse(message=exc.message, detail=str(exc)).model_dump(),
+            content=APIResponse(message=exc.message, detail=str(exc)),
         )
     except AttributeError:
         # in case an unknown error occurs
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content=APIResponse(
-                message="Something went wrong.", detail=str(exc)
-            ).model_dump(),
+            content=APIResponse(message="Something went wrong.", detail=str(exc)),
         )
 
 
@@ -109,10 +142,20 @@ app.add_middleware(
     allow_headers=["Content-Type", "Authorization"],
 )
 app.include_router(health.router, tags=["health"])
-app.include_router(implementing_partners.router, tags=["implementing partners"])
-app.include_router(communities.router, tags=["communities"])
-app.include_router(teams.router, tags=["teams"])
-app.include_router(workshops.router, tags=["workshops"])
-app.include_router(children.router, tags=["children"])
-app.include_router(users.router)
-app.include_router(roles.router)
+app.include_router(metrics.router, tags=["metrics"])
+# health checks and metrics are left out of the limits, so that they
+# keep working while the API is overloaded
+app.include_router(
+    implementing_partners.router,
+    tags=["implementing partners"],
+    dependencies=LIMITS,
+)
+app.include_router(communities.router, tags=["communities"], dependencies=LIMITS)
+app.include_router(teams.router, tags=["teams"], dependencies=LIMITS)
+app.include_router(workshops.router, tags=["workshops"], dependencies=LIMITS)
+app.include_router(children.router, tags=["children"], dependencies=LIMITS)
+app.include_router(sync.router, tags=["sync"], dependencies=LIMITS)
+app.include_router(batch.router, tags=["batch"], dependencies=LIMITS)
+app.include_router(stats.router, tags=["stats"], dependencies=LIMITS)
+app.include_router(users.router, dependencies=LIMITS)
+app.include_router(roles.router, dependencies=LIMITS)
@@ -1,3 +1,13 @@
-from . import child, community, generic, role, team, user
+from . import batch, child, community, generic, role, stats, sync, team, user
 
-__all__ = ["role", "user", "generic", "team", "community", "child"]
+__all__ = [
+    "batch",
+    "role",
+    "user",
+    "generic",
+    "stats",
+    "sync",
+    "team",
+    "community",
+    "child",
+]
@@ -0,0 +1,55 @@
+from typing import Any, Literal
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field, field_validator
+
+# maximum number of sub-requests in a batch
+BATCH_MAX_REQUESTS = 25
+
+
+class BatchPostIn(BaseModel):
+    """API payload model for POST /batch, with the read requests to execute."""
+
+    class Request(BaseModel):
+        """Read request to an endpoint of the API."""
+
+        method: Literal["GET"] = "GET"
+        path: str = Field(
+            description="Path of the endpoint, optionally with a query string",
+            examples=["/teams/1/workshops"],
+        )
+        headers: dict[str, str] = Field(
+            default_factory=dict,
+            description="Headers of the request, e.g. If-None-Match",
+        )
+
+        @field_validator("path")
+        @classmethod
+        def validate_path(cls, path: str) -> str:
+            """Only allow relative paths to endpoints other than batch."""
+            parts = urlsplit(path)
+            if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+                raise ValueError("Path should start with /")
+            if parts.path.rstrip("/") == "/batch":
+                raise ValueError("Batch requests can not be nested")
+            return path
+
+    requests: list[Request] = Field(min_length=1, max_length=BATCH_MAX_REQUESTS)
+
+
+class BatchPostOut(BaseModel):
+    """API response model for POST /batch, with a response per
+    request, in the order of the requests."""
+
+    class Response(BaseModel):
+        """Response of an endpoint to a request of the batch."""
+
+        status_code: int
+        headers: dict[str, str] = Field(
+            description="Caching headers of the response, e.g. ETag"
+        )
+        body: Any | None = Field(
+            description="JSON body of the response, null if it has none"
+        )
+
+    responses: list[Response]
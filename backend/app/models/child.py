@@ -94,3 +94,37 @@ class ChildGetOut(BaseModel):
     gender: str | None = Field(
         default=None, description="Gender of child. Either male or female."
     )
+
+
+# maximum number of children in an import, which keeps the import in one statement
+CHILD_IMPORT_MAX_ROWS = 1000
+
+
+class ChildImportIn(BaseModel):
+    """API payload model for POST /teams/:id/children/import in JSON.
+    The same columns can be uploaded as CSV with a header row instead.
+    Rows are validated one by one, so that every invalid row is reported."""
+
+    class Child(BaseModel):
+        """Child to import, validated as in POST /children."""
+
+        first_name: str = Field(examples=["Nelson"])
+        last_name: str = Field(examples=["Mandela"])
+        age: int | None = Field(default=None, examples=[10])
+        gender: str | None = Field(default=None, examples=["male", "female"])
+
+    children: list[Child] = Field(max_length=CHILD_IMPORT_MAX_ROWS)
+
+
+class ChildImportOut(BaseModel):
+    """Response model for POST /teams/:id/children/import. Children are
+    only imported if all rows are valid, otherwise the errors are returned."""
+
+    class Error(BaseModel):
+        """Reason a row can not be imported."""
+
+        row: int = Field(description="Number of the row, starting at 1")
+        detail: str
+
+    created: list[int] = Field(description="IDs of the imported children, in order")
+    errors: list[Error]
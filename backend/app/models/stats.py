@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+
+
+class StatsGetOut(BaseModel):
+    """API response model for GET /stats/implementing_partners and
+    GET /stats/communities, with the statistics of an implementing partner
+    or community over the teams the user has access to."""
+
+    class Workshop(BaseModel):
+        """Attendance of the teams that held a workshop with a number."""
+
+        workshop_number: int
+        teams: int = Field(description="Teams that held the workshop")
+        average_present: float = Field(
+            description="Average number of children present per team"
+        )
+        attendance_rate: float = Field(
+            description="Share of the recorded attendances that were present"
+        )
+
+    id: int
+    name: str
+    teams: int
+    active_teams: int
+    completed_teams: int = Field(description="Teams that held the last workshop")
+    completion_rate: float = Field(description="Share of teams that completed")
+    children: int = Field(description="Active children of the teams")
+    workshops: list[Workshop]
@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from models._metadata import _LastUpdatedAtPropertyOut
+from models.team import TeamPostWorkshopIn
+from pydantic import BaseModel, Field
+
+
+class SyncGetOut(BaseModel):
+    """API response model for GET /sync. Contains the records that changed since
+    the cursor of the previous sync, and the resources that were deleted."""
+
+    class Team(BaseModel, _LastUpdatedAtPropertyOut):
+        """Team that a device syncs."""
+
+        id: int
+        name: str
+        community_id: int
+        is_active: bool
+
+    class Child(BaseModel, _LastUpdatedAtPropertyOut):
+        """Child of a team that a device syncs."""
+
+        id: int
+        team_id: int
+        first_name: str
+        last_name: str
+        age: int | None = None
+        gender: str | None = None
+        is_active: bool
+
+    class Workshop(BaseModel, _LastUpdatedAtPropertyOut):
+        """Workshop of a team that a device syncs."""
+
+        id: int
+        team_id: int
+        workshop_number: int
+        date: str
+
+    class Attendance(BaseModel, _LastUpdatedAtPropertyOut):
+        """Attendance of a child to a workshop that a device syncs."""
+
+        id: int
+        workshop_id: int
+        child_id: int
+        attendance: str
+
+    class Deleted(BaseModel):
+        """Deleted resource. A deleted team implies that its children,
+        workshops and attendances are deleted, a deleted child implies
+        that its attendances are deleted."""
+
+        resource_type: str = Field(examples=["team", "child"])
+        resource_id: int
+        deleted_at: datetime
+
+    cursor: str = Field(description="Cursor to pass as `since` in the next sync")
+    full: bool = Field(
+        description="Whether this is a full sync, in which case the "
+        "device should replace its data instead of merging the changes"
+    )
+    teams: list[Team]
+    children: list[Child]
+    workshops: list[Workshop]
+    attendances: list[Attendance]
+    deleted: list[Deleted]
+
+
+class SyncPostIn(BaseModel):
+    """API payload model for POST /sync, with the workshops that a
+    device recorded while offline, in the order they were recorded."""
+
+    class Workshop(TeamPostWorkshopIn):
+        """Workshop of a team recorded offline."""
+
+        team_id: int = Field(description="ID of the team of the workshop")
+
+    workshops: list[Workshop]
+
+
+class SyncPostOut(BaseModel):
+    """API response model for POST /sync, with a result per workshop."""
+
+    class Result(BaseModel):
+        """Result of applying a workshop that was recorded offline."""
+
+        team_id: int
+        workshop_number: int
+        status_code: int = Field(
+            description="Status code the workshop would get from "
+            "POST /teams/:id/workshops, e.g. 201 or 409 if it already exists"
+        )
+        message: str | None = None
+        detail: str | None = None
+        workshop_id: int | None = None
+
+    results: list[Result]
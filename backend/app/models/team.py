@@ -3,6 +3,7 @@ from enum import Enum
 
 from models._metadata import (
     _CreatePropertiesIn,
+    _LastUpdatedAtPropertyIn,
     _MetadataPropertiesOut,
     _UpdatePropertiesIn,
 )
@@ -196,6 +197,39 @@ class TeamGetWorkshopByNumberOut(BaseModel):
     attendance: list[Attendance]
 
 
+class TeamGetDashboardOut(BaseModel):
+    """API response model for GET /teams/:id/dashboard.
+    Children and workshops are returned column wise, i.e. as a list per
+    field, and the attendance as a matrix of children by workshops, so
+    that the size of the response grows with the data and not its keys."""
+
+    class Children(BaseModel):
+        """Children of the team, sorted by first name."""
+
+        id: list[int]
+        first_name: list[str]
+        last_name: list[str]
+        age: list[int | None]
+        gender: list[str | None]
+        is_active: list[bool]
+
+    class Workshops(BaseModel):
+        """Workshops completed by the team, sorted by number."""
+
+        id: list[int]
+        number: list[int]
+        date: list[str]
+
+    team: TeamGetOut
+    children: Children
+    workshops: Workshops
+    attendance: list[list[str | None]] = Field(
+        description="Attendance of child i to workshop j at attendance[i][j], "
+        "null if the child was not registered for the workshop",
+        examples=[[["present", "absent"], ["cancelled", None]]],
+    )
+
+
 class Attendance(BaseModel):
     """Model for adding attendance to a workshop, part
     of the WorkshopPostIn payload."""
@@ -260,7 +294,7 @@ class TeamPatchWorkshopIn(BaseModel):
         return v
 
 
-class _TeamPatchWorkshopIn(BaseModel):
+class _TeamPatchWorkshopIn(BaseModel, _LastUpdatedAtPropertyIn):
     """Internal model for updating a workshop."""
 
     date: datetime.date = Field(
@@ -272,7 +306,7 @@ class _TeamPatchWorkshopIn(BaseModel):
     team_id: int = Field(description="Team ID")
 
 
-class _TeamPatchAttendancePerChildIn(Attendance):
+class _TeamPatchAttendancePerChildIn(Attendance, _LastUpdatedAtPropertyIn):
     """Internal model for updating attendance of workshop."""
 
     workshop_id: int
@@ -1,14 +1,32 @@
 """Base repository for database repositories."""
 
+import logging
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Generic, TypeVar
 
 from core import exceptions
 from core.database.session import SessionDependency
-from sqlalchemy import and_, delete
+from sqlalchemy import and_, delete, exists, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import SQLModel
 
 Model = TypeVar("Model", bound=SQLModel)
 
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of a unique violation in Postgres
+UNIQUE_VIOLATION = "23505"
+
+
+def _is_unique_violation(exc: IntegrityError) -> bool:
+    """Whether an integrity error is caused by a unique constraint,
+    rather than e.g. a foreign key or not null constraint."""
+    if getattr(exc.orig, "pgcode", None) == UNIQUE_VIOLATION:
+        return True
+    # SQLite, which is used in the tests
+    return "UNIQUE constraint failed" in str(exc.orig)
+
 
 class BaseRepository(Generic[Model]):
     """Generic repository template metaclass for all repositories that
@@ -16,26 +34,81 @@ class BaseRepository(Generic[Model]):
     operations as well as custom queries."""
 
     _model: type[Model]
+    # raised when a create or update violates a unique constraint of the table
+    _already_exists_error: type[exceptions.BaseAPIException] = (
+        exceptions.ItemAlreadyExistsError
+    )
+    # detail of the error, without the constraint and values that the
+    # database reports, which should not be shown to clients
+    _already_exists_detail: str = "Item already exists"
 
     def __init__(self, session: SessionDependency):
         self._session: SessionDependency = session
 
-    def create(self, obj: Model) -> Model:
+    def create(self, obj: Model, refresh: bool = False) -> Model:
         """
-        Create an object in the database table.
+        Create an object in the database table, in a single INSERT statement.
+        The primary key and columns generated by the database are returned
+        by the statement itself (INSERT .. RETURNING) instead of a refresh.
 
         Args:
             obj (Model): The object to create.
+            refresh (bool, optional): Reload the full record from the database
+                after the insert, e.g. to see changes made by triggers.
+                Defaults to False.
 
         Returns:
             Model: The created object including primary key.
+
+        Raises:
+            BaseAPIException: `_already_exists_error` if the object violates
+                a unique constraint, the transaction is rolled back.
         """
         new_obj = self._model.model_validate(obj)
         self._session.add(new_obj)
-        self._session.flush()
-        self._session.refresh(new_obj)
+        with self._translate_unique_violation():
+            self._session.flush()
+        if refresh:
+            self._session.refresh(new_obj)
         return new_obj
 
+    def create_bulk(self, objs: list) -> list[Model]:
+        """
+        Create many objects in the database table in a single multi-row
+        INSERT .. RETURNING statement, instead of a statement per object.
+        SQLAlchemy splits very large inputs into pages of 1000 rows. SQLite,
+        which is used in the tests, can not return the rows of one statement
+        in order, so there the objects are inserted one by one.
+
+        Args:
+            objs (list): The objects to create.
+
+        Returns:
+            list[Model]: The created objects including primary key,
+                in the order of `objs`.
+
+        Raises:
+            BaseAPIException: `_already_exists_error` if any object violates
+                a unique constraint, none of the objects are created.
+        """
+        if not objs:
+            return []
+        # leave the primary key to the database, and dump every row with the
+        # same columns so that the rows fit in the same statement
+        primary_key = {column.name for column in self._model.__table__.primary_key}
+        rows = [
+            self._model.model_validate(obj).model_dump(exclude=primary_key)
+            for obj in objs
+        ]
+        # render NULLs instead of omitting them, which would split up the rows
+        statement = (
+            insert(self._model)
+            .returning(self._model, sort_by_parameter_order=True)
+            .execution_options(render_nulls=True)
+        )
+        with self._translate_unique_violation():
+            return list(self._session.scalars(statement, rows))
+
     def read(self, object_id: int) -> Model | None:
         """
         Read a record from the database table by primary key,
@@ -60,19 +133,26 @@ class BaseRepository(Generic[Model]):
         objects = self._session.query(self._model).all()
         return objects
 
-    def update(self, object_id: int, obj: Model) -> Model:
+    def update(self, object_id: int, obj: Model, refresh: bool = False) -> Model:
         """
-        Update a record in the database table by primary key.
+        Update a record in the database table by primary key, in a single
+        UPDATE statement. Columns generated by the database are returned by
+        the statement itself (UPDATE .. RETURNING) instead of a refresh.
 
         Args:
             object_id (int): The primary key of the record to update.
             obj (Model): The updated record.
+            refresh (bool, optional): Reload the full record from the database
+                after the update, e.g. to see changes made by triggers.
+                Defaults to False.
 
         Returns:
             Model: The updated record.
 
         Raises:
             exceptions.ItemNotFoundError: If the record is not found.
+            BaseAPIException: `_already_exists_error` if the update violates
+                a unique constraint, the transaction is rolled back.
         """
 
         db_object = self._session.get(self._model, object_id)
@@ -82,10 +162,23 @@ class BaseRepository(Generic[Model]):
         obj_data = obj.model_dump(exclude_unset=True)
         db_object.sqlmodel_update(obj_data)
         self._session.add(db_object)
-        self._session.flush()
-        self._session.refresh(db_object)
+        with self._translate_unique_violation():
+            self._session.flush()
+        if refresh:
+            self._session.refresh(db_object)
         return db_object
 
+    def touch(self, object_id: int) -> None:
+        """Set the `last_updated_at` of a record to now, e.g. when
+        records that belong to it have changed."""
+        statement = (
+            update(self._model)
+            .where(self._model.id == object_id)
+            .values(last_updated_at=datetime.now())
+        )
+        self._session.exec(statement)
+        self._session.flush()
+
     def delete(self, object_id: int) -> None:
         """Delete an object from the table."""
         obj = self._session.get(self._model, object_id)
@@ -94,11 +187,42 @@ class BaseRepository(Generic[Model]):
         self._session.delete(obj)
         self._session.flush()
 
-    def delete_where(self, attr: str, value: str) -> None:
-        """Delete all objects by an attribute matching a value."""
+    def delete_where(self, attr: str, value: str) -> int:
+        """
+        Delete all records with an attribute matching a value,
+        in a single statement without loading the records.
+
+        Args:
+            attr (str): The attribute (column) to filter by.
+            value (str): The value to filter by.
+
+        Returns:
+            int: The number of deleted records.
+        """
         statement = delete(self._model).where(getattr(self._model, attr) == value)
-        self._session.exec(statement)
+        result = self._session.exec(statement)
         self._session.flush()
+        return result.rowcount
+
+    def delete_bulk(self, attr: str, values: list[str]) -> int:
+        """
+        Delete all records with an attribute matching any of the values, in
+        a single statement without loading the records. E.g. delete by a list
+        of primary keys with `delete_bulk("id", ids)`.
+
+        Args:
+            attr (str): The attribute (column) to filter by.
+            values (list[str]): A list of values to filter by.
+
+        Returns:
+            int: The number of deleted records.
+        """
+        if not values:
+            return 0
+        statement = delete(self._model).where(getattr(self._model, attr).in_(values))
+        result = self._session.exec(statement)
+        self._session.flush()
+        return result.rowcount
 
     def where(self, filters: list[tuple[str, str]]) -> list[Model] | None:
         """
@@ -116,6 +240,40 @@ class BaseRepository(Generic[Model]):
         expr = and_(*self._construct_filter(filters))
         return self._session.query(self._model).where(and_(expr)).all()
 
+    def exists_where(self, filters: list[tuple[str, str]]) -> bool:
+        """
+        Check whether any record meets all filters, with an EXISTS query
+        that stops at the first match instead of loading all matches.
+
+        Args:
+            filters (list[tuple[str, str]]): A list of tuples where each tuple
+                contains the column name and the value to filter by.
+
+        Returns:
+            bool: True if at least one record meets the filters.
+        """
+        expr = and_(*self._construct_filter(filters))
+        return self._session.scalar(select(exists().where(expr)))
+
+    def version_where(self, filters: list[tuple[str, str]]) -> tuple:
+        """
+        Get a version of the records that match the filters: the number of
+        records and the most recent `last_updated_at` among them. The version
+        changes whenever a matching record is created, updated or deleted.
+
+        Args:
+            filters (list[tuple[str, str]]): A list of tuples where each tuple
+                contains the column name and the value to filter by.
+
+        Returns:
+            tuple: Number of records and most recent update.
+        """
+        expr = and_(*self._construct_filter(filters))
+        query = select(
+            func.count(self._model.id), func.max(self._model.last_updated_at)
+        ).where(expr)
+        return tuple(self._session.exec(query).one())
+
     def where_in(self, attr: str, values: list[str]) -> list[Model] | None:
         """
         Filter table by list of values for one given column (attribute).
@@ -138,6 +296,23 @@ class BaseRepository(Generic[Model]):
         objects = self._session.exec(query)
         return objects
 
+    @contextmanager
+    def _translate_unique_violation(self):
+        """Translate a unique violation into the domain exception of the
+        repository. Uniqueness is left to the database instead of checking
+        it with a query first, which is both faster and free of races."""
+        try:
+            yield
+        except IntegrityError as exc:
+            if not _is_unique_violation(exc):
+                raise
+            # the session is unusable after a failed flush, within a savepoint
+            # the caller rolls back the savepoint instead of the transaction
+            if not self._session.in_nested_transaction():
+                self._session.rollback()
+            logger.info(f"{self._model.__name__} already exists: {exc.orig}")
+            raise self._already_exists_error(self._already_exists_detail) from exc
+
     def _construct_filter(self, filters: list[tuple[str, str]]) -> list:
         """
         Construct a filter from a list of tuples where each tuple
@@ -125,6 +125,25 @@ class Auth0Repository:
         """
         return self.auth0.users.list()
 
+    @convert_auth0_error
+    def list_user_ids(self, per_page: int = 100) -> set[str]:
+        """
+        Get the IDs of all users in the authorization server, page by page.
+
+        Returns:
+            set: IDs of the users in Auth0.
+
+        """
+        user_ids, page = set(), 0
+        while True:
+            users = self.auth0.users.list(
+                page=page, per_page=per_page, fields=["user_id"], include_totals=False
+            )
+            user_ids.update(user["user_id"] for user in users)
+            if len(users) < per_page:
+                return user_ids
+            page += 1
+
     @convert_auth0_error
     def delete_user(self, user_id: str):
         """
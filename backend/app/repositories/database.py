@@ -1,9 +1,48 @@
 """Repositories for CRUD operations on the database.
 Each table in the database translate to a repository class."""
 
-from core.database import schema
+from datetime import datetime
+from functools import cached_property
+
+from core import exceptions
+from core.database import schema, views
 from repositories._base import BaseRepository
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    distinct,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.orm import selectinload
+
+
+def _role_matches_resource(model):
+    """Join condition between roles and a resource that a role gives access to."""
+    # match both parent and child
+    return or_(
+        # match child paths (Role's path is parent of model's path)
+        schema.Role.resource_path.like(model.resource_path + "/%"),
+        schema.Role.resource_path == model.resource_path,
+        # match parent paths (Model's path is a descendant of Role's path)
+        model.resource_path.like(schema.Role.resource_path + "/%"),
+        model.resource_path == schema.Role.resource_path,
+    )
+
+
+def _team_ids_by_user_access(user_id: str):
+    """Subquery of the IDs of the teams a user has access to by scoped role."""
+    return (
+        select(schema.Team.id)
+        .join(schema.Role, _role_matches_resource(schema.Team))
+        .where(schema.Role.user_id == user_id)
+    )
 
 
 class AttendanceRepository(BaseRepository[schema.Attendance]):
@@ -11,17 +50,81 @@ class AttendanceRepository(BaseRepository[schema.Attendance]):
 
     _model = schema.Attendance
 
+    def read_changed_by_user_access(
+        self, user_id: str, since: datetime | None
+    ) -> list[schema.Attendance]:
+        """Get the attendances of all teams a user has access to by scoped
+        role, that changed since a moment or all of them if it is None."""
+        query = (
+            select(self._model)
+            .join(schema.Workshop, schema.Workshop.id == self._model.workshop_id)
+            .where(schema.Workshop.team_id.in_(_team_ids_by_user_access(user_id)))
+        )
+        if since is not None:
+            query = query.where(self._model.last_updated_at >= since)
+        return self._session.exec(query).scalars().all()
+
+    def count_by_team(self, team_id: int) -> int:
+        """Count the attendance records of all workshops of a team."""
+        query = (
+            select(func.count(self._model.id))
+            .join(schema.Workshop, schema.Workshop.id == self._model.workshop_id)
+            .where(schema.Workshop.team_id == team_id)
+        )
+        return self._session.exec(query).one()
+
+    def read_by_team(self, team_id: int) -> list[tuple[int, int, str]]:
+        """Get the attendances of all workshops of a team as
+        (workshop ID, child ID, attendance) rows, without loading records."""
+        query = (
+            select(
+                self._model.workshop_id, self._model.child_id, self._model.attendance
+            )
+            .join(schema.Workshop, schema.Workshop.id == self._model.workshop_id)
+            .where(schema.Workshop.team_id == team_id)
+        )
+        return self._session.exec(query).all()
+
 
 class ChildRepository(BaseRepository[schema.Child]):
     """Repository to interact with children table."""
 
     _model = schema.Child
+    _already_exists_error = exceptions.ChildAlreadyExistsError
+    _already_exists_detail = "A child with this name already exists in the team"
+
+    def read_changed_by_user_access(
+        self, user_id: str, since: datetime | None
+    ) -> list[schema.Child]:
+        """Get the children of all teams a user has access to by scoped
+        role, that changed since a moment or all of them if it is None."""
+        query = select(self._model).where(
+            self._model.team_id.in_(_team_ids_by_user_access(user_id))
+        )
+        if since is not None:
+            query = query.where(self._model.last_updated_at >= since)
+        return self._session.exec(query).scalars().all()
+
+    def read_names_by_team(
+        self, team_id: int, names: list[tuple[str, str]]
+    ) -> set[tuple[str, str]]:
+        """Get which of the (first name, last name) pairs are taken
+        in a team, in one query on the unique constraint."""
+        if not names:
+            return set()
+        query = select(self._model.first_name, self._model.last_name).where(
+            self._model.team_id == team_id,
+            tuple_(self._model.first_name, self._model.last_name).in_(names),
+        )
+        return {tuple(row) for row in self._session.exec(query).all()}
 
 
 class CommunityRepository(BaseRepository[schema.Community]):
     """Repository to interact with Communities table."""
 
     _model = schema.Community
+    _already_exists_error = exceptions.CommunityAlreadyExistsError
+    _already_exists_detail = "A community with this name already exists"
 
     def read_all_by_user_access(
         self, user_id: str, filters: list[tuple[str, str]]
@@ -34,15 +137,7 @@ class CommunityRepository(BaseRepository[schema.Community]):
             .distinct(self._model.id)
             .join(
                 schema.Role,
-                # match both parent and child
-                or_(
-                    # match child paths (Role's path is parent of model's path)
-                    schema.Role.resource_path.like(self._model.resource_path + "/%"),
-                    schema.Role.resource_path == self._model.resource_path,
-                    # match parent paths (Model's path is a descendant of Role's path)
-                    self._model.resource_path.like(schema.Role.resource_path + "/%"),
-                    self._model.resource_path == schema.Role.resource_path,
-                ),
+                _role_matches_resource(self._model),
             )
             .where(schema.Role.user_id == user_id)
         )
@@ -57,11 +152,128 @@ class CommunityRepository(BaseRepository[schema.Community]):
         # so we need to get the first index value of each
         return [r[0] for r in results]
 
+    def version_by_user_access(
+        self, user_id: str, filters: list[tuple[str, str]]
+    ) -> tuple:
+        """Get the number of communities a user has access to and
+        their most recent update, optionally with a WHERE clause."""
+        query = (
+            select(
+                func.count(distinct(self._model.id)),
+                func.max(self._model.last_updated_at),
+            )
+            .join(schema.Role, _role_matches_resource(self._model))
+            .where(schema.Role.user_id == user_id)
+        )
+        if filters:
+            query = query.where(and_(*self._construct_filter(filters)))
+        return tuple(self._session.exec(query).one())
+
+
+class IdempotencyKeyRepository(BaseRepository[schema.IdempotencyKey]):
+    """Repository to interact with idempotency keys table."""
+
+    _model = schema.IdempotencyKey
+
+    def read_by_key(self, user_id: str, key: str) -> schema.IdempotencyKey | None:
+        """Get the record of the idempotency key of a user, in one query on
+        the unique constraint."""
+        query = select(self._model).where(
+            self._model.user_id == user_id, self._model.key == key
+        )
+        return self._session.exec(query).scalars().first()
+
+    def claim(
+        self, user_id: str, key: str, request_hash: str, since: datetime
+    ) -> schema.IdempotencyKey | None:
+        """Claim the idempotency key of a user for a request, by staging a
+        record without a response on the unique constraint, which is then
+        committed along with the changes of the request. A concurrent request
+        with the same key waits for the transaction of the claim in Postgres,
+        and then finds the key claimed.
+
+        Returns:
+            schema.IdempotencyKey | None: The record of an earlier request
+                with the key, recorded since a moment, or None if the key
+                was claimed for this request.
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was used for another request.
+            IdempotencyKeyInProgressError: If an earlier request with
+                the key has not recorded its response yet.
+        """
+        record = self.read_by_key(user_id=user_id, key=key)
+        if record is not None and record.created_at < since:
+            # expired, but not purged yet
+            self._session.delete(record)
+            self._session.flush()
+            record = None
+        if record is None:
+            try:
+                self.create(
+                    {"user_id": user_id, "key": key, "request_hash": request_hash}
+                )
+                return None
+            except exceptions.ItemAlreadyExistsError:
+                # claimed by a concurrent request
+                record = self.read_by_key(user_id=user_id, key=key)
+
+        if record is not None and record.request_hash != request_hash:
+            raise exceptions.IdempotencyKeyReusedError(
+                f"Idempotency key {key} was used for another request"
+            )
+        if record is None or record.status_code is None:
+            raise exceptions.IdempotencyKeyInProgressError(
+                f"Request with idempotency key {key} is in progress"
+            )
+        return record
+
+    def complete(
+        self, user_id: str, key: str, request_hash: str, status_code: int, response: str
+    ) -> None:
+        """Record the response to the request that claimed an idempotency key
+        of a user. A claim that was rolled back along with the changes of a
+        failed request is made again.
+
+        Raises:
+            ItemAlreadyExistsError: If a concurrent request claimed the key
+                after the claim of this request was rolled back.
+        """
+        record = self.read_by_key(user_id=user_id, key=key)
+        if record is None:
+            self.create(
+                {
+                    "user_id": user_id,
+                    "key": key,
+                    "request_hash": request_hash,
+                    "status_code": status_code,
+                    "response": response,
+                }
+            )
+        elif record.request_hash == request_hash and record.status_code is None:
+            record.status_code = status_code
+            record.response = response
+            self._session.flush()
+
+    def delete_older_than(self, moment: datetime) -> int:
+        """Delete the responses that were recorded before a moment,
+        in a single statement.
+
+        Returns:
+            int: The number of deleted responses.
+        """
+        statement = delete(self._model).where(self._model.created_at < moment)
+        result = self._session.exec(statement)
+        self._session.flush()
+        return result.rowcount
+
 
 class ImplementingPartnerRepository(BaseRepository[schema.ImplementingPartner]):
     """Repository to interact with Implementing Partner tables."""
 
     _model = schema.ImplementingPartner
+    _already_exists_error = exceptions.ImplementingPartnerAlreadyExistsError
+    _already_exists_detail = "An implementing partner with this name already exists"
 
     def read_all_by_user_access(self, user_id: str) -> list:
         """Get all implementing partners but only the ones a user has access to
@@ -71,15 +283,7 @@ class ImplementingPartnerRepository(BaseRepository[schema.ImplementingPartner]):
             .distinct(self._model.id)
             .join(
                 schema.Role,
-                # match both parent and child
-                or_(
-                    # match child paths (Role's path is parent of model's path)
-                    schema.Role.resource_path.like(self._model.resource_path + "/%"),
-                    schema.Role.resource_path == self._model.resource_path,
-                    # match parent paths (Model's path is a descendant of Role's path)
-                    self._model.resource_path.like(schema.Role.resource_path + "/%"),
-                    self._model.resource_path == schema.Role.resource_path,
-                ),
+                _role_matches_resource(self._model),
             )
             .where(schema.Role.user_id == user_id)
         )
@@ -97,16 +301,158 @@ class ProgramRepository(BaseRepository[schema.Program]):
     _model = schema.Program
 
 
+class RateLimitRepository(BaseRepository[schema.RateLimit]):
+    """Repository to interact with rate limits table."""
+
+    _model = schema.RateLimit
+
+    def delete_full(self, now: float) -> int:
+        """Delete the buckets that are full by a Unix time, which are the
+        same as missing ones, in a single statement.
+
+        Returns:
+            int: The number of deleted buckets.
+        """
+        statement = delete(self._model).where(self._model.full_at <= now)
+        result = self._session.exec(statement)
+        self._session.flush()
+        return result.rowcount
+
+
+class RecentWriteRepository(BaseRepository[schema.RecentWrite]):
+    """Repository to interact with recent writes table."""
+
+    _model = schema.RecentWrite
+
+    def delete_older_than(self, moment: float) -> int:
+        """Delete the writes recorded before a Unix time, in a single statement.
+
+        Returns:
+            int: The number of deleted writes.
+        """
+        statement = delete(self._model).where(self._model.written_at < moment)
+        result = self._session.exec(statement)
+        self._session.flush()
+        return result.rowcount
+
+
 class RoleRepository(BaseRepository[schema.Role]):
     """Repository to interact with Roles table."""
 
     _model = schema.Role
 
+    def read_ids(self) -> set[int]:
+        """Get the IDs of all roles, without loading the roles."""
+        return set(self._session.exec(select(self._model.id)).scalars())
+
+    def delete_where_user_not_in(self, user_ids: set[str], role_ids: set[int]) -> int:
+        """Delete the roles of all users except the given ones, in a single
+        statement without loading the roles. Only roles among `role_ids`
+        are deleted, e.g. the roles that existed when the users were listed,
+        so that roles of users that were added since are kept.
+
+        Returns:
+            int: The number of deleted roles.
+        """
+        statement = delete(self._model).where(
+            self._model.id.in_(role_ids), self._model.user_id.not_in(user_ids)
+        )
+        result = self._session.exec(statement)
+        self._session.flush()
+        return result.rowcount
+
+
+class StatsRepository:
+    """Repository to read statistics from the reporting views, see
+    core/database/views.py. The views aggregate per team, so that the
+    statistics only cover the teams a user has access to by scoped role."""
+
+    # columns and names of the levels that statistics are grouped by
+    _levels = {
+        "implementing_partner": (
+            views.team_stats.c.implementing_partner_id,
+            schema.ImplementingPartner,
+        ),
+        "community": (views.team_stats.c.community_id, schema.Community),
+    }
+
+    def __init__(self, session):
+        self._session = session
+
+    def read_teams_by_user_access(
+        self, user_id: str, level: str, filters: list[tuple[str, str]]
+    ) -> list[tuple]:
+        """Get the statistics of the teams a user has access to, per implementing
+        partner or community, as (ID, name, teams, active teams, completed teams,
+        children) rows.
+
+        Args:
+            level (str): `implementing_partner` or `community`.
+            filters (list[tuple[str, str]]): Columns of the view and values
+                to filter the teams on, e.g. the implementing partner.
+        """
+        stats = views.team_stats.c
+        group_column, group_model = self._levels[level]
+        query = (
+            select(
+                group_column,
+                group_model.name,
+                func.count(stats.team_id),
+                func.sum(case((stats.is_active, 1), else_=0)),
+                func.sum(
+                    case((stats.progress >= len(schema.DefaultProgram), 1), else_=0)
+                ),
+                func.sum(stats.children),
+            )
+            .join(group_model, group_model.id == group_column)
+            .where(*self._where(user_id, filters))
+            .group_by(group_column, group_model.name)
+            .order_by(group_model.name)
+        )
+        return self._session.exec(query).all()
+
+    def read_workshops_by_user_access(
+        self, user_id: str, level: str, filters: list[tuple[str, str]]
+    ) -> list[tuple]:
+        """Get the attendance of the workshops of the teams a user has access to,
+        per implementing partner or community and workshop number, as (ID,
+        workshop number, teams, attendances, present) rows."""
+        stats, workshop_stats = views.team_stats.c, views.workshop_stats.c
+        group_column, _ = self._levels[level]
+        query = (
+            select(
+                group_column,
+                workshop_stats.workshop_number,
+                func.count(workshop_stats.team_id),
+                func.sum(workshop_stats.attendances),
+                func.sum(workshop_stats.present),
+            )
+            .join(views.workshop_stats, workshop_stats.team_id == stats.team_id)
+            .where(*self._where(user_id, filters))
+            .group_by(group_column, workshop_stats.workshop_number)
+            .order_by(group_column, workshop_stats.workshop_number)
+        )
+        return self._session.exec(query).all()
+
+    def refresh(self) -> bool:
+        """Refresh the materialized views, see `views.refresh_views`."""
+        return views.refresh_views(self._session.connection())
+
+    def _where(self, user_id: str, filters: list[tuple[str, str]]) -> list:
+        """Conditions on the teams in the view that a user has access to."""
+        stats = views.team_stats.c
+        role_exists = exists().where(
+            schema.Role.user_id == user_id, _role_matches_resource(stats)
+        )
+        return [role_exists, *[stats[attr] == value for attr, value in filters]]
+
 
 class TeamRepository(BaseRepository[schema.Team]):
     """Repository to interact with Team table."""
 
     _model = schema.Team
+    _already_exists_error = exceptions.TeamAlreadyExistsError
+    _already_exists_detail = "A team with this name already exists"
 
     def read_all_by_user_access(
         self, user_id: str, filters: list[tuple[str, str]]
@@ -118,17 +464,11 @@ class TeamRepository(BaseRepository[schema.Team]):
             .distinct(self._model.id)
             .join(
                 schema.Role,
-                # match both parent and child
-                or_(
-                    # match child paths (Role's path is parent of model's path)
-                    schema.Role.resource_path.like(self._model.resource_path + "/%"),
-                    schema.Role.resource_path == self._model.resource_path,
-                    # match parent paths (Model's path is a descendant of Role's path)
-                    self._model.resource_path.like(schema.Role.resource_path + "/%"),
-                    self._model.resource_path == schema.Role.resource_path,
-                ),
+                _role_matches_resource(self._model),
             )
             .where(schema.Role.user_id == user_id)
+            # communities are part of every team listing, load them in one go
+            .options(selectinload(self._model.community))
         )
 
         if filters:
@@ -140,11 +480,112 @@ class TeamRepository(BaseRepository[schema.Team]):
         # so we need to get the first index value of each
         return [r[0] for r in self._session.exec(query).all()]
 
+    def version_by_user_access(
+        self, user_id: str, filters: list[tuple[str, str]]
+    ) -> tuple:
+        """Get the number of teams a user has access to and the most
+        recent update of those teams and of their communities."""
+        query = (
+            select(
+                func.count(distinct(self._model.id)),
+                func.max(self._model.last_updated_at),
+                func.max(schema.Community.last_updated_at),
+            )
+            .join(schema.Community, schema.Community.id == self._model.community_id)
+            .join(schema.Role, _role_matches_resource(self._model))
+            .where(schema.Role.user_id == user_id)
+        )
+        if filters:
+            query = query.where(and_(*self._construct_filter(filters)))
+        return tuple(self._session.exec(query).one())
+
+    def read_changed_by_user_access(
+        self, user_id: str, since: datetime | None
+    ) -> list[schema.Team]:
+        """Get all teams a user has access to by scoped role, that
+        changed since a moment or all of them if it is None."""
+        query = select(self._model).where(
+            self._model.id.in_(_team_ids_by_user_access(user_id))
+        )
+        if since is not None:
+            query = query.where(self._model.last_updated_at >= since)
+        return self._session.exec(query).scalars().all()
+
+
+class TombstoneRepository(BaseRepository[schema.Tombstone]):
+    """Repository to interact with tombstones table."""
+
+    _model = schema.Tombstone
+
+    def create_for_teams(self, filters: list[tuple[str, str]]) -> int:
+        """Record tombstones of the teams that meet the filters, in a single
+        INSERT .. SELECT statement. Call this before deleting the teams.
+
+        Returns:
+            int: The number of recorded tombstones.
+        """
+        team = schema.Team
+        query = select(
+            literal("team"), team.id, team.resource_path, literal(datetime.now())
+        ).where(*[getattr(team, attr) == value for attr, value in filters])
+        return self._insert_from(query)
+
+    def create_for_children(self, filters: list[tuple[str, str]]) -> int:
+        """Record tombstones of the children that meet the filters, in a single
+        INSERT .. SELECT statement. Call this before deleting the children.
+
+        Returns:
+            int: The number of recorded tombstones.
+        """
+        child, team = schema.Child, schema.Team
+        query = (
+            select(
+                literal("child"), child.id, team.resource_path, literal(datetime.now())
+            )
+            .join(team, team.id == child.team_id)
+            .where(*[getattr(child, attr) == value for attr, value in filters])
+        )
+        return self._insert_from(query)
+
+    def read_by_user_access(
+        self, user_id: str, since: datetime
+    ) -> list[schema.Tombstone]:
+        """Get the tombstones of resources a user has access to by
+        scoped role, that were deleted since a moment."""
+        role_exists = exists().where(
+            schema.Role.user_id == user_id, _role_matches_resource(self._model)
+        )
+        query = select(self._model).where(self._model.deleted_at >= since, role_exists)
+        return self._session.exec(query).scalars().all()
+
+    def delete_older_than(self, moment: datetime) -> int:
+        """Delete the tombstones of resources that were deleted before
+        a moment, in a single statement.
+
+        Returns:
+            int: The number of deleted tombstones.
+        """
+        statement = delete(self._model).where(self._model.deleted_at < moment)
+        result = self._session.exec(statement)
+        self._session.flush()
+        return result.rowcount
+
+    def _insert_from(self, query) -> int:
+        """Insert the rows of a query of resource type, ID, path and deletion."""
+        statement = insert(self._model).from_select(
+            ["resource_type", "resource_id", "resource_path", "deleted_at"], query
+        )
+        result = self._session.exec(statement)
+        self._session.flush()
+        return result.rowcount
+
 
 class WorkshopRepository(BaseRepository[schema.Workshop]):
     """Repository to interact with Workshop table."""
 
     _model = schema.Workshop
+    _already_exists_error = exceptions.WorkshopExistsError
+    _already_exists_detail = "A workshop with this number already exists for the team"
 
     # TODO ideally below method should pass 0 if a team has no workshop yet
     # also saves us ugly list comprehesions later
@@ -170,18 +611,78 @@ class WorkshopRepository(BaseRepository[schema.Workshop]):
         result_dict = {team_id: workshop_number for team_id, workshop_number in results}
         return result_dict
 
+    def read_changed_by_user_access(
+        self, user_id: str, since: datetime | None
+    ) -> list[schema.Workshop]:
+        """Get the workshops of all teams a user has access to by scoped
+        role, that changed since a moment or all of them if it is None."""
+        query = select(self._model).where(
+            self._model.team_id.in_(_team_ids_by_user_access(user_id))
+        )
+        if since is not None:
+            query = query.where(self._model.last_updated_at >= since)
+        return self._session.exec(query).scalars().all()
+
 
 class DatabaseRepositories:
     """Container class for all repositories
     that can be injected into services to gain
-    access to all tables in the database."""
+    access to all tables in the database.
+
+    Repositories are created lazily on first access, so a request
+    only pays for the repositories it actually uses."""
 
     def __init__(self, session):
-        self.attendances = AttendanceRepository(session=session)
-        self.children = ChildRepository(session=session)
-        self.communities = CommunityRepository(session=session)
-        self.implementing_partners = ImplementingPartnerRepository(session=session)
-        self.programs = ProgramRepository(session=session)
-        self.roles = RoleRepository(session=session)
-        self.teams = TeamRepository(session=session)
-        self.workshops = WorkshopRepository(session=session)
+        self._session = session
+
+    @cached_property
+    def attendances(self) -> AttendanceRepository:
+        return AttendanceRepository(session=self._session)
+
+    @cached_property
+    def children(self) -> ChildRepository:
+        return ChildRepository(session=self._session)
+
+    @cached_property
+    def communities(self) -> CommunityRepository:
+        return CommunityRepository(session=self._session)
+
+    @cached_property
+    def idempotency_keys(self) -> IdempotencyKeyRepository:
+        return IdempotencyKeyRepository(session=self._session)
+
+    @cached_property
+    def implementing_partners(self) -> ImplementingPartnerRepository:
+        return ImplementingPartnerRepository(session=self._session)
+
+    @cached_property
+    def programs(self) -> ProgramRepository:
+        return ProgramRepository(session=self._session)
+
+    @cached_property
+    def rate_limits(self) -> RateLimitRepository:
+        return RateLimitRepository(session=self._session)
+
+    @cached_property
+    def recent_writes(self) -> RecentWriteRepository:
+        return RecentWriteRepository(session=self._session)
+
+    @cached_property
+    def roles(self) -> RoleRepository:
+        return RoleRepository(session=self._session)
+
+    @cached_property
+    def stats(self) -> StatsRepository:
+        return StatsRepository(session=self._session)
+
+    @cached_property
+    def teams(self) -> TeamRepository:
+        return TeamRepository(session=self._session)
+
+    @cached_property
+    def tombstones(self) -> TombstoneRepository:
+        return TombstoneRepository(session=self._session)
+
+    @cached_property
+    def workshops(self) -> WorkshopRepository:
+        return WorkshopRepository(session=self._session)
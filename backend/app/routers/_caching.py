@@ -0,0 +1,130 @@
+"""HTTP caching of read endpoints with ETag and If-None-Match headers."""
+
+import hashlib
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from core.cache import ResponseCache, user_tag
+from fastapi import Request, Response, status
+from routers._responses import APIJSONResponse
+
+# responses depend on the roles of the caller, so they may only be
+# stored by the client and have to be revalidated on every use
+DEFAULT_CACHE_CONTROL = "private, no-cache"
+
+
+class ETag:
+    """Conditional GET handling for a single request.
+
+    The ETag is derived from a version of the data that an endpoint
+    returns, e.g. the number of records and their latest `last_updated_at`,
+    and the scope of the user. Since the version is cheap to query, a
+    client that already has the latest response gets a `304 Not Modified`
+    without the data being loaded or serialized."""
+
+    def __init__(self, request: Request, response: Response, cache_control: str):
+        self._request = request
+        self._response = response
+        self.cache_control = cache_control
+        self.value: str | None = None
+        self._user_id: str | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """Caching headers to send with the response."""
+        headers = {"Cache-Control": self.cache_control}
+        if self.value:
+            headers["ETag"] = self.value
+        return headers
+
+    def matches(self, current_user: Any, version: Any) -> bool:
+        """Compute the ETag of the response and check whether the
+        client already has it. The caching headers are set on the
+        response of the endpoint as well.
+
+        Args:
+            current_user (CurrentUser): The user making the request.
+            version (Any): Hashable version of the data of the endpoint.
+
+        Returns:
+            bool: True if the client's copy of the response is still valid.
+        """
+        parts = (
+            self._request.url.path,
+            sorted(self._request.query_params.multi_items()),
+            self._get_scope(current_user),
+            version,
+        )
+        self._user_id = getattr(current_user, "user_id", None)
+        digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+        self.value = f'"{digest}"'
+        self._response.headers.update(self.headers)
+
+        if_none_match = self._request.headers.get("if-none-match")
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses the weak comparison, so ignore W/ prefixes
+        etags = [etag.strip().removeprefix("W/") for etag in if_none_match.split(",")]
+        return self.value in etags
+
+    def not_modified(self) -> Response:
+        """Empty response telling the client to use its cached copy."""
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers)
+
+    def cached_response(
+        self,
+        cache: ResponseCache,
+        tags: Iterable[str],
+        get_content: Callable[[], Any],
+    ) -> Response:
+        """Response with the caching headers, with the body rendered
+        from `get_content` or taken from the response cache.
+
+        Bodies are cached by ETag, which covers the scope of the user
+        and the version of the data: a body is never served to a user
+        whose roles have changed since it was rendered, nor after the
+        data has changed, even if this worker missed the invalidation."""
+        body = cache.get(self.value)
+        if body is not None:
+            return Response(
+                content=body, media_type="application/json", headers=self.headers
+            )
+
+        response = APIJSONResponse(content=get_content(), headers=self.headers)
+        cache.set(self.value, response.body, tags=[*tags, user_tag(self._user_id)])
+        return response
+
+    @staticmethod
+    def _get_scope(current_user: Any) -> tuple:
+        """Everything about the user that changes what they can see."""
+        if current_user is None:
+            return ()
+        roles = sorted(
+            (role.name, role.level, role.resource_path) for role in current_user.roles
+        )
+        return current_user.user_id, roles, sorted(current_user.permissions)
+
+
+class ETagHandler:
+    """FastAPI dependency for conditional GET requests, with
+    a `Cache-Control` header that is configurable per route.
+
+    ```
+    @router.get("")
+    async def get_items(etag: Annotated[ETag, Depends(ETagHandler())]):
+        version = await service.run_in_pool(service.get_all_version)
+        if etag.matches(service.current_user, version):
+            return etag.not_modified()
+        ...
+    ```
+    """
+
+    def __init__(self, cache_control: str = DEFAULT_CACHE_CONTROL):
+        self.cache_control = cache_control
+
+    def __call__(self, request: Request, response: Response) -> ETag:
+        return ETag(
+            request=request, response=response, cache_control=self.cache_control
+        )
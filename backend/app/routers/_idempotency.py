@@ -0,0 +1,111 @@
+"""Idempotent write endpoints with an Idempotency-Key header."""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Annotated
+
+from core import exceptions
+from fastapi import Header, Request, Response
+from services._base import BaseService
+
+# header that marks a response as the replay of an earlier response
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+logger = logging.getLogger(__name__)
+
+
+class Idempotency:
+    """Idempotency key handling for a single request.
+
+    Clients that retry a write, e.g. after a timeout, send the same
+    `Idempotency-Key` header with every attempt. The first attempt claims
+    the key in the transaction of its changes and records its response, and
+    later attempts get the response back without the request being validated
+    or applied again, or a `409 Conflict` while the first is in progress.
+    Server errors are not recorded, so that a retry after one is applied
+    again, unless its changes were committed already."""
+
+    def __init__(self, request: Request, key: str | None, body: bytes):
+        self.key = key
+        parts = (request.method, request.url.path, body)
+        self.request_hash = hashlib.sha256(repr(parts).encode()).hexdigest()
+
+    async def claim(self, service: BaseService) -> Response | None:
+        """Claim the key for the request, in the transaction of the service,
+        so that the key is only taken once the changes of the request are
+        committed. Does nothing if the request has no key.
+
+        Returns:
+            Response | None: The recorded response to an earlier request with
+                the same key, or None if the request should be handled.
+
+        Raises:
+            IdempotencyKeyReusedError: If the key was used for another request.
+            IdempotencyKeyInProgressError: If an earlier request with the key
+                is still in progress.
+        """
+        if self.key is None:
+            return None
+        since = datetime.now() - timedelta(
+            hours=service.settings.IDEMPOTENCY_KEY_RETENTION_HOURS
+        )
+        record = await service.run_in_pool(
+            service.database.idempotency_keys.claim,
+            user_id=service.current_user.user_id,
+            key=self.key,
+            request_hash=self.request_hash,
+            since=since,
+        )
+        if record is None:
+            return None
+        logger.info(f"Replaying the response to idempotency key {self.key}")
+        return Response(
+            content=record.response,
+            status_code=record.status_code,
+            media_type="application/json",
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    async def save(self, service: BaseService, response: Response) -> Response:
+        """Record the response to the request if it has a key, and return it."""
+        if self.key is not None and response.status_code < 500:
+            await service.run_in_pool(self._save, service, response)
+        return response
+
+    def _save(self, service: BaseService, response: Response) -> None:
+        """Record the response on the claimed key, in a transaction after the
+        one of the request, unless a concurrent request took the key first."""
+        try:
+            service.database.idempotency_keys.complete(
+                user_id=service.current_user.user_id,
+                key=self.key,
+                request_hash=self.request_hash,
+                status_code=response.status_code,
+                response=response.body.decode(),
+            )
+            service.commit()
+        except exceptions.ItemAlreadyExistsError:
+            logger.warning(f"Idempotency key {self.key} was claimed by another request")
+
+
+async def get_idempotency(
+    request: Request,
+    idempotency_key: Annotated[str | None, Header(max_length=255)] = None,
+) -> Idempotency:
+    """FastAPI dependency for idempotent write requests.
+
+    ```
+    @router.post("")
+    async def post_item(idempotency: Annotated[Idempotency, Depends(get_idempotency)]):
+        try:
+            if replayed := await idempotency.claim(service):
+                return replayed
+            data = await service.run_in_pool(service.create, item)
+            response = APIJSONResponse(status_code=201, content=APIResponse(data=data))
+        except ...
+        return await idempotency.save(service, response)
+    ```
+    """
+    # the body was already read to parse the payload, so this is not read twice
+    return Idempotency(request=request, key=idempotency_key, body=await request.body())
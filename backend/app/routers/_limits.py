@@ -0,0 +1,83 @@
+"""Rate limiting and load shedding of the API routes, see core/ratelimit.py."""
+
+import logging
+from typing import Annotated, Any
+
+from core import exceptions
+from core.auth import BearerTokenHandlerInst
+from core.database.session import READ_METHODS, get_engine, get_read_engine
+from core.metrics import metrics
+from core.ratelimit import get_rate_limit_store, in_flight, pool_exhausted
+from core.settings import SettingsDependency
+from core.threadpool import get_thread_pool
+from fastapi import Depends, Request
+
+logger = logging.getLogger(__name__)
+
+
+async def limit_in_flight(request: Request, settings: SettingsDependency):
+    """FastAPI dependency that rejects a request with a `503 Service Unavailable`
+    while the worker is saturated, so that a client backs off instead of
+    making every request of the worker wait for a connection. The worker is
+    saturated while every database connection that the request would use is
+    checked out and calls wait for a thread, e.g. because the database is
+    slow, or while it handles `MAX_IN_FLIGHT_REQUESTS` other requests."""
+    # sub-requests of a batch request are part of the batch in flight
+    if hasattr(request.state, "session"):
+        yield
+        return
+    if get_thread_pool(settings).waiting:
+        is_read = request.method in READ_METHODS
+        engine = get_read_engine() if is_read else get_engine()
+        if pool_exhausted(engine, settings):
+            metrics.increment("ratelimit_shed_total")
+            raise exceptions.ServiceOverloadedError(
+                "All database connections are in use",
+                retry_after=settings.SHED_RETRY_AFTER,
+            )
+    if not in_flight.enter(settings.MAX_IN_FLIGHT_REQUESTS):
+        metrics.increment("ratelimit_shed_total")
+        raise exceptions.ServiceOverloadedError(
+            f"{settings.MAX_IN_FLIGHT_REQUESTS} requests are in flight",
+            retry_after=settings.SHED_RETRY_AFTER,
+        )
+    try:
+        yield
+    finally:
+        in_flight.leave()
+
+
+async def rate_limit(
+    request: Request,
+    settings: SettingsDependency,
+    current_user: Annotated[Any, Depends(BearerTokenHandlerInst)],
+):
+    """FastAPI dependency that rejects a request with a `429 Too Many Requests`
+    if the user made more than `RATE_LIMIT_BURST` requests to the route at
+    once, or more than `RATE_LIMIT_PER_SECOND` requests per second since."""
+    if not settings.RATE_LIMIT_PER_SECOND:
+        return
+    # the path of the route rather than of the request, so that
+    # e.g. every team counts towards the same limit
+    route = f"{request.method} {request.scope['route'].path}"
+    user_id = getattr(current_user, "user_id", None) or request.client.host
+    key = f"{user_id}:{route}"
+
+    store = get_rate_limit_store(settings)
+    args = (key, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+    if store.blocking:
+        retry_after = await get_thread_pool(settings).run(store.acquire, *args)
+    else:
+        retry_after = store.acquire(*args)
+    if retry_after:
+        metrics.increment("ratelimit_limited_total", route=route)
+        logger.warning(f"Rate limited {user_id} on {route}")
+        raise exceptions.RateLimitExceededError(
+            f"Rate limit of {settings.RATE_LIMIT_PER_SECOND} requests "
+            f"per second exceeded on {route}",
+            retry_after=retry_after,
+        )
+
+
+# dependencies of the routers of the API, see main.py
+LIMITS = [Depends(limit_in_flight), Depends(rate_limit)]
@@ -3,8 +3,11 @@ included on every endpoint."""
 
 from typing import Any
 
+import orjson
 from fastapi import status
+from fastapi.responses import ORJSONResponse
 from models.generic import APIResponse
+from pydantic import BaseModel
 
 DEFAULT_RESPONSES = {
     status.HTTP_401_UNAUTHORIZED: {
@@ -23,3 +26,22 @@ def with_default_responses(custom_responses: dict[int, dict[str, Any]] = None) -
     if custom_responses is None:
         custom_responses = {}
     return {**DEFAULT_RESPONSES, **custom_responses}
+
+
+def _serialize_model(obj: Any) -> Any:
+    """Fallback for orjson to serialize pydantic models."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type {type(obj).__name__} is not JSON serializable")
+
+
+class APIJSONResponse(ORJSONResponse):
+    """Default JSON response of the API, rendered with orjson.
+
+    Content can be an `APIResponse` (or any pydantic model) directly: it is
+    dumped once by pydantic-core and encoded by orjson. Returning this response
+    from an endpoint skips FastAPI's second validation of the response model,
+    so only do so when the data already consists of validated output models."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_serialize_model)
@@ -0,0 +1,125 @@
+import logging
+from typing import Annotated, Any
+from urllib.parse import urlsplit
+
+import orjson
+from core.auth import BearerTokenHandlerInst
+from core.database.session import SessionDependency
+from fastapi import APIRouter, Depends, Request, status
+from models import batch as models
+from models.generic import APIResponse
+from routers._responses import APIJSONResponse, with_default_responses
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch")
+
+# headers of a sub-response that are returned in the batch response
+RESPONSE_HEADERS = ("etag", "cache-control")
+
+# headers of the batch request that do not apply to its sub-requests
+_REQUEST_HEADERS_EXCLUDED = (b"content-length", b"content-type", b"if-none-match")
+
+
+@router.post(
+    "",
+    summary="Execute several read requests at once",
+    status_code=status.HTTP_200_OK,
+    response_model=APIResponse[models.BatchPostOut],
+    responses=with_default_responses(),
+)
+async def post_batch(
+    request: Request,
+    session: SessionDependency,
+    current_user: Annotated[BearerTokenHandlerInst, Depends(BearerTokenHandlerInst)],
+    batch: models.BatchPostIn,
+):
+    """
+    Execute GET requests to other endpoints in one round trip, e.g. to get
+    a team and its workshops at once. The requests are executed in order,
+    in the same database session and as the same user, and every request
+    gets the response its endpoint would have returned, including a
+    `304 Not Modified` if its If-None-Match header matches.
+
+    **Required scopes**
+    - the scopes of the requested endpoints
+
+    """
+    # sub-requests read the session and user from the request state,
+    # so they are not opened and verified again per sub-request
+    state = {
+        **request.scope.get("state", {}),
+        "session": session,
+        "current_user": current_user,
+    }
+    responses = []
+    for sub_request in batch.requests:
+        responses.append(await _dispatch(request, sub_request, state, session))
+    data = models.BatchPostOut(responses=responses)
+    return APIJSONResponse(content=APIResponse(data=data))
+
+
+async def _dispatch(
+    request: Request,
+    sub_request: models.BatchPostIn.Request,
+    state: dict[str, Any],
+    session: SessionDependency,
+) -> models.BatchPostOut.Response:
+    """Run a sub-request through the application, including its exception
+    handlers and middleware, and collect its response."""
+    url = urlsplit(sub_request.path)
+    headers = [
+        (name, value)
+        for name, value in request.scope["headers"]
+        if name not in _REQUEST_HEADERS_EXCLUDED
+    ]
+    headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in sub_request.headers.items()
+    ]
+    # mirror the prefix of the batch request, the root path may or
+    # may not be part of the path depending on the server
+    prefix = request.scope["path"].removesuffix(router.prefix)
+    scope = {
+        **request.scope,
+        "method": sub_request.method,
+        "path": prefix + url.path,
+        "raw_path": (prefix + url.path).encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "state": state,
+    }
+    for key in ("route", "endpoint", "path_params", "fastapi_astack"):
+        scope.pop(key, None)
+
+    start: dict[str, Any] = {}
+    body = bytearray()
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # unexpected errors are rendered by the exception handlers before
+        # they are re-raised, a failed statement aborts the transaction
+        # though, so roll back to let the next sub-requests run
+        logger.exception(f"Sub-request to {sub_request.path} of a batch failed")
+        session.rollback()
+
+    response_headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in start.get("headers", [])
+        if name.decode("latin-1").lower() in RESPONSE_HEADERS
+    }
+    return models.BatchPostOut.Response(
+        status_code=start.get("status", status.HTTP_500_INTERNAL_SERVER_ERROR),
+        headers=response_headers,
+        body=orjson.loads(body) if body else None,
+    )
@@ -2,9 +2,10 @@ from typing import Annotated
 
 from core import exceptions
 from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
 from models import child as models
 from models.generic import APIResponse
+from routers._idempotency import Idempotency, get_idempotency
+from routers._responses import APIJSONResponse
 from services import ChildService
 
 router = APIRouter(prefix="/children")
@@ -32,12 +33,12 @@ async def get_child(
 
     """
     try:
-        data = child_service.get(child_id)
+        data = await child_service.run_in_pool(child_service.get, child_id)
         return APIResponse(data=data)
     except exceptions.ChildNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -59,11 +60,11 @@ async def get_children(
 
     """
     if community_id:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_501_NOT_IMPLEMENTED,
-            content=APIResponse(message="Not implemented").model_dump(),
+            content=APIResponse(message="Not implemented"),
         )
-    data = child_service.get_all()
+    data = await child_service.run_in_pool(child_service.get_all)
     return APIResponse(data=data)
 
 
@@ -71,32 +72,55 @@ async def get_children(
     "",
     summary="Add a child",
     status_code=status.HTTP_201_CREATED,
-    response_model=APIResponse,
+    response_model=APIResponse[models.ChildGetByIdOut],
 )
 async def add_child(
     child_service: Annotated[ChildService, Depends(ChildService)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
     child: models.ChildPostIn,
 ):
     """
-    Add child to team.
+    Add child to team. Requests with an `Idempotency-Key` header that is
+    already used by an earlier request get the response to that request,
+    so that a retry after a timeout does not fail with a conflict, or a
+    `409 Conflict` while that request is still in progress.
 
     **Required scopes**
     - `children:write`
 
     """
     try:
-        data = child_service.create(child)
-        return APIResponse(data=data)
+        replayed = await idempotency.claim(child_service)
+        if replayed is not None:
+            return replayed
+        data = await child_service.run_in_pool(child_service.create, child)
+        response = APIJSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=APIResponse(
+                data=models.ChildGetByIdOut.model_validate(data, from_attributes=True)
+            ),
+        )
+    except exceptions.IdempotencyKeyInProgressError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.IdempotencyKeyReusedError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
     except exceptions.ChildAlreadyExistsError as exc:
-        return JSONResponse(
+        response = APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.TeamNotFoundError as exc:
-        return JSONResponse(
+        response = APIJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
+    return await idempotency.save(child_service, response)
 
 
 @router.patch(
@@ -118,12 +142,19 @@ async def update_child(
 
     """
     try:
-        data = child_service.update(object_id=child_id, obj=child)
+        data = await child_service.run_in_pool(
+            child_service.update, object_id=child_id, obj=child
+        )
         return APIResponse(data=data)
     except exceptions.ChildNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.ChildAlreadyExistsError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -148,15 +179,17 @@ async def delete_child(
 
     """
     try:
-        data = child_service.delete(object_id=child_id, cascade=cascade)
+        data = await child_service.run_in_pool(
+            child_service.delete, object_id=child_id, cascade=cascade
+        )
         return APIResponse(data=data)
     except exceptions.ChildHasAttendanceError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.ChildNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
@@ -1,11 +1,12 @@
 from typing import Annotated
 
 from core import exceptions
+from core.cache import CacheTag
 from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
 from models import community as models
 from models.generic import APIResponse
-from routers._responses import with_default_responses
+from routers._caching import ETag, ETagHandler
+from routers._responses import APIJSONResponse, with_default_responses
 from services import CommunityService
 
 router = APIRouter(prefix="/communities")
@@ -36,16 +37,17 @@ async def get_community(
 
     """
     try:
-        return APIResponse(data=service.get(community_id))
+        data = await service.run_in_pool(service.get, community_id)
+        return APIResponse(data=data)
     except exceptions.CommunityNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        raise JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -54,27 +56,47 @@ async def get_community(
     summary="List all communities",
     status_code=status.HTTP_200_OK,
     response_model=APIResponse[list[models.CommunityGetOut]],
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"}},
 )
 async def get_communities(
     service: Annotated[CommunityService, Depends(CommunityService)],
+    etag: Annotated[ETag, Depends(ETagHandler())],
     implementing_partner_id: int,
 ):
     """
     List all communities that a user has access to, optionally
-    filtered by Implementing Partner.
+    filtered by Implementing Partner. Returns `304 Not Modified`
+    if the `If-None-Match` header matches the ETag.
 
     **Required scopes**
     - `communities:read`
 
     """
     try:
-        return APIResponse(
-            data=service.get_all(implementing_partner_id=implementing_partner_id)
+        version = await service.run_in_pool(
+            service.get_all_version, implementing_partner_id=implementing_partner_id
+        )
+        if etag.matches(service.current_user, version):
+            return etag.not_modified()
+        return await service.run_in_pool(
+            etag.cached_response,
+            service.response_cache,
+            tags=[CacheTag.communities],
+            get_content=lambda: APIResponse(
+                data=[
+                    models.CommunityGetOut.model_validate(
+                        community, from_attributes=True
+                    )
+                    for community in service.get_all(
+                        implementing_partner_id=implementing_partner_id
+                    )
+                ]
+            ),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        raise JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -103,24 +125,26 @@ async def post_community(
 
     """
     try:
-        data = service.create(
-            obj=community, implementing_partner_id=implementing_partner_id
+        data = await service.run_in_pool(
+            service.create,
+            obj=community,
+            implementing_partner_id=implementing_partner_id,
         )
         return APIResponse(message="Community successfully created!", data=data)
     except exceptions.ImplementingPartnerNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.CommunityAlreadyExistsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        raise JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -133,7 +157,11 @@ async def post_community(
         status.HTTP_404_NOT_FOUND: {
             "model": APIResponse,
             "description": "Community not found",
-        }
+        },
+        status.HTTP_409_CONFLICT: {
+            "model": APIResponse,
+            "description": "Community name already exists",
+        },
     },
 )
 async def update_community(
@@ -149,17 +177,22 @@ async def update_community(
 
     """
     try:
-        data = service.update(community_id, community)
+        data = await service.run_in_pool(service.update, community_id, community)
         return APIResponse(data=data)
     except exceptions.CommunityNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.CommunityAlreadyExistsError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        raise JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -195,19 +228,19 @@ async def delete_community(
 
     """
     try:
-        service.delete(community_id, cascade)
+        await service.run_in_pool(service.delete, community_id, cascade)
     except exceptions.CommunityNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(detail=str(exc), message=exc.message).model_dump(),
+            content=APIResponse(detail=str(exc), message=exc.message),
         )
     except exceptions.CommunityHasTeamsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(detail=str(exc), message=exc.message).model_dump(),
+            content=APIResponse(detail=str(exc), message=exc.message),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(detail=str(exc), message=exc.message).model_dump(),
+            content=APIResponse(detail=str(exc), message=exc.message),
         )
@@ -1,6 +1,8 @@
 from datetime import UTC, datetime
 
 from core.database.session import SessionDependency
+from core.settings import SettingsDependency
+from core.threadpool import get_thread_pool
 from fastapi import APIRouter, HTTPException, status
 from fastapi.responses import JSONResponse
 
@@ -15,10 +17,11 @@ router = APIRouter(prefix="/health")
 )
 async def get_health(
     session: SessionDependency,
+    settings: SettingsDependency,
 ):
     """Health endpoint to ping database."""
     try:
-        session.connection()
+        await get_thread_pool(settings).run(session.connection)
         return JSONResponse(
             status_code=status.HTTP_200_OK,
             content={"status": "ok", "datetime": str(datetime.now(UTC))},
@@ -3,9 +3,9 @@ from typing import Annotated
 from core import exceptions
 from core.auth import BearerTokenHandler, CurrentUser
 from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
 from models import implementing_partner as models
 from models.generic import APIResponse
+from routers._responses import APIJSONResponse
 from services.implementing_partner import ImplementingPartnerService
 
 router = APIRouter(prefix="/implementing_partners")
@@ -24,7 +24,7 @@ async def get_implementing_partners(
     """
     List implementing partners.
     """
-    data = service.get_all()
+    data = await service.run_in_pool(service.get_all)
     return APIResponse(data=data)
 
 
@@ -43,12 +43,12 @@ async def create_implementing_partner(
     Create a new implementing partner.
     """
     try:
-        record = service.create(implementing_partner)
+        record = await service.run_in_pool(service.create, implementing_partner)
         return APIResponse(message=f"Created {record.name}", data=record)
     except exceptions.ImplementingPartnerAlreadyExistsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(detail=exc.detail, message=exc.message).model_dump(),
+            content=APIResponse(detail=exc.detail, message=exc.message),
         )
 
 
@@ -57,21 +57,38 @@ async def create_implementing_partner(
     summary="Delete an implementing partner",
     status_code=status.HTTP_200_OK,
     response_model=APIResponse,
+    responses={
+        status.HTTP_409_CONFLICT: {
+            "model": APIResponse,
+            "description": "Implementing partner has communities and cascade is false.",
+        },
+    },
 )
 async def delete_implementing_partner(
     implementing_partner_id: int,
     current_user: Annotated[CurrentUser, Depends(BearerTokenHandler())],
     service: Annotated[ImplementingPartnerService, Depends(ImplementingPartnerService)],
+    cascade: bool = False,
 ):
     """
     Delete an implementing partner.
+
+    **WARNING**: If cascade is set to true, will delete all communities, teams,
+    workshops, children, and attendances associated with the implementing partner.
     """
     try:
-        return service.delete(implementing_partner_id)
+        return await service.run_in_pool(
+            service.delete, implementing_partner_id, cascade
+        )
     except exceptions.ImplementingPartnerNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content=APIResponse(
                 detail=str(exc), message="Implementing partner not found"
             ),
         )
+    except exceptions.ImplementingPartnerHasCommunitiesError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=APIResponse(detail=str(exc), message=exc.message),
+        )
@@ -0,0 +1,17 @@
+from core.metrics import metrics
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter(prefix="/metrics")
+
+
+@router.get(
+    "",
+    response_class=PlainTextResponse,
+    summary="Metrics",
+    status_code=200,
+)
+async def get_metrics():
+    """Metrics of the worker that handles the request, in the Prometheus
+    text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -2,11 +2,10 @@ import logging
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
 from models import role as models
 from models.generic import APIResponse
 from repositories.database import ImplementingPartnerRepository
-from routers._responses import with_default_responses
+from routers._responses import APIJSONResponse, with_default_responses
 from services import CommunityService, TeamService, UserService
 
 logger = logging.getLogger()
@@ -85,23 +84,25 @@ async def list_resources(
     """
     if level not in user_service.get_role_levels(role=role):
         detail = "Role and level combination not supported."
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content=APIResponse(detail=detail).model_dump(),
+            content=APIResponse(detail=detail),
         )
     if level == models.Level.implementing_partner:
         data = [
             models.RoleResourcesGetOut(resource_id=v.id, resource_name=v.name)
-            for v in implementing_partner_repository.read_all()
+            for v in await user_service.run_in_pool(
+                implementing_partner_repository.read_all
+            )
         ]
     if level == models.Level.community:
         data = [
             models.RoleResourcesGetOut(resource_id=v.id, resource_name=v.name)
-            for v in community_service.get_all()
+            for v in await community_service.run_in_pool(community_service.get_all)
         ]
     if level == models.Level.team:
         data = [
             models.RoleResourcesGetOut(resource_id=v.id, resource_name=v.name)
-            for v in team_service.get_all()
+            for v in await team_service.run_in_pool(team_service.get_all)
         ]
     return APIResponse(data=data)
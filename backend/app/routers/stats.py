@@ -0,0 +1,79 @@
+from typing import Annotated
+
+from core import exceptions
+from fastapi import APIRouter, Depends, status
+from models import stats as models
+from models.generic import APIResponse
+from routers._responses import APIJSONResponse, with_default_responses
+from services import StatsService
+
+router = APIRouter(prefix="/stats")
+
+
+@router.get(
+    "/implementing_partners",
+    summary="Get statistics per implementing partner",
+    status_code=status.HTTP_200_OK,
+    response_model=APIResponse[list[models.StatsGetOut]],
+    responses=with_default_responses(),
+)
+async def get_implementing_partner_stats(
+    service: Annotated[StatsService, Depends(StatsService)],
+):
+    """
+    Get the number of teams, children and completed teams, and the attendance
+    per workshop number, per implementing partner. Only the teams that the
+    user has access to are counted. The statistics are refreshed periodically,
+    so recent changes may not be included yet.
+
+    **Required scopes**
+    - `teams:read`
+    - `workshops:read`
+
+    """
+    data = await service.run_in_pool(service.get_all, level="implementing_partner")
+    return APIJSONResponse(content=APIResponse(data=data))
+
+
+@router.get(
+    "/communities",
+    summary="Get statistics per community",
+    status_code=status.HTTP_200_OK,
+    response_model=APIResponse[list[models.StatsGetOut]],
+    responses=with_default_responses(
+        {
+            status.HTTP_404_NOT_FOUND: {
+                "model": APIResponse,
+                "description": "Implementing partner not found",
+            },
+        }
+    ),
+)
+async def get_community_stats(
+    service: Annotated[StatsService, Depends(StatsService)],
+    implementing_partner_id: int | None = None,
+):
+    """
+    Get the number of teams, children and completed teams, and the attendance
+    per workshop number, per community, optionally of one implementing
+    partner. Only the teams that the user has access to are counted. The
+    statistics are refreshed periodically, so recent changes may not be
+    included yet.
+
+    **Required scopes**
+    - `teams:read`
+    - `workshops:read`
+
+    """
+    try:
+        data = await service.run_in_pool(
+            service.get_all,
+            level="community",
+            implementing_partner_id=implementing_partner_id,
+        )
+        return APIJSONResponse(content=APIResponse(data=data))
+    except exceptions.ImplementingPartnerNotFoundError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
@@ -0,0 +1,79 @@
+from typing import Annotated
+
+from core import exceptions
+from core.database.session import use_primary
+from fastapi import APIRouter, Depends, status
+from models import sync as models
+from models.generic import APIResponse
+from routers._responses import APIJSONResponse, with_default_responses
+from services import SyncService
+
+router = APIRouter(prefix="/sync")
+
+
+@router.get(
+    "",
+    summary="Sync changes since the previous sync",
+    status_code=status.HTTP_200_OK,
+    response_model=APIResponse[models.SyncGetOut],
+    responses=with_default_responses(
+        {
+            status.HTTP_400_BAD_REQUEST: {
+                "model": APIResponse,
+                "description": "Invalid cursor",
+            },
+        }
+    ),
+    # the cursor overlaps with the previous sync by `SYNC_OVERLAP` only, so
+    # changes that a lagging replica misses longer would never be synced
+    dependencies=[Depends(use_primary)],
+)
+async def get_sync(
+    service: Annotated[SyncService, Depends(SyncService)],
+    since: str | None = None,
+):
+    """
+    Get the teams, children, workshops and attendances the user has access
+    to that changed since the previous sync, and the teams and children that
+    were deleted. Pass the `cursor` of the response as `since` in the next
+    sync. Without `since`, or when `full` is true in the response, the device
+    should replace its data with the response instead of merging it.
+
+    **Required scopes**
+    - `teams:read`
+    - `workshops:read`
+
+    """
+    try:
+        data = await service.run_in_pool(service.get_all, since=since)
+        return APIJSONResponse(content=APIResponse(data=data))
+    except exceptions.SyncCursorInvalidError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+
+
+@router.post(
+    "",
+    summary="Submit workshops recorded offline",
+    status_code=status.HTTP_200_OK,
+    response_model=APIResponse[models.SyncPostOut],
+    responses=with_default_responses(),
+)
+async def post_sync(
+    service: Annotated[SyncService, Depends(SyncService)],
+    sync: models.SyncPostIn,
+):
+    """
+    Apply the workshops that a device recorded while offline, in order and
+    in one transaction. Every workshop gets a result with the status code it
+    would get from `POST /teams/:id/workshops`, rejected workshops do not
+    prevent the others from being applied.
+
+    **Required scopes**
+    - `workshops:write`
+
+    """
+    data = await service.run_in_pool(service.create, sync)
+    return APIJSONResponse(content=APIResponse(data=data))
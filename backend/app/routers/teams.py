@@ -1,14 +1,19 @@
+import csv
+import io
 import logging
 from typing import Annotated
 
+import orjson
 from core import exceptions
-from fastapi import APIRouter, Depends
+from core.cache import CacheTag
+from fastapi import APIRouter, Depends, Request
 from fastapi import status as http_status
-from fastapi.responses import JSONResponse
+from models import child as child_models
 from models import team as models
 from models.generic import APIResponse
-from routers._responses import with_default_responses
-from services import TeamService
+from routers._caching import ETag, ETagHandler
+from routers._responses import APIJSONResponse, with_default_responses
+from services import ChildService, TeamService
 
 logger = logging.getLogger()
 
@@ -48,22 +53,22 @@ async def post_team(
 
     """
     try:
-        data = team_service.create(team)
+        data = await team_service.run_in_pool(team_service.create, team)
         return APIResponse(message="Team successfully created!", data=data)
     except exceptions.CommunityNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.TeamAlreadyExistsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -72,27 +77,42 @@ async def post_team(
     response_model=APIResponse[list[models.TeamGetOut]],
     status_code=http_status.HTTP_200_OK,
     summary="Get teams",
-    responses=with_default_responses(),
+    responses=with_default_responses(
+        {http_status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"}}
+    ),
 )
 async def get_teams(
     team_service: Annotated[TeamService, Depends(TeamService)],
+    etag: Annotated[ETag, Depends(ETagHandler())],
     community_id: int = None,
     status: models.TeamStatus = models.TeamStatus.active,
 ):
     """
-    Get list of teams that a user has access to.
+    Get list of teams that a user has access to. Returns
+    `304 Not Modified` if the `If-None-Match` header matches the ETag.
 
     **Required scopes**
     - `teams:read`
 
     """
     try:
-        data = team_service.get_all(community_id=community_id, status=status)
-        return APIResponse(data=data)
+        version = await team_service.run_in_pool(
+            team_service.get_all_version, community_id=community_id, status=status
+        )
+        if etag.matches(team_service.current_user, version):
+            return etag.not_modified()
+        return await team_service.run_in_pool(
+            etag.cached_response,
+            team_service.response_cache,
+            tags=[CacheTag.teams],
+            get_content=lambda: APIResponse(
+                data=team_service.get_all(community_id=community_id, status=status)
+            ),
+        )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -103,6 +123,7 @@ async def get_teams(
     summary="Get team by id",
     responses=with_default_responses(
         {
+            http_status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"},
             http_status.HTTP_404_NOT_FOUND: {
                 "model": APIResponse,
                 "description": "Not found",
@@ -112,27 +133,86 @@ async def get_teams(
 )
 async def get_team(
     team_service: Annotated[TeamService, Depends(TeamService)],
+    etag: Annotated[ETag, Depends(ETagHandler())],
+    team_id: int,
+):
+    """
+    Get a team by ID. Returns `304 Not Modified` if the
+    `If-None-Match` header matches the ETag.
+
+    **Required scopes**
+    - `teams:read`
+
+    """
+    try:
+        version = await team_service.run_in_pool(
+            team_service.get_version, object_id=team_id
+        )
+        if etag.matches(team_service.current_user, version):
+            return etag.not_modified()
+        data = await team_service.run_in_pool(team_service.get, object_id=team_id)
+        return APIJSONResponse(content=APIResponse(data=data), headers=etag.headers)
+    except exceptions.TeamNotFoundError as exc:
+        return APIJSONResponse(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.InsufficientPermissionsError as exc:
+        return APIJSONResponse(
+            status_code=http_status.HTTP_403_FORBIDDEN,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+
+
+@router.get(
+    "/{team_id}/dashboard",
+    response_model=APIResponse[models.TeamGetDashboardOut],
+    status_code=http_status.HTTP_200_OK,
+    summary="Get team with the attendance of all workshops",
+    responses=with_default_responses(
+        {
+            http_status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"},
+            http_status.HTTP_404_NOT_FOUND: {
+                "model": APIResponse,
+                "description": "Not found",
+            },
+        }
+    ),
+)
+async def get_team_dashboard(
+    team_service: Annotated[TeamService, Depends(TeamService)],
+    etag: Annotated[ETag, Depends(ETagHandler())],
     team_id: int,
 ):
     """
-    Get a team by ID.
+    Get a team with its children, its workshops and the attendance of every
+    child to every workshop, i.e. everything the team page shows. Returns
+    `304 Not Modified` if the `If-None-Match` header matches the ETag.
 
     **Required scopes**
     - `teams:read`
+    - `workshops:read`
 
     """
     try:
-        data = team_service.get(object_id=team_id)
-        return APIResponse(data=data)
+        version = await team_service.run_in_pool(
+            team_service.get_dashboard_version, team_id=team_id
+        )
+        if etag.matches(team_service.current_user, version):
+            return etag.not_modified()
+        data = await team_service.run_in_pool(
+            team_service.get_dashboard, team_id=team_id
+        )
+        return APIJSONResponse(content=APIResponse(data=data), headers=etag.headers)
     except exceptions.TeamNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -170,20 +250,148 @@ async def delete_team(
 
     """
     try:
-        msg = team_service.delete(object_id=team_id, cascade=cascade)
+        msg = await team_service.run_in_pool(
+            team_service.delete, object_id=team_id, cascade=cascade
+        )
         return APIResponse(message="Team successfully deleted!", detail=msg)
     except exceptions.TeamHasChildrenError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.TeamNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=http_status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
+
+
+@router.post(
+    "/{team_id}/children/import",
+    response_model=APIResponse[child_models.ChildImportOut],
+    status_code=http_status.HTTP_201_CREATED,
+    summary="Import children into a team",
+    responses=with_default_responses(
+        {
+            http_status.HTTP_400_BAD_REQUEST: {
+                "model": APIResponse[child_models.ChildImportOut],
+                "description": "Invalid import, with the errors per row",
+            },
+            http_status.HTTP_404_NOT_FOUND: {
+                "model": APIResponse,
+                "description": "Not found",
+            },
+            http_status.HTTP_409_CONFLICT: {
+                "model": APIResponse,
+                "description": "Conflict",
+            },
+        }
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": child_models.ChildImportIn.model_json_schema()
+                },
+                "text/csv": {
+                    "schema": {"type": "string"},
+                    "example": "first_name,last_name,age,gender\n"
+                    "Nelson,Mandela,10,male\n",
+                },
+            },
+        }
+    },
+)
+async def import_children(
+    child_service: Annotated[ChildService, Depends(ChildService)],
+    request: Request,
+    team_id: int,
+):
+    """
+    Add many children to a team at once, e.g. at the start of the program.
+    Send the children as JSON, or as CSV with a header row and the
+    `Content-Type: text/csv` header. Either all children are added or,
+    if any row is invalid, none of them and the errors per row are returned.
+
+    **Required scopes**
+    - `children:write`
+
+    """
+    try:
+        rows = _read_import_rows(
+            await request.body(), request.headers.get("content-type", "")
+        )
+        data = await child_service.run_in_pool(
+            child_service.import_children, team_id=team_id, rows=rows
+        )
+        if data.errors:
+            return APIJSONResponse(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                content=APIResponse(
+                    message=exceptions.ChildImportInvalidError.message,
+                    detail=f"{len(data.errors)} rows are invalid, no children added",
+                    data=data,
+                ),
+            )
+        return APIJSONResponse(
+            status_code=http_status.HTTP_201_CREATED,
+            content=APIResponse(
+                message=f"{len(data.created)} children added!", data=data
+            ),
+        )
+    except exceptions.ChildImportInvalidError as exc:
+        return APIJSONResponse(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.TeamNotFoundError as exc:
+        return APIJSONResponse(
+            status_code=http_status.HTTP_404_NOT_FOUND,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.ChildAlreadyExistsError as exc:
+        return APIJSONResponse(
+            status_code=http_status.HTTP_409_CONFLICT,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.InsufficientPermissionsError as exc:
+        return APIJSONResponse(
+            status_code=http_status.HTTP_403_FORBIDDEN,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+
+
+def _read_import_rows(body: bytes, content_type: str) -> list[dict]:
+    """Read the rows of a children import from a CSV or JSON body.
+
+    Raises:
+        ChildImportInvalidError: If the body can not be read.
+    """
+    if content_type.startswith("text/csv"):
+        try:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            # empty cells are missing values, except for names
+            return [
+                {
+                    key.strip(): value
+                    for key, value in row.items()
+                    if key and (value or key.strip() in ("first_name", "last_name"))
+                }
+                for row in reader
+            ]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise exceptions.ChildImportInvalidError(f"Invalid CSV: {exc}")
+
+    try:
+        rows = orjson.loads(body)["children"]
+    except (orjson.JSONDecodeError, KeyError, TypeError) as exc:
+        raise exceptions.ChildImportInvalidError(f"Invalid JSON: {exc}")
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise exceptions.ChildImportInvalidError("Children should be a list of objects")
+    return rows
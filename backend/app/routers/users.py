@@ -3,10 +3,9 @@ from typing import Annotated
 
 from core import exceptions
 from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
 from models import user as models
 from models.generic import APIResponse
-from routers._responses import with_default_responses
+from routers._responses import APIJSONResponse, with_default_responses
 from services import UserService
 
 logger = logging.getLogger(__name__)
@@ -28,7 +27,7 @@ async def me(
     Get the current user.
 
     """
-    data = user_service.me()
+    data = await user_service.run_in_pool(user_service.me)
     return APIResponse(data=data)
 
 
@@ -49,12 +48,12 @@ async def get_users(user_service: Annotated[UserService, Depends(UserService)]):
 
     """
     try:
-        data = user_service.get_all()
+        data = await user_service.run_in_pool(user_service.get_all)
         return APIResponse(data=data)
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -85,17 +84,17 @@ async def get_user_by_id(
 
     """
     try:
-        data = user_service.get(user_id=user_id)
+        data = await user_service.run_in_pool(user_service.get, user_id=user_id)
         return APIResponse(data=data)
     except exceptions.UserNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -132,17 +131,17 @@ async def create_user(
 
     """
     try:
-        data = user_service.create(user)
+        data = await user_service.run_in_pool(user_service.create, user)
         return APIResponse(data=data)
     except exceptions.UserEmailExistsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -174,17 +173,17 @@ async def resend_invite(
 
     """
     try:
-        data = user_service.send_invite(user_id=user_id)
+        data = await user_service.run_in_pool(user_service.send_invite, user_id=user_id)
         return APIResponse(data=data)
     except exceptions.BadRequestError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.UserNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -214,12 +213,12 @@ async def delete_user(
 
     """
     try:
-        msg = user_service.delete(user_id=user_id)
+        msg = await user_service.run_in_pool(user_service.delete, user_id=user_id)
         return APIResponse(message="User deleted successfully", detail=msg)
     except exceptions.UserNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -275,30 +274,32 @@ async def add_role_to_user(
 
     """
     try:
-        data = user_service.add_role(user_id=user_id, role=role)
+        data = await user_service.run_in_pool(
+            user_service.add_role, user_id=user_id, role=role
+        )
         return APIResponse(data=data)
     except exceptions.BadRequestError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except (
         exceptions.ResourceNotFoundError,
         exceptions.UserNotFoundError,
     ) as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.RoleAlreadyExistsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -329,12 +330,12 @@ async def get_roles_of_user(
 
     """
     try:
-        data = user_service.get_roles(user_id=user_id)
+        data = await user_service.run_in_pool(user_service.get_roles, user_id=user_id)
         return APIResponse(data=data)
     except exceptions.UserNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -370,15 +371,17 @@ async def remove_role_from_user(
 
     """
     try:
-        user_service.delete_role(user_id=user_id, role_id=role_id)
+        await user_service.run_in_pool(
+            user_service.delete_role, user_id=user_id, role_id=role_id
+        )
         return APIResponse(message="Role deleted successfully")
     except (exceptions.UserNotFoundError, exceptions.RoleNotFoundForUserError) as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.InsufficientPermissionsError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
@@ -3,10 +3,11 @@ from typing import Annotated
 
 from core import exceptions
 from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
 from models import team as models
 from models.generic import APIResponse, Message, RecordCreated
-from routers._responses import with_default_responses
+from routers._caching import ETag, ETagHandler
+from routers._idempotency import Idempotency, get_idempotency
+from routers._responses import APIJSONResponse, with_default_responses
 from services import TeamService
 
 logger = logging.getLogger()
@@ -19,26 +20,35 @@ router = APIRouter(prefix="/teams")
     status_code=status.HTTP_200_OK,
     summary="Get workshops done by team",
     response_model=APIResponse[list[models.TeamGetWorkshopOut]],
-    responses=with_default_responses(),
+    responses=with_default_responses(
+        {status.HTTP_304_NOT_MODIFIED: {"description": "Not modified"}}
+    ),
 )
 async def get_workshops(
     team_service: Annotated[TeamService, Depends(TeamService)],
+    etag: Annotated[ETag, Depends(ETagHandler())],
     team_id: int,
 ):
     """
-    Get all workshops completed by the team.
+    Get all workshops completed by the team. Returns `304 Not Modified`
+    if the `If-None-Match` header matches the ETag.
 
     **Required scopes**
     - `workshops:read`
 
     """
     try:
-        data = team_service.get_workshops(team_id)
+        version = await team_service.run_in_pool(
+            team_service.get_workshops_version, team_id
+        )
+        if etag.matches(team_service.current_user, version):
+            return etag.not_modified()
+        data = await team_service.run_in_pool(team_service.get_workshops, team_id)
         return APIResponse(data=data)
     except exceptions.TeamNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -69,15 +79,17 @@ async def get_workshop_by_number(
 
     """
     try:
-        data = team_service.get_workshop_by_number(team_id, workshop_number)
+        data = await team_service.run_in_pool(
+            team_service.get_workshop_by_number, team_id, workshop_number
+        )
         return APIResponse(data=data)
     except (
         exceptions.TeamNotFoundError,
         exceptions.WorkshopNotFoundError,
     ) as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -97,43 +109,70 @@ async def get_workshop_by_number(
             status.HTTP_400_BAD_REQUEST: {
                 "model": APIResponse,
             },
+            status.HTTP_422_UNPROCESSABLE_ENTITY: {
+                "model": APIResponse,
+                "description": "Idempotency key used for another request",
+            },
         }
     ),
 )
 async def post_workshop(
     team_service: Annotated[TeamService, Depends(TeamService)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
     team_id: int,
     workshop: models.TeamPostWorkshopIn,
 ):
     """
-    Add a workshop to a team.
+    Add a workshop to a team. Requests with an `Idempotency-Key` header
+    that is already used by an earlier request get the response to that
+    request, so that a retry after a timeout does not fail with a conflict, or a
+    `409 Conflict` while that request is still in progress.
 
     **Required scopes**
     - `workshops:write`
 
     """
     try:
-        data = team_service.create_workshop(team_id, workshop)
-        return APIResponse(data=data)
+        replayed = await idempotency.claim(team_service)
+        if replayed is not None:
+            return replayed
+        data = await team_service.run_in_pool(
+            team_service.create_workshop, team_id, workshop
+        )
+        response = APIJSONResponse(
+            status_code=status.HTTP_201_CREATED,
+            content=APIResponse(data=RecordCreated(id=data.id)),
+        )
+    except exceptions.IdempotencyKeyInProgressError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
+    except exceptions.IdempotencyKeyReusedError as exc:
+        return APIJSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content=APIResponse(message=exc.message, detail=exc.detail),
+        )
     except exceptions.TeamNotFoundError as exc:
-        return JSONResponse(
+        response = APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except exceptions.WorkshopExistsError as exc:
-        return JSONResponse(
+        response = APIJSONResponse(
             status_code=status.HTTP_409_CONFLICT,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
     except (
         exceptions.ChildNotInTeam,
         exceptions.WorkshopIncompleteAttendance,
         exceptions.WorkshopNumberInvalidError,
     ) as exc:
-        return JSONResponse(
+        response = APIJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
+    return await idempotency.save(team_service, response)
 
 
 @router.get(
@@ -149,7 +188,7 @@ async def post_workshop(
         }
     ),
 )
-def get_workshop_by_id(
+async def get_workshop_by_id(
     team_service: Annotated[TeamService, Depends(TeamService)], workshop_id: int
 ):
     """Get workshop by ID.
@@ -159,12 +198,14 @@ def get_workshop_by_id(
 
     """
     try:
-        workshop = team_service.get_workshop_by_id(workshop_id)
+        workshop = await team_service.run_in_pool(
+            team_service.get_workshop_by_id, workshop_id
+        )
         return APIResponse(data=workshop)
     except exceptions.WorkshopNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
 
 
@@ -196,10 +237,12 @@ async def patch_workshop(
 
     """
     try:
-        team_service.update_workshop(workshop_id, workshop)
+        await team_service.run_in_pool(
+            team_service.update_workshop, workshop_id, workshop
+        )
         return APIResponse(message="Successfull updated workshop!")
     except exceptions.WorkshopNotFoundError as exc:
-        return JSONResponse(
+        return APIJSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
-            content=APIResponse(message=exc.message, detail=exc.detail).model_dump(),
+            content=APIResponse(message=exc.message, detail=exc.detail),
         )
@@ -0,0 +1,58 @@
+"""Production entry point that serves the app with several worker processes.
+
+Handlers run blocking database calls, so a single process serializes
+requests on one core. Gunicorn runs `SERVER_WORKERS` uvicorn workers
+that accept connections from a shared socket, restarts workers that
+die or reached `SERVER_MAX_REQUESTS`, and adds or removes a worker on
+`TTIN` and `TTOU` signals without dropping requests.
+
+Usage, from the `app` folder:
+
+    python server.py
+"""
+
+from core.settings import Settings, get_settings
+from gunicorn.app.base import BaseApplication
+from gunicorn.util import import_app
+
+
+def get_server_options(settings: Settings) -> dict:
+    """Get the gunicorn options for the given settings."""
+    return {
+        "bind": f"0.0.0.0:{settings.PORT}",
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "workers": settings.server_workers,
+        "keepalive": settings.SERVER_KEEP_ALIVE,
+        "backlog": settings.SERVER_BACKLOG,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        # every worker imports the app itself after the fork, so that
+        # database connections, caches and their locks are per process
+        # and never shared between workers
+        "preload_app": False,
+    }
+
+
+class Server(BaseApplication):
+    """Gunicorn application configured with options instead of a config file."""
+
+    def __init__(self, app_uri: str, options: dict):
+        self.app_uri = app_uri
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return import_app(self.app_uri)
+
+
+def main():
+    Server("main:app", get_server_options(get_settings())).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
-__all__ = ["ChildService", "CommunityService", "TeamService", "UserService"]
+__all__ = [
+    "ChildService",
+    "CommunityService",
+    "StatsService",
+    "SyncService",
+    "TeamService",
+    "UserService",
+]
 
 from services.child import ChildService
 from services.community import CommunityService
+from services.stats import StatsService
+from services.sync import SyncService
 from services.team import TeamService
 from services.user import UserService
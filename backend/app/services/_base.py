@@ -1,17 +1,24 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Annotated, TypeVar
+from collections.abc import Callable
+from functools import cached_property
+from typing import Annotated, ParamSpec, TypeVar
 
 from core.auth import BearerTokenHandlerInst
+from core.cache import ResponseCache, get_response_cache
 from core.context import Permission
 from core.database.session import SessionDependency
-from core.email import EmailService
+from core.email import EmailService, get_email_service
 from core.settings import SettingsDependency
+from core.threadpool import get_thread_pool
 from fastapi import Depends
+from repositories._base import BaseRepository
 from repositories.database import DatabaseRepositories
 from sqlmodel import SQLModel
 
 Model = TypeVar("Model", bound=SQLModel)
+P = ParamSpec("P")
+T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +43,9 @@ class BaseService(ABC):
 
     permissions = Permission
 
+    # tags of cached responses that are invalidated by a commit of the service
+    invalidates: tuple[str, ...] = ()
+
     def __init__(
         self,
         session: SessionDependency,
@@ -44,20 +54,65 @@ class BaseService(ABC):
             BearerTokenHandlerInst, Depends(BearerTokenHandlerInst)
         ],
     ) -> None:
-        """Initialize service with database session and instantiate dependencies.
+        """Initialize service with database session and application settings.
 
-        Sets up all repository instances, email service, and loads application
-        settings. Each service instance operates within a single database
-        transaction context.
+        Repositories and the email service are not created here but on first
+        access, so that injecting a service is cheap. Each service instance
+        operates within a single database transaction context.
 
         Args:
             session: SQLAlchemy database session for transaction management
         """
         self._session: SessionDependency = session
         self.settings: SettingsDependency = settings
-        self.email_service = EmailService(settings=self.settings)
-        self.database = DatabaseRepositories(session=self._session)
         self.current_user = current_user
+        # records loaded by `_load`, by repository and primary key
+        self._loaded: dict[tuple[type[BaseRepository], int], SQLModel] = {}
+
+    @cached_property
+    def database(self) -> DatabaseRepositories:
+        """Repositories bound to the session of this service."""
+        return DatabaseRepositories(session=self._session)
+
+    @property
+    def email_service(self) -> EmailService:
+        """Shared email service with precompiled templates."""
+        return get_email_service(settings=self.settings)
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        """Shared cache of rendered responses."""
+        return get_response_cache(settings=self.settings)
+
+    async def run_in_pool(
+        self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """Run a blocking call, such as a method of this service, in the
+        shared thread pool, so that async routes do not block the event loop.
+
+        ```
+        data = await service.run_in_pool(service.get, object_id=1)
+        ```
+        """
+        return await get_thread_pool(settings=self.settings).run(func, *args, **kwargs)
+
+    def _load(self, repository: BaseRepository[Model], object_id: int) -> Model:
+        """Load a record by primary key at most once per service, i.e. per request.
+
+        The identity map of the session only holds records weakly, so a
+        record that a validator reads and discards is queried again by the
+        next lookup. Keeping a reference here lets later lookups of the same
+        record, including `session.get` in the repositories, be served from
+        the identity map. Validators return the loaded record so that the
+        caller can pass it on instead of reading it again.
+
+        Raises:
+            ItemNotFoundError: If the record is not found.
+        """
+        key = (type(repository), object_id)
+        if key not in self._loaded:
+            self._loaded[key] = repository.read(object_id=object_id)
+        return self._loaded[key]
 
     @abstractmethod
     def create(self, obj: Model):
@@ -92,14 +147,20 @@ class BaseService(ABC):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
-        """On exit rollback any staged database changes."""
+        """On exit rollback any database changes that were not committed."""
+        if exc_type is not None:
+            logger.warning(f"Rolling back transaction after {exc_type.__name__}")
         self.rollback()
 
     def commit(self) -> None:
-        """Commit all staged changes to the database."""
+        """Commit all staged changes to the database and
+        invalidate the cached responses they affect."""
         self._session.commit()
+        if self.invalidates:
+            self.response_cache.invalidate(*self.invalidates)
 
     def rollback(self) -> None:
-        """Rollback all staged changes in the database."""
-        logger.warning("Rolling back transaction")
-        self._session.rollback()
+        """Rollback all staged changes in the database, if a
+        transaction was started at all."""
+        if self._session.in_transaction():
+            self._session.rollback()
@@ -1,7 +1,14 @@
 import logging
 
 from core import exceptions
-from models.child import ChildPatchIn, ChildPostIn
+from core.cache import CacheTag
+from models.child import (
+    CHILD_IMPORT_MAX_ROWS,
+    ChildImportOut,
+    ChildPatchIn,
+    ChildPostIn,
+)
+from pydantic import ValidationError
 from services._base import BaseService
 
 logger = logging.getLogger(__name__)
@@ -15,6 +22,9 @@ class ChildService(BaseService):
     checks within teams.
     """
 
+    # teams contain their children
+    invalidates = (CacheTag.teams,)
+
     def create(self, child: ChildPostIn):
         """Create a new child in the specified team.
 
@@ -27,36 +37,79 @@ class ChildService(BaseService):
         """
         self.current_user.verify_permission(self.permissions.children_write)
         self._validate_team_exists(child.team_id)
-        self._validate_child_unique(child)
 
+        # raises ChildAlreadyExistsError if the name is taken in the team
         child = self.database.children.create(child)
         self.commit()
         logger.info(f"Child created in team {child.team_id} with ID {child.id}")
         return child
 
-    def _validate_child_unique(self, child: ChildPostIn | ChildPatchIn):
-        """Check if child name is unique within their team.
+    def import_children(self, team_id: int, rows: list[dict]) -> ChildImportOut:
+        """Create many children in a team at once. Either all children are
+        created or, if any row is invalid, none of them.
+
+        Rows are validated as in `create`, names are checked against each
+        other and against the team in one query, and the children are
+        inserted in one statement.
 
         Args:
-            child: Child data with name and team_id
+            team_id: Team ID to import the children into
+            rows: Children to import, as fields by name
 
         Raises:
-            ChildAlreadyExistsError: If duplicate name in team
+            TeamNotFoundError: If team doesn't exist
+            ChildImportInvalidError: If there are no or too many rows
         """
-        if self.database.children.where(
-            [
-                ("team_id", child.team_id),
-                ("first_name", child.first_name),
-                ("last_name", child.last_name),
-            ]
-        ):
-            team = self.database.teams.read(child.team_id)
+        self.current_user.verify_permission(self.permissions.children_write)
+        self._validate_team_exists(team_id)
+
+        if not rows or len(rows) > CHILD_IMPORT_MAX_ROWS:
             error_msg = (
-                f"Child {child.first_name} {child.last_name} already "
-                f"exists in team {team.name}"
+                f"Import should contain 1 to {CHILD_IMPORT_MAX_ROWS} "
+                f"children, got {len(rows)}"
             )
             logger.error(error_msg)
-            raise exceptions.ChildAlreadyExistsError(error_msg)
+            raise exceptions.ChildImportInvalidError(error_msg)
+
+        children: list[tuple[int, ChildPostIn]] = []
+        errors = []
+        row_by_name: dict[tuple[str, str], int] = {}
+        for number, row in enumerate(rows, start=1):
+            try:
+                child = ChildPostIn.model_validate({**row, "team_id": team_id})
+            except ValidationError as exc:
+                detail = "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+                    for error in exc.errors()
+                )
+                errors.append({"row": number, "detail": detail})
+                continue
+            name = (child.first_name, child.last_name)
+            if name in row_by_name:
+                detail = f"Duplicate of row {row_by_name[name]}"
+                errors.append({"row": number, "detail": detail})
+                continue
+            row_by_name[name] = number
+            children.append((number, child))
+
+        taken = self.database.children.read_names_by_team(
+            team_id=team_id, names=list(row_by_name)
+        )
+        for number, child in children:
+            if (child.first_name, child.last_name) in taken:
+                detail = f"Child {child.first_name} {child.last_name} already exists"
+                errors.append({"row": number, "detail": detail})
+
+        if errors:
+            logger.error(f"Import of children into team {team_id} has invalid rows")
+            errors.sort(key=lambda error: error["row"])
+            return ChildImportOut(created=[], errors=errors)
+
+        # raises ChildAlreadyExistsError if a name was taken concurrently
+        created = self.database.children.create_bulk([child for _, child in children])
+        self.commit()
+        logger.info(f"Imported {len(created)} children into team {team_id}")
+        return ChildImportOut(created=[child.id for child in created], errors=[])
 
     def delete(self, object_id: int, cascade: bool = False):
         """Delete a child and optionally their attendance records.
@@ -71,23 +124,28 @@ class ChildService(BaseService):
         """
         self.current_user.verify_permission(self.permissions.children_write)
 
-        # check if child has attendance records
-        if self.database.attendances.where([("child_id", object_id)]):
-            # if cascade is False, raise an exception
-            if not cascade:
-                error_msg = (
-                    f"Child with ID {object_id} has attendance "
-                    "records and cascade is False"
-                )
-                logger.error(error_msg)
-                raise exceptions.ChildHasAttendanceError(error_msg)
-
-            # if cascade is True, delete all attendance records for the child
-            logger.info(f"Deleting attendance records for child with ID {object_id}")
-            self.database.attendances.delete_bulk(attr="child_id", value=object_id)
+        # a fixed number of statements regardless of the number of attendance
+        # records of the child: either check for or delete them, then record
+        # the deletion for devices that sync and delete the child
+        if cascade:
+            deleted_attendances = self.database.attendances.delete_where(
+                attr="child_id", value=object_id
+            )
+            logger.info(
+                f"Deleted {deleted_attendances} attendance records "
+                f"for child with ID {object_id}"
+            )
+        elif self.database.attendances.exists_where([("child_id", object_id)]):
+            error_msg = (
+                f"Child with ID {object_id} has attendance "
+                "records and cascade is False"
+            )
+            logger.error(error_msg)
+            raise exceptions.ChildHasAttendanceError(error_msg)
 
-        # if child has no attendance records, delete the child
-        self.database.children.delete(object_id=object_id)
+        self.database.tombstones.create_for_children([("id", object_id)])
+        if not self.database.children.delete_where(attr="id", value=object_id):
+            raise exceptions.ChildNotFoundError(f"Child with ID {object_id} not found")
         self.commit()
         logger.info(f"Deleted child with ID {object_id}")
 
@@ -112,10 +170,7 @@ class ChildService(BaseService):
         """
         self.current_user.verify_permission(self.permissions.children_read)
 
-        try:
-            return self.database.children.read(object_id=object_id)
-        except exceptions.ItemNotFoundError:
-            raise exceptions.ChildNotFoundError(f"Child with ID {object_id} not found")
+        return self._validate_child_exists(object_id)
 
     def update(self, object_id: int, obj: ChildPatchIn):
         """Update a child's information.
@@ -128,14 +183,29 @@ class ChildService(BaseService):
             ChildNotFoundError: If child not found
         """
         self.current_user.verify_permission(self.permissions.children_read)
+        self._validate_child_exists(object_id)
 
         child = self.database.children.update(object_id=object_id, obj=obj)
         self.commit()
         logger.info(f"Updated child with ID {object_id}: {obj}")
         return child
 
+    def _validate_child_exists(self, child_id: int):
+        """Verify child exists and return it.
+
+        Args:
+            child_id: Child ID to check
+
+        Raises:
+            ChildNotFoundError: If child not found
+        """
+        try:
+            return self._load(self.database.children, child_id)
+        except exceptions.ItemNotFoundError:
+            raise exceptions.ChildNotFoundError(f"Child with ID {child_id} not found")
+
     def _validate_team_exists(self, team_id: int):
-        """Verify team exists.
+        """Verify team exists and return it.
 
         Args:
             team_id: Team ID to check
@@ -144,7 +214,7 @@ class ChildService(BaseService):
             TeamNotFoundError: If team not found
         """
         try:
-            self.database.teams.read(object_id=team_id)
+            return self._load(self.database.teams, team_id)
         except exceptions.ItemNotFoundError:
             error_msg = f"Team with ID {team_id} not found"
             logger.error(error_msg)
@@ -1,6 +1,7 @@
 import logging
 
 from core import exceptions
+from core.cache import CacheTag
 from models.community import CommunityPostIn
 from models.generic import Message
 from services._base import BaseService
@@ -11,6 +12,8 @@ logger = logging.getLogger(__name__)
 class CommunityService(BaseService):
     """Community service layer to do anything related to communities."""
 
+    invalidates = (CacheTag.communities, CacheTag.teams)
+
     def create(self, obj: CommunityPostIn, implementing_partner_id: int):
         """Create a new community in the database.
 
@@ -27,11 +30,8 @@ class CommunityService(BaseService):
                 f"Implementing partner with ID {implementing_partner_id} does not exist"
             )
 
-        if self.database.communities.where([("name", obj.name)]):
-            raise exceptions.CommunityAlreadyExistsError(
-                f"Community with name {obj.name} already exists."
-            )
         obj.implementing_partner_id = implementing_partner_id
+        # raises CommunityAlreadyExistsError if the name is taken
         community = self.database.communities.create(obj)
         self.commit()
         logger.info(
@@ -43,6 +43,23 @@ class CommunityService(BaseService):
         """Get all objects from the table."""
         self.current_user.verify_permission(self.permissions.communities_read)
 
+        communities = self.database.communities.read_all_by_user_access(
+            user_id=self.current_user.user_id,
+            filters=self._get_all_filters(implementing_partner_id),
+        )
+        return sorted(communities, key=lambda community: community.name)
+
+    def get_all_version(self, implementing_partner_id: int = None) -> tuple:
+        """Get a version of the communities returned by `get_all`."""
+        self.current_user.verify_permission(self.permissions.communities_read)
+
+        return self.database.communities.version_by_user_access(
+            user_id=self.current_user.user_id,
+            filters=self._get_all_filters(implementing_partner_id),
+        )
+
+    def _get_all_filters(self, implementing_partner_id: int | None) -> list:
+        """Get the filters for a list of communities."""
         filters = []
         if implementing_partner_id:
 
@@ -54,19 +71,13 @@ class CommunityService(BaseService):
                 )
 
             filters.append(("implementing_partner_id", implementing_partner_id))
-
-        communities = self.database.communities.read_all_by_user_access(
-            user_id=self.current_user.user_id, filters=filters
-        )
-        return sorted(communities, key=lambda community: community.name)
+        return filters
 
     def get(self, object_id):
         """Get an object from the table by id."""
         self.current_user.verify_permission(self.permissions.communities_read)
 
-        self._validate_community_exists(object_id)
-        community = self.database.communities.read(object_id=object_id)
-        return community
+        return self._validate_community_exists(object_id)
 
     def update(self, object_id: int, obj):
         self.current_user.verify_permission(self.permissions.communities_write)
@@ -85,8 +96,7 @@ class CommunityService(BaseService):
 
         self._validate_community_exists(object_id)
 
-        # TODO: this should be managed by database cascading setting
-        if self.database.teams.where([("community_id", object_id)]):
+        if self.database.teams.exists_where([("community_id", object_id)]):
             if not cascade:
                 error_msg = (
                     "Attempted deletion of community with "
@@ -94,17 +104,19 @@ class CommunityService(BaseService):
                 )
                 logger.error(error_msg)
                 raise exceptions.CommunityHasTeamsError(error_msg)
+            self.database.tombstones.create_for_teams([("community_id", object_id)])
 
+        # teams and everything that belongs to them are deleted by the database
         self.database.communities.delete(object_id=object_id)
         self.commit()
         msg = f"Community with ID {object_id} deleted."
         logger.info(msg)
         return Message(detail=msg)
 
-    def _validate_community_exists(self, community_id: int) -> None:
-        """Validate that community exists."""
+    def _validate_community_exists(self, community_id: int):
+        """Validate that community exists and return it."""
         try:
-            self.database.communities.read(object_id=community_id)
+            return self._load(self.database.communities, community_id)
         except exceptions.ItemNotFoundError:
             error_msg = f"Community with ID {community_id} not found"
             logger.error(error_msg)
@@ -1,6 +1,7 @@
 import logging
 
 from core import exceptions
+from core.cache import CacheTag
 from models.generic import APIResponse
 from models.implementing_partner import ImplementingPartnerPostIn
 from services._base import BaseService
@@ -12,6 +13,8 @@ class ImplementingPartnerService(BaseService):
     """Implementing Partner service layer to do anything
     related to implementing partners."""
 
+    invalidates = (CacheTag.communities, CacheTag.teams)
+
     def create(self, obj: ImplementingPartnerPostIn):
         """Create a new implementing partner in the database.
 
@@ -22,10 +25,7 @@ class ImplementingPartnerService(BaseService):
             self.permissions.implementing_partners_write
         )
 
-        if self.database.implementing_partners.where([("name", obj.name)]):
-            raise exceptions.ImplementingPartnerAlreadyExistsError(
-                f"Implementing Partner with name {obj.name} already exists."
-            )
+        # raises ImplementingPartnerAlreadyExistsError if the name is taken
         implementing_partner = self.database.implementing_partners.create(obj)
         self.commit()
         logger.info(
@@ -51,11 +51,7 @@ class ImplementingPartnerService(BaseService):
         """Get an implementing partner from the table by id."""
         self.current_user.verify_permission(self.permissions.implementing_partners_read)
 
-        self._validate_implementing_partner_exists(object_id)
-        implementing_partner = self.database.implementing_partners.read(
-            object_id=object_id
-        )
-        return implementing_partner
+        return self._validate_implementing_partner_exists(object_id)
 
     def update(self, object_id: int, obj):
         self.current_user.verify_permission(
@@ -78,24 +74,33 @@ class ImplementingPartnerService(BaseService):
 
         self._validate_implementing_partner_exists(object_id)
 
-        # TODO: this should be managed by database cascading setting
-        if self.database.communities.where([("implementing_partner_id", object_id)]):
+        if self.database.communities.exists_where(
+            [("implementing_partner_id", object_id)]
+        ):
             if not cascade:
                 raise exceptions.ImplementingPartnerHasCommunitiesError(
                     f"Implementing Partner with ID {object_id} has communities assigned to it."
                 )
+            self.database.tombstones.create_for_teams(
+                [("implementing_partner_id", object_id)]
+            )
+            # the foreign key of communities restricts the delete, so delete them
+            # in a single statement, the database deletes everything below them
+            self.database.communities.delete_where(
+                attr="implementing_partner_id", value=object_id
+            )
 
         self.database.implementing_partners.delete(object_id=object_id)
         self.commit()
         msg = f"IP with ID {object_id} deleted."
         return APIResponse(message=msg)
 
-    def _validate_implementing_partner_exists(
-        self, implementing_partner_id: int
-    ) -> None:
-        """Validate that implementing partner exists."""
+    def _validate_implementing_partner_exists(self, implementing_partner_id: int):
+        """Validate that implementing partner exists and return it."""
         try:
-            self.database.implementing_partners.read(object_id=implementing_partner_id)
+            return self._load(
+                self.database.implementing_partners, implementing_partner_id
+            )
         except exceptions.ItemNotFoundError:
             error_msg = (
                 f"Implementing Partner with ID {implementing_partner_id} not found"
@@ -0,0 +1,91 @@
+from core import exceptions
+from models.stats import StatsGetOut
+from services._base import BaseService
+
+LEVELS = ("implementing_partner", "community")
+
+
+class StatsService(BaseService):
+    """Stats service layer for programme statistics per implementing partner
+    or community, read from the reporting views instead of from every team.
+    On Postgres the statistics are as old as the last `refresh_stats` job."""
+
+    def get_all(
+        self, level: str, implementing_partner_id: int | None = None
+    ) -> list[StatsGetOut]:
+        """Get the statistics per implementing partner or community, over the
+        teams that the user has access to.
+
+        Args:
+            level (str): `implementing_partner` or `community`.
+            implementing_partner_id (int, optional): Only include the teams
+                of an implementing partner.
+
+        Raises:
+            ImplementingPartnerNotFoundError: If the implementing partner does
+                not exist.
+        """
+        self.current_user.verify_permission(self.permissions.teams_read)
+        self.current_user.verify_permission(self.permissions.workshops_read)
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level {level}, expected one of {LEVELS}")
+
+        filters = []
+        if implementing_partner_id:
+            if not self.database.implementing_partners.where(
+                [("id", implementing_partner_id)]
+            ):
+                raise exceptions.ImplementingPartnerNotFoundError(
+                    f"Implementing partner with ID {implementing_partner_id} does not exist"
+                )
+            filters.append(("implementing_partner_id", implementing_partner_id))
+
+        user_id = self.current_user.user_id
+        workshops = {}
+        for (
+            group_id,
+            number,
+            teams,
+            attendances,
+            present,
+        ) in self.database.stats.read_workshops_by_user_access(
+            user_id=user_id, level=level, filters=filters
+        ):
+            workshops.setdefault(group_id, []).append(
+                StatsGetOut.Workshop(
+                    workshop_number=number,
+                    teams=teams,
+                    average_present=(present or 0) / teams,
+                    attendance_rate=(present or 0) / attendances if attendances else 0,
+                )
+            )
+
+        return [
+            StatsGetOut(
+                id=group_id,
+                name=name,
+                teams=teams,
+                active_teams=active_teams,
+                completed_teams=completed_teams,
+                completion_rate=completed_teams / teams,
+                children=children or 0,
+                workshops=workshops.get(group_id, []),
+            )
+            for group_id, name, teams, active_teams, completed_teams, children in (
+                self.database.stats.read_teams_by_user_access(
+                    user_id=user_id, level=level, filters=filters
+                )
+            )
+        ]
+
+    def create(self, obj):
+        raise NotImplementedError()
+
+    def get(self, object_id: int):
+        raise NotImplementedError()
+
+    def update(self, object_id: int, obj):
+        raise NotImplementedError()
+
+    def delete(self, object_id: int):
+        raise NotImplementedError()
@@ -0,0 +1,168 @@
+import base64
+import binascii
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from functools import cached_property
+
+from core import exceptions
+from core.cache import CacheTag
+from models.sync import SyncGetOut, SyncPostIn, SyncPostOut
+from services._base import BaseService
+from services.team import TeamService
+
+logger = logging.getLogger(__name__)
+
+# records get their `last_updated_at` before the transaction that writes them
+# commits, so the next sync starts a bit before this one to not miss records
+# of transactions that were in flight, devices merge records they already have
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class SyncService(BaseService):
+    """Sync service layer for offline first devices of coaches, which sync
+    the changes since their previous sync instead of refetching all teams
+    and workshops, and submit the workshops they recorded while offline."""
+
+    # applying workshops changes the progress of teams
+    invalidates = (CacheTag.teams,)
+
+    @cached_property
+    def teams(self) -> TeamService:
+        """Team service in the same transaction, to apply workshops."""
+        return TeamService(
+            session=self._session,
+            settings=self.settings,
+            current_user=self.current_user,
+        )
+
+    def get_all(self, since: str | None = None) -> SyncGetOut:
+        """Get the teams, children, workshops and attendances that the user has
+        access to and that changed since a cursor, and the deleted resources.
+
+        Args:
+            since (str, optional): Cursor of the previous sync. Without a cursor,
+                or if the cursor expired or the roles of the user changed since,
+                all records are returned and `full` is set on the response.
+
+        Raises:
+            SyncCursorInvalidError: If the cursor can not be decoded.
+        """
+        self.current_user.verify_permission(self.permissions.teams_read)
+        self.current_user.verify_permission(self.permissions.workshops_read)
+
+        synced_at = datetime.now()
+        scope = self._get_scope()
+        changed_since = None
+        if since:
+            changed_since, cursor_scope = _decode_cursor(since)
+            expires_at = changed_since + timedelta(
+                days=self.settings.SYNC_TOMBSTONE_RETENTION_DAYS
+            )
+            # records that became accessible with a new role may not have changed
+            if cursor_scope != scope or expires_at < synced_at:
+                changed_since = None
+
+        user_id = self.current_user.user_id
+        deleted = []
+        if changed_since is not None:
+            deleted = self.database.tombstones.read_by_user_access(
+                user_id=user_id, since=changed_since
+            )
+        return SyncGetOut.model_validate(
+            {
+                "cursor": _encode_cursor(synced_at - SYNC_OVERLAP, scope),
+                "full": changed_since is None,
+                "teams": self.database.teams.read_changed_by_user_access(
+                    user_id=user_id, since=changed_since
+                ),
+                "children": self.database.children.read_changed_by_user_access(
+                    user_id=user_id, since=changed_since
+                ),
+                "workshops": self.database.workshops.read_changed_by_user_access(
+                    user_id=user_id, since=changed_since
+                ),
+                "attendances": self.database.attendances.read_changed_by_user_access(
+                    user_id=user_id, since=changed_since
+                ),
+                "deleted": deleted,
+            },
+            from_attributes=True,
+        )
+
+    def create(self, obj: SyncPostIn) -> SyncPostOut:
+        """Apply the workshops a device recorded while offline, in order and
+        in one transaction. Each workshop is validated like in
+        `TeamService.create_workshop` and applied in a savepoint, so that
+        a rejected workshop, e.g. one that another coach already submitted,
+        does not prevent the others from being applied.
+
+        Args:
+            obj (SyncPostIn): Workshops recorded offline.
+
+        Returns:
+            SyncPostOut: Result per workshop, in the same order.
+        """
+        self.current_user.verify_permission(self.permissions.workshops_write)
+
+        results = []
+        for workshop in obj.workshops:
+            result = {
+                "team_id": workshop.team_id,
+                "workshop_number": workshop.workshop_number,
+            }
+            try:
+                with self._session.begin_nested():
+                    record = self.teams.stage_workshop(
+                        team_id=workshop.team_id, workshop=workshop
+                    )
+                result.update(status_code=201, workshop_id=record.id)
+            except exceptions.InsufficientPermissionsError:
+                raise
+            except exceptions.BaseAPIException as exc:
+                result.update(
+                    status_code=exc.status_code,
+                    message=exc.message,
+                    detail=exc.detail,
+                )
+            results.append(result)
+
+        self.commit()
+        applied = len([r for r in results if r["status_code"] == 201])
+        logger.info(f"Synced {applied} of {len(results)} offline workshops")
+        return SyncPostOut(results=results)
+
+    def get(self, object_id: int):
+        raise NotImplementedError()
+
+    def update(self, object_id: int, obj):
+        raise NotImplementedError()
+
+    def delete(self, object_id: int):
+        raise NotImplementedError()
+
+    def _get_scope(self) -> str:
+        """Digest of the roles of the user, which change what they can see."""
+        roles = sorted(
+            (role.name, role.level, role.resource_path)
+            for role in self.current_user.roles
+        )
+        return hashlib.sha256(repr(roles).encode()).hexdigest()[:16]
+
+
+def _encode_cursor(synced_at: datetime, scope: str) -> str:
+    """Encode the moment of a sync and the scope of the user in a cursor."""
+    payload = json.dumps({"t": synced_at.isoformat(), "s": scope})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor into the moment of the sync and the scope of the user."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["t"]), payload["s"]
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise exceptions.SyncCursorInvalidError(
+            f"Invalid sync cursor: {cursor}"
+        ) from exc
@@ -2,8 +2,10 @@ import logging
 from enum import Enum
 
 from core import exceptions
+from core.cache import CacheTag
 from models.team import (
     TeamGetByIdOut,
+    TeamGetDashboardOut,
     TeamGetOut,
     TeamGetWorkshopByNumberOut,
     TeamGetWorkshopOut,
@@ -28,40 +30,27 @@ class Attendance(str, Enum):
 class TeamService(BaseService):
     """Team service layer to do anything related to teams."""
 
+    invalidates = (CacheTag.teams,)
+
     def create(self, team: TeamPostIn):
         """Create a new team."""
 
         self.current_user.verify_permission(self.permissions.teams_write)
 
-        self._validate_team_unique(team)
-
         try:
-            community = self.database.communities.read(object_id=team.community_id)
+            community = self._load(self.database.communities, team.community_id)
         except exceptions.ItemNotFoundError:
             msg = f"Community with ID {team.community_id} not found"
             logger.error(msg)
             raise exceptions.CommunityNotFoundError(msg)
 
         team.implementing_partner_id = community.implementing_partner_id
+        # raises TeamAlreadyExistsError if the name is taken
         new_team = self.database.teams.create(team)
         self.commit()
         logger.info(f"Team with ID {new_team.id} created.")
         return new_team
 
-    def _validate_team_unique(self, team: TeamPostIn | TeamPatchIn):
-        """Validate that a team name is unique.
-
-        Args:
-            team: Team data to validate
-
-        Raises:
-            TeamAlreadyExistsError: If a team with the same name already exists
-        """
-        if self.database.teams.where([("name", team.name)]):
-            error_msg = f"Team with name '{team.name}' already exists"
-            logger.error(error_msg)
-            raise exceptions.TeamAlreadyExistsError(error_msg)
-
     def create_workshop(self, team_id: int, workshop: TeamPostWorkshopIn) -> dict:
         """Create a workshop for a team.
 
@@ -72,17 +61,24 @@ class TeamService(BaseService):
         Returns:
             dict: Workshop object created.
         """
+        workshop_record = self.stage_workshop(team_id=team_id, workshop=workshop)
+        self.commit()
+        return workshop_record
+
+    def stage_workshop(self, team_id: int, workshop: TeamPostWorkshopIn):
+        """Validate a workshop for a team and stage it with its attendance,
+        without committing, so that several workshops can be created in one
+        transaction. See `create_workshop` for the arguments."""
         self.current_user.verify_permission(self.permissions.workshops_write)
 
         self._validate_team_exists(team_id)
 
-        # validate that workshop does not exist yet for the team
-        if self.database.workshops.where(
-            [
-                ("team_id", team_id),
-                ("workshop_number", workshop.workshop_number),
-            ]
-        ):
+        # workshops are numbered consecutively, so the last workshop number tells
+        # both whether the workshop exists and whether it is the next valid one
+        last_workshop_number = self.database.workshops.get_last_workshop_per_team(
+            team_ids=[team_id]
+        ).get(team_id, 0)
+        if workshop.workshop_number <= last_workshop_number:
             error_msg = (
                 f"Workshop {workshop.workshop_number} for team "
                 f"{team_id} already exists."
@@ -90,11 +86,7 @@ class TeamService(BaseService):
             logger.error(error_msg)
             raise exceptions.WorkshopExistsError(error_msg)
 
-        # validate that the workshop number is the next valid workshop for the team
-        workshops = self.database.workshops.where([("team_id", team_id)])
-        valid_workshop_number = (
-            max(w.workshop_number for w in workshops) + 1 if len(workshops) > 0 else 1
-        )
+        valid_workshop_number = last_workshop_number + 1
         if workshop.workshop_number != valid_workshop_number:
             error_msg = (
                 f"Workshop number {workshop.workshop_number} is not the next correct "
@@ -132,7 +124,8 @@ class TeamService(BaseService):
             logger.error(error_msg)
             raise exceptions.WorkshopIncompleteAttendance(error_msg)
 
-        # create workshop
+        # create workshop, the unique constraint on team and workshop number
+        # raises WorkshopExistsError if the same workshop was submitted concurrently
         attendance = workshop.attendance
         workshop_record = self.database.workshops.create(
             {
@@ -162,8 +155,10 @@ class TeamService(BaseService):
             self.database.teams.update(
                 object_id=team_id, obj=TeamPatchIn(is_active=False)
             )
+        else:
+            # the progress of the team changed
+            self.database.teams.touch(object_id=team_id)
 
-        self.commit()
         return workshop_record
 
     def update_workshop(self, workshop_id, workshop) -> str:
@@ -223,6 +218,8 @@ class TeamService(BaseService):
                 logger.warning(msg)
                 raise NotImplementedError(msg)
 
+        self.database.teams.touch(object_id=workshop_in_db.team_id)
+
         msg = f"Succesfully updated workshop {workshop_id}"
         logger.info(msg)
         self.commit()
@@ -245,18 +242,9 @@ class TeamService(BaseService):
         """
         self.current_user.verify_permission(self.permissions.teams_read)
 
-        filters = []
-        if community_id:
-            filters.append(("community_id", community_id))
-
-        # filter by status, if status neither active or inactive, no filters are applied
-        if status == TeamStatus.active:
-            filters.append(("is_active", True))
-        if status == TeamStatus.inactive:
-            filters.append(("is_active", False))
-
         teams = self.database.teams.read_all_by_user_access(
-            user_id=self.current_user.user_id, filters=filters
+            user_id=self.current_user.user_id,
+            filters=self._get_all_filters(community_id=community_id, status=status),
         )
 
         team_ids = [team.id for team in teams]
@@ -267,23 +255,54 @@ class TeamService(BaseService):
             team_ids=team_ids
         )
         teams = [
-            TeamGetOut(
-                **team.model_dump(),
-                community=team.community.model_dump(),
-                program={
-                    "progress": {
-                        "current": (
-                            teams_progresses[team.id]
-                            if team.id in teams_progresses
-                            else 0
-                        )
-                    }
-                },
-            )
+            self._to_team_out(team, progress=teams_progresses.get(team.id, 0))
             for team in teams
         ]
         return sorted(teams, key=lambda team: team.name)
 
+    def get_all_version(
+        self,
+        community_id: int = None,
+        status: TeamStatus = TeamStatus.active,
+    ) -> tuple:
+        """Get a version of the teams returned by `get_all`, that changes
+        whenever one of the teams or their communities changes."""
+        self.current_user.verify_permission(self.permissions.teams_read)
+
+        return self.database.teams.version_by_user_access(
+            user_id=self.current_user.user_id,
+            filters=self._get_all_filters(community_id=community_id, status=status),
+        )
+
+    @staticmethod
+    def _get_all_filters(community_id: int, status: TeamStatus) -> list:
+        """Get the filters for a list of teams."""
+        filters = []
+        if community_id:
+            filters.append(("community_id", community_id))
+
+        # filter by status, if status neither active or inactive, no filters are applied
+        if status == TeamStatus.active:
+            filters.append(("is_active", True))
+        if status == TeamStatus.inactive:
+            filters.append(("is_active", False))
+        return filters
+
+    @staticmethod
+    def _to_team_out(team, progress: int) -> TeamGetOut:
+        """Build the response model of a team straight from the database record,
+        validating it once instead of dumping and re-validating the record."""
+        return TeamGetOut.model_validate(
+            {
+                "id": team.id,
+                "name": team.name,
+                "is_active": team.is_active,
+                "community": team.community,
+                "program": {"progress": {"current": progress}},
+            },
+            from_attributes=True,
+        )
+
     def get_workshop_by_id(self, workshop_id):
         """Get a workshop from a team, with attendance."""
         # TODO: lots of duplicate code here with get_workshop_by_number
@@ -331,11 +350,30 @@ class TeamService(BaseService):
         team_progress = teams_progresses[team.id] if team.id in teams_progresses else 0
 
         children = sorted(team.children, key=lambda child: child.first_name)
-        return TeamGetByIdOut(
-            **team.model_dump(),
-            children=[child.model_dump() for child in children],
-            community=team.community.model_dump(),
-            program={"progress": {"current": team_progress}},
+        return TeamGetByIdOut.model_validate(
+            {
+                "id": team.id,
+                "name": team.name,
+                "is_active": team.is_active,
+                "created_at": team.created_at,
+                "last_updated_at": team.last_updated_at,
+                "community": team.community,
+                "children": children,
+                "program": {"progress": {"current": team_progress}},
+            },
+            from_attributes=True,
+        )
+
+    def get_version(self, object_id: int) -> tuple:
+        """Get a version of the team returned by `get`. Workshops update the
+        team when they change, so its progress is covered as well."""
+        self.current_user.verify_permission(self.permissions.teams_read)
+        team = self._validate_team_exists(object_id)
+
+        return (
+            team.last_updated_at,
+            team.community.last_updated_at,
+            self.database.children.version_where([("team_id", object_id)]),
         )
 
     def update(self, object_id: int, obj):
@@ -355,7 +393,7 @@ class TeamService(BaseService):
         self._validate_team_exists(object_id)
 
         deleted_children = False
-        if self.database.children.where([("team_id", object_id)]):
+        if self.database.children.exists_where([("team_id", object_id)]):
             deleted_children = True
             if not cascade:
                 error_msg = (
@@ -366,6 +404,8 @@ class TeamService(BaseService):
                 raise exceptions.TeamHasChildrenError(error_msg)
 
         logger.info(f"Deleting team with ID {object_id}")
+        self.database.tombstones.create_for_teams([("id", object_id)])
+        # children, workshops and attendances are deleted by the database
         self.database.teams.delete(object_id=object_id)
         self.commit()
 
@@ -402,6 +442,17 @@ class TeamService(BaseService):
         ]
         return workshops_out
 
+    def get_workshops_version(self, team_id: int) -> tuple:
+        """Get a version of the workshops returned by `get_workshops`."""
+        self.current_user.verify_permission(self.permissions.workshops_read)
+        team = self._validate_team_exists(team_id)
+
+        # deleting a child deletes its attendances, so count those as well
+        return (
+            team.last_updated_at,
+            self.database.attendances.count_by_team(team_id=team_id),
+        )
+
     def get_workshop_by_number(
         self, team_id: int, workshop_number: int
     ) -> TeamGetWorkshopByNumberOut:
@@ -452,6 +503,57 @@ class TeamService(BaseService):
         )
         return workshop
 
+    def get_dashboard(self, team_id: int) -> TeamGetDashboardOut:
+        """Get a team with its children, workshops and the attendance of
+        every child to every workshop, in a fixed number of queries."""
+        self.current_user.verify_permission(self.permissions.teams_read)
+        self.current_user.verify_permission(self.permissions.workshops_read)
+        team = self._validate_team_exists(team_id)
+
+        children = sorted(
+            self.database.children.where([("team_id", team_id)]),
+            key=lambda child: child.first_name,
+        )
+        workshops = sorted(
+            self.database.workshops.where([("team_id", team_id)]),
+            key=lambda workshop: workshop.workshop_number,
+        )
+        rows = {child.id: i for i, child in enumerate(children)}
+        columns = {workshop.id: j for j, workshop in enumerate(workshops)}
+        matrix = [[None] * len(workshops) for _ in children]
+        for workshop_id, child_id, attendance in self.database.attendances.read_by_team(
+            team_id
+        ):
+            matrix[rows[child_id]][columns[workshop_id]] = attendance
+
+        progress = workshops[-1].workshop_number if workshops else 0
+        return TeamGetDashboardOut(
+            team=self._to_team_out(team, progress),
+            children={
+                "id": [child.id for child in children],
+                "first_name": [child.first_name for child in children],
+                "last_name": [child.last_name for child in children],
+                "age": [child.age for child in children],
+                "gender": [child.gender for child in children],
+                "is_active": [child.is_active for child in children],
+            },
+            workshops={
+                "id": [workshop.id for workshop in workshops],
+                "number": [workshop.workshop_number for workshop in workshops],
+                "date": [workshop.date for workshop in workshops],
+            },
+            attendance=matrix,
+        )
+
+    def get_dashboard_version(self, team_id: int) -> tuple:
+        """Get a version of the dashboard returned by `get_dashboard`."""
+        self.current_user.verify_permission(self.permissions.teams_read)
+        self.current_user.verify_permission(self.permissions.workshops_read)
+        return (
+            *self.get_version(object_id=team_id),
+            self.database.attendances.count_by_team(team_id=team_id),
+        )
+
     def get_aggregated_attendance(self, workshop_id: int) -> dict:
         """Get aggregated attendance score of a workshop."""
         attendance = self.database.attendances.where([("workshop_id", workshop_id)])
@@ -473,9 +575,9 @@ class TeamService(BaseService):
         }
 
     def _validate_team_exists(self, team_id: int):
-        """Check if a team exists."""
+        """Check if a team exists and return it."""
         try:
-            return self.database.teams.read(object_id=team_id)
+            return self._load(self.database.teams, team_id)
         except exceptions.ItemNotFoundError:
             error_msg = f"Team with ID {team_id} not found"
             logger.error(error_msg)
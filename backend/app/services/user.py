@@ -1,16 +1,16 @@
 import logging
 import uuid
-from typing import Annotated
+from functools import cached_property
+from typing import TYPE_CHECKING
 
 import models
 from core import exceptions
-from core.auth import BearerTokenHandlerInst
-from core.database.session import SessionDependency
-from core.settings import SettingsDependency
-from fastapi import Depends
-from repositories.auth0 import Auth0Repository
+from core.cache import user_tag
 from services._base import BaseService
 
+if TYPE_CHECKING:
+    from repositories.auth0 import Auth0Repository
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,16 +28,14 @@ class UserService(BaseService):
         models.role.Role.coach: [models.role.Level.community, models.role.Level.team],
     }
 
-    def __init__(
-        self,
-        session: SessionDependency,
-        settings: SettingsDependency,
-        current_user: Annotated[
-            BearerTokenHandlerInst, Depends(BearerTokenHandlerInst)
-        ],
-    ) -> None:
-        super().__init__(session=session, settings=settings, current_user=current_user)
-        self.auth0 = Auth0Repository(settings=self.settings)
+    @cached_property
+    def auth0(self) -> "Auth0Repository":
+        """Auth0 repository, only created when a method needs Auth0.
+        The Auth0 SDK is imported here as well, since importing it
+        takes a large share of the startup time of the API."""
+        from repositories.auth0 import Auth0Repository
+
+        return Auth0Repository(settings=self.settings)
 
     def create(self, obj: models.user.UserPostIn) -> str:
         """Invite new user to the system, by first creating,
@@ -139,6 +137,7 @@ class UserService(BaseService):
         # delete user roles from the database
         self.database.roles.delete_where(attr="user_id", value=user_id)
         self.commit()
+        self.response_cache.invalidate(user_tag(user_id))
         msg = f"User with ID {user_id} deleted."
         logger.info(msg)
         return msg
@@ -197,6 +196,7 @@ class UserService(BaseService):
         )
         logger.info(msg)
         self.commit()
+        self.response_cache.invalidate(user_tag(user_id))
         return models.generic.Message(detail=msg)
 
     def get_roles(self, user_id: str) -> list:
@@ -264,6 +264,9 @@ class UserService(BaseService):
             self.auth0.delete_role(user_id=user_id, role_name=role)
 
         self.commit()
+        # cached responses are keyed by the roles of a user, so they would
+        # not be served anymore anyway, but there is no point in keeping them
+        self.response_cache.invalidate(user_tag(user_id))
         msg = (
             f"Role '{role.role}' for {role.level} on "
             f"{role.resource_path} deleted from user {user_id}"
@@ -6,4 +6,4 @@ alembic --raiseerr upgrade head
 
 echo "Starting backend"
 cd app
-uvicorn main:app --proxy-headers --host 0.0.0.0 --port ${PORT}
+python server.py
@@ -0,0 +1,25 @@
+"""Fixtures for micro-benchmarks. Benchmarks are marked `benchmark` and
+deselected by default, since some start real servers, run them with
+`make benchmark`. They print their timings (visible with `pytest -s`) and
+only assert on behaviour, never on absolute timings."""
+
+import time
+
+import pytest
+
+
+@pytest.fixture
+def benchmark():
+    """Run a callable a number of rounds and return the mean duration in seconds."""
+
+    def run(func, rounds: int = 1000, label: str = None) -> float:
+        # warm up caches before timing
+        func()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        mean = (time.perf_counter() - start) / rounds
+        print(f"\n{label or func.__name__}: {mean * 1e6:.1f} µs/call ({rounds} rounds)")
+        return mean
+
+    return run
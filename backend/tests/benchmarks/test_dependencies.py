@@ -0,0 +1,51 @@
+"""Micro-benchmark of the per-request cost of resolving service dependencies."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from repositories import database
+from services import CommunityService, TeamService, UserService
+
+pytestmark = pytest.mark.benchmark
+
+SERVICES = [UserService, CommunityService, TeamService]
+
+
+@pytest.fixture
+def repository_spy(mocker):
+    """Spy on the creation of all database repositories."""
+    return mocker.spy(database.BaseRepository, "__init__")
+
+
+def test_service_construction_is_lazy(session, settings, repository_spy, mocker):
+    # assert that injecting services does not construct repositories
+    # or external clients until they are actually used
+    auth0 = mocker.patch("repositories.auth0.Auth0Repository")
+    for service in SERVICES:
+        service(session=session, settings=settings, current_user=None)
+
+    assert repository_spy.call_count == 0
+    auth0.assert_not_called()
+
+
+def test_repositories_created_on_first_access(session, settings, repository_spy):
+    # assert that only the accessed repository is constructed, and only once
+    service = TeamService(session=session, settings=settings, current_user=None)
+    assert service.database.teams is service.database.teams
+    assert repository_spy.call_count == 1
+
+
+def test_benchmark_list_resources_dependencies(session, settings, benchmark):
+    # per request GET /roles/resources resolves four services
+    current_user = MagicMock()
+
+    def resolve():
+        for service in SERVICES:
+            service(
+                session=session,
+                settings=settings,
+                current_user=current_user,
+            )
+        database.ImplementingPartnerRepository(session=session)
+
+    benchmark(resolve, rounds=10_000, label="resolve /roles/resources dependencies")
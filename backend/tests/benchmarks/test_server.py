@@ -0,0 +1,115 @@
+"""Benchmark of the throughput of the production server with one worker
+and with a worker per CPU core. The speedup depends on the number of cores
+of the machine that runs it, so it is printed and not asserted."""
+
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+APP_DIR = Path(__file__).parents[2] / "app"
+DURATION = 2
+CONNECTIONS = 16
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(connection: http.client.HTTPConnection) -> int:
+    connection.request("GET", "/health")
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+
+def _wait_until_up(port: int, timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _get(http.client.HTTPConnection("127.0.0.1", port, timeout=1))
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"server did not start on port {port}")
+
+
+def _throughput(port: int) -> tuple[float, list[int]]:
+    """Requests per second of CONNECTIONS keep-alive clients, and the
+    statuses of their responses."""
+    statuses = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + DURATION
+
+    def client():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        own = []
+        while time.monotonic() < deadline:
+            own.append(_get(connection))
+        with lock:
+            statuses.extend(own)
+
+    threads = [threading.Thread(target=client) for _ in range(CONNECTIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(statuses) / DURATION, statuses
+
+
+def _serve(settings, tmp_path, workers: int) -> tuple[float, list[int]]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "POSTGRES_DATABASE_URL": f"sqlite:///{tmp_path / 'server.db'}",
+        "ALLOWED_ORIGINS": "http://localhost:8000",
+        "FEATURE_AUTH0": "false",
+        "SCHEDULER_ENABLED": "false",
+        "AUTH0_SERVER": settings.AUTH0_SERVER,
+        "AUTH0_AUDIENCE": settings.AUTH0_AUDIENCE,
+        "AUTH0_CLIENT_ID": settings.AUTH0_CLIENT_ID,
+        "AUTH0_CLIENT_SECRET": settings.AUTH0_CLIENT_SECRET,
+        "AUTH0_CONNECTION_ID": settings.AUTH0_CONNECTION_ID,
+        "RESEND_API_KEY": settings.RESEND_API_KEY,
+        "RESEND_SENDER": settings.RESEND_SENDER,
+        "PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "server.py"],
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_up(port)
+        return _throughput(port)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def test_benchmark_throughput_per_worker(settings, tmp_path):
+    # assert that the server answers all requests with any number of workers
+    workers = max(os.cpu_count() or 1, 2)
+    single, single_statuses = _serve(settings, tmp_path, workers=1)
+    multi, multi_statuses = _serve(settings, tmp_path, workers=workers)
+    print(
+        f"\n1 worker: {single:.0f} req/s, {workers} workers: {multi:.0f} req/s "
+        f"({multi / single:.1f}x on {os.cpu_count()} cores)"
+    )
+
+    assert single_statuses and set(single_statuses) == {200}
+    assert multi_statuses and set(multi_statuses) == {200}
@@ -0,0 +1,94 @@
+"""Benchmark of the time it takes a fresh worker to serve its first request,
+from importing the app through startup to answering `GET /health`."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+APP_DIR = Path(__file__).parents[2] / "app"
+
+# integrations that are only needed by some requests and slow to import
+LAZY_MODULES = ["auth0", "resend", "jwt", "httpx"]
+
+# runs in a new interpreter, so that nothing is imported yet
+WORKER = """
+import asyncio, json, sys, time
+
+start = time.perf_counter()
+from main import app
+imported = time.perf_counter()
+
+
+async def first_request():
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/health", "raw_path": b"/health",
+        "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 8000),
+    }
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        return started, messages[0]["status"]
+
+
+started, status = asyncio.run(first_request())
+print(json.dumps({
+    "import": imported - start,
+    "startup": started - imported,
+    "first_request": time.perf_counter() - start,
+    "status": status,
+    "modules": sorted(set(sys.modules) & set(json.loads(sys.argv[1]))),
+}))
+"""
+
+
+def test_benchmark_time_to_first_request(settings, tmp_path):
+    # assert that a worker serves its first request without creating tables
+    # or importing the integrations that the request does not need
+    env = {
+        **os.environ,
+        "POSTGRES_DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}",
+        "ALLOWED_ORIGINS": "http://localhost:8000",
+        "FEATURE_AUTH0": "false",
+        "SCHEDULER_ENABLED": "false",
+        "AUTH0_SERVER": settings.AUTH0_SERVER,
+        "AUTH0_AUDIENCE": settings.AUTH0_AUDIENCE,
+        "AUTH0_CLIENT_ID": settings.AUTH0_CLIENT_ID,
+        "AUTH0_CLIENT_SECRET": settings.AUTH0_CLIENT_SECRET,
+        "AUTH0_CONNECTION_ID": settings.AUTH0_CONNECTION_ID,
+        "RESEND_API_KEY": settings.RESEND_API_KEY,
+        "RESEND_SENDER": settings.RESEND_SENDER,
+    }
+    env.pop("DATABASE_CREATE_ALL", None)
+    worker = subprocess.run(
+        [sys.executable, "-c", WORKER, json.dumps(LAZY_MODULES)],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert worker.returncode == 0, worker.stderr
+    result = json.loads(worker.stdout.splitlines()[-1])
+    print(
+        f"\nimport: {result['import'] * 1e3:.0f} ms, "
+        f"startup: {result['startup'] * 1e3:.0f} ms, "
+        f"time to first request: {result['first_request'] * 1e3:.0f} ms"
+    )
+
+    assert result["status"] == 200
+    assert result["modules"] == []
@@ -0,0 +1,81 @@
+"""Benchmark of GET /teams on a large number of teams."""
+
+from datetime import datetime
+
+import pytest
+from core.cache import get_response_cache
+from core.database import schema
+from fastapi import status
+
+pytestmark = pytest.mark.benchmark
+
+N_TEAMS = 1000
+
+
+@pytest.fixture
+def client_with_teams(client, session):
+    # arrange one community with many teams, visible for the mocked user
+    now = datetime.now()
+    metadata = {"created_at": now, "last_updated_at": now, "is_active": True}
+    implementing_partner = schema.ImplementingPartner(name="Little Lions", **metadata)
+    session.add(implementing_partner)
+    session.flush()
+    community = schema.Community(
+        name="Community", implementing_partner_id=implementing_partner.id, **metadata
+    )
+    session.add(community)
+    session.flush()
+    session.add_all(
+        schema.Team(
+            name=f"Team {i}",
+            community_id=community.id,
+            implementing_partner_id=implementing_partner.id,
+            **metadata,
+        )
+        for i in range(N_TEAMS)
+    )
+    session.add(
+        schema.Role(
+            user_id="something",
+            role="Admin",
+            level="Implementing Partner",
+            resource_path=f"/implementingPartners/{implementing_partner.id}",
+        )
+    )
+    session.commit()
+    yield client
+
+
+def test_benchmark_get_teams(client_with_teams, benchmark, settings):
+    response = client_with_teams.get("/teams")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    teams = response.json().get("data")
+    assert len(teams) == N_TEAMS
+    assert teams[0]["community"]["name"] == "Community"
+    assert teams[0]["program"]["progress"] == {"current": 0, "total": 12}
+
+    cache = get_response_cache(settings)
+
+    def get_teams():
+        cache.clear()
+        return client_with_teams.get("/teams")
+
+    benchmark(get_teams, rounds=10, label=f"GET /teams with {N_TEAMS} teams")
+    benchmark(
+        lambda: client_with_teams.get("/teams"),
+        rounds=10,
+        label=f"GET /teams with {N_TEAMS} teams, cached",
+    )
+
+
+def test_benchmark_get_teams_not_modified(client_with_teams, benchmark):
+    etag = client_with_teams.get("/teams").headers["ETag"]
+    headers = {"If-None-Match": etag}
+    response = client_with_teams.get("/teams", headers=headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    benchmark(
+        lambda: client_with_teams.get("/teams", headers=headers),
+        rounds=10,
+        label=f"GET /teams with {N_TEAMS} teams, not modified",
+    )
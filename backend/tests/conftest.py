@@ -1,10 +1,16 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+
 import pytest
 from core.auth import BearerTokenHandlerInst
 from core.database.session import get_session
+from core.database.views import create_views
 from core.settings import Settings, get_settings
 from fastapi import status
 from fastapi.testclient import TestClient
 from main import app
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
 
@@ -20,9 +26,16 @@ DefaultTestSettings = Settings(
     ALLOWED_ORIGINS="http://localhost:8000,http://digitallions.com",
     RESEND_API_KEY="test-resend-api-key",
     RESEND_SENDER="From <your@app.com>",
+    RATE_LIMIT_PER_SECOND=0,
 )
 
 
+@pytest.fixture(name="settings")
+def settings_fixture():
+    """Settings used by the test client."""
+    return DefaultTestSettings
+
+
 @pytest.fixture(name="session")
 def session_fixture():
     """Create an in-memory SQLite database for testing."""
@@ -31,12 +44,50 @@ def session_fixture():
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    # enforce foreign keys like Postgres does, including ON DELETE clauses
+    event.listen(
+        engine,
+        "connect",
+        lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"),
+    )
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        create_views(connection)
 
     with Session(engine, autocommit=False, autoflush=False) as session:
         yield session
 
 
+@pytest.fixture
+def count_queries(session):
+    """Count the SELECT statements per table that are executed within a block.
+
+    ```
+    with count_queries() as counts:
+        client.get("/communities/1")
+    assert counts["communities"] == 1
+    ```
+    """
+
+    @contextmanager
+    def count():
+        counts = Counter()
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            match = re.match(r"\s*SELECT\b.*?\bFROM (\w+)", statement, re.S)
+            if match:
+                counts[match.group(1)] += 1
+
+        engine = session.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            yield counts
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+    return count
+
+
 @pytest.fixture
 def client(mocker, session):
     """Create a FastAPI test client."""
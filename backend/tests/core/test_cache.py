@@ -0,0 +1,47 @@
+from core.cache import CacheTag, LRUResponseCache, user_tag
+
+
+def test_lru_eviction():
+    # assert that the least recently used entry is evicted first
+    cache = LRUResponseCache(max_size=2, ttl=60)
+    cache.set("a", b"a", tags=[])
+    cache.set("b", b"b", tags=[])
+    assert cache.get("a") == b"a"
+    cache.set("c", b"c", tags=[])
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a"
+    assert cache.get("c") == b"c"
+
+
+def test_ttl_expiry(mocker):
+    # assert that entries expire after the TTL
+    monotonic = mocker.patch("core.cache.time.monotonic", return_value=0)
+    cache = LRUResponseCache(max_size=2, ttl=10)
+    cache.set("a", b"a", tags=[])
+    monotonic.return_value = 11
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_by_tag():
+    # assert that only entries with one of the tags are removed
+    cache = LRUResponseCache(max_size=10, ttl=60)
+    cache.set("teams", b"[]", tags=[CacheTag.teams, user_tag("1")])
+    cache.set("communities", b"[]", tags=[CacheTag.communities, user_tag("1")])
+    cache.set("other user", b"[]", tags=[CacheTag.communities, user_tag("2")])
+
+    cache.invalidate(CacheTag.teams)
+    assert cache.get("teams") is None
+    assert cache.get("communities") == b"[]"
+
+    cache.invalidate(user_tag("1"))
+    assert cache.get("communities") is None
+    assert cache.get("other user") == b"[]"
+
+
+def test_disabled():
+    # assert that nothing is cached with a size of 0
+    cache = LRUResponseCache(max_size=0, ttl=60)
+    cache.set("a", b"a", tags=[])
+    assert cache.get("a") is None
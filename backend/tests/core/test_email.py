@@ -0,0 +1,36 @@
+from core.email import BATCH_SIZE, EmailService, get_email_service
+
+
+def test_email_service_is_singleton(settings):
+    # assert that the email service and its templates are only created once
+    service = get_email_service(settings)
+    assert get_email_service(settings) is service
+
+
+def test_render_invites():
+    # assert that the compiled invite template is rendered for every recipient
+    service = EmailService(api_key="key", sender="From <your@app.com>")
+    invites = [(f"user{i}@app.com", f"https://link/{i}") for i in range(3)]
+
+    params = service.render_invites(invites)
+
+    assert [p["to"][0] for p in params] == [email for email, _ in invites]
+    for (_, link), p in zip(invites, params):
+        assert link in p["html"]
+        assert "{{" not in p["html"]
+
+
+def test_send_invite_links_in_batches(mocker):
+    # assert that invites are sent in batches of at most BATCH_SIZE emails
+    resend = mocker.MagicMock()
+    mocker.patch("core.email._import_resend", return_value=resend)
+    resend.Batch.send.side_effect = lambda params: {
+        "data": [{"id": p["to"][0]} for p in params]
+    }
+    service = EmailService(api_key="key", sender="From <your@app.com>")
+    invites = [(f"user{i}@app.com", "https://link") for i in range(BATCH_SIZE + 1)]
+
+    email_ids = service.send_invite_links(invites)
+
+    assert resend.Batch.send.call_count == 2
+    assert len(email_ids) == BATCH_SIZE + 1
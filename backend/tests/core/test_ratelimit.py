@@ -0,0 +1,45 @@
+import pytest
+from core.ratelimit import InFlightLimiter, MemoryRateLimitStore
+
+
+def test_burst_and_refill(mocker):
+    # assert that a burst of requests is allowed, and then one per interval
+    monotonic = mocker.patch("core.ratelimit.time.monotonic", return_value=0)
+    store = MemoryRateLimitStore(max_size=10)
+    assert [store.acquire("a", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert store.acquire("a", rate=2, burst=3) == pytest.approx(0.5)
+
+    # assert that other keys have buckets of their own
+    assert store.acquire("b", rate=2, burst=3) == 0
+
+    monotonic.return_value = 0.5
+    assert store.acquire("a", rate=2, burst=3) == 0
+    assert store.acquire("a", rate=2, burst=3) == pytest.approx(0.5)
+
+    # assert that a bucket does not fill up beyond the burst
+    monotonic.return_value = 100
+    assert [store.acquire("a", rate=2, burst=3) for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_least_recently_used_bucket_dropped():
+    # assert that the buckets are bounded, dropping the least recently used
+    store = MemoryRateLimitStore(max_size=2)
+    for key in ["a", "b", "a", "c"]:
+        store.acquire(key, rate=1, burst=1)
+    assert len(store) == 2
+    # the bucket of "b" was dropped, so it is full again
+    assert store.acquire("b", rate=1, burst=1) == 0
+    assert store.acquire("c", rate=1, burst=1) > 0
+
+
+def test_in_flight_limit():
+    # assert that requests beyond the limit are not counted in
+    limiter = InFlightLimiter()
+    assert limiter.enter(limit=2)
+    assert limiter.enter(limit=2)
+    assert not limiter.enter(limit=2)
+    limiter.leave()
+    assert limiter.enter(limit=2)
+    # assert that a limit of 0 disables the cap
+    assert limiter.enter(limit=0)
+    assert limiter.in_flight == 3
@@ -0,0 +1,44 @@
+import asyncio
+
+from core.scheduler import Scheduler
+
+
+def test_run_due_jobs(session, settings, mocker):
+    # assert that jobs run when due, once per interval
+    mocker.patch("core.scheduler.get_engine", return_value=session.get_bind())
+    monotonic = mocker.patch("core.scheduler.time.monotonic", return_value=0)
+    scheduler = Scheduler()
+    runs = []
+
+    @scheduler.job(interval=60, description="Counts its runs")
+    def count(session, settings):
+        runs.append(monotonic.return_value)
+
+    async def tick():
+        assert scheduler._elect()
+        await scheduler._run_due_jobs(settings)
+
+    asyncio.run(tick())
+    monotonic.return_value = 30
+    asyncio.run(tick())
+    monotonic.return_value = 61
+    asyncio.run(tick())
+    assert runs == [0, 61]
+
+
+def test_failed_job_does_not_stop_others(session, settings, mocker):
+    # assert that a failing job is logged and the other jobs still run
+    mocker.patch("core.scheduler.get_engine", return_value=session.get_bind())
+    scheduler = Scheduler()
+    runs = []
+
+    @scheduler.job(interval=60, description="Fails")
+    def fails(session, settings):
+        raise ValueError("failed")
+
+    @scheduler.job(interval=60, description="Succeeds")
+    def succeeds(session, settings):
+        runs.append("succeeds")
+
+    asyncio.run(scheduler._run_due_jobs(settings))
+    assert runs == ["succeeds"]
@@ -0,0 +1,204 @@
+import base64
+import json
+
+import pytest
+from core.database import schema
+from core.database import session as db_session
+from core.database.session import SessionDependency, get_session, use_primary
+from fastapi import Depends, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from starlette.requests import Request
+
+ORIGIN = "http://frontend.example"
+
+
+@pytest.fixture
+def databases(tmp_path, settings, mocker):
+    """Primary database and read replica as two SQLite databases."""
+    primary = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(primary)
+    schema.RecentWrite.__table__.create(engine)
+    engine.dispose()
+    settings = settings.model_copy(
+        update={
+            "POSTGRES_DATABASE_URL": primary,
+            "POSTGRES_READ_REPLICA_URL": replica,
+            "READ_YOUR_WRITES_SECONDS": 5,
+        }
+    )
+    mocker.patch.object(db_session, "get_settings", return_value=settings)
+    yield primary, replica
+
+
+def _token(user_id: str) -> str:
+    """Unsigned bearer token of a user, only its claims are read."""
+    claims = base64.urlsafe_b64encode(json.dumps({"sub": user_id}).encode())
+    return f"header.{claims.decode().rstrip('=')}.signature"
+
+
+def _request(method: str, user_id: str = "a") -> Request:
+    headers = [(b"authorization", f"Bearer {_token(user_id)}".encode())]
+    return Request({"type": "http", "method": method, "headers": headers})
+
+
+def _database(method: str, user_id: str = "a", commit: bool = False) -> str:
+    """URL of the database that serves a request, which commits if asked to."""
+    sessions = get_session(_request(method, user_id))
+    session = next(sessions)
+    url = str(session.get_bind().url)
+    if commit:
+        session.execute(text("SELECT 1"))
+        session.commit()
+    sessions.close()
+    return url
+
+
+def test_reads_use_replica(databases):
+    # assert that reads go to the replica and writes to the primary
+    primary, replica = databases
+    assert _database("GET") == replica
+    assert _database("OPTIONS") == replica
+    assert _database("POST") == primary
+    assert _database("DELETE", user_id="b") == primary
+    # assert that requests that did not commit are not writes
+    assert _database("GET") == replica
+
+
+def test_read_your_writes(databases, mocker):
+    # assert that the reads of a user go to the primary shortly after a write
+    primary, replica = databases
+    clock = mocker.patch("core.database.session.time.time", return_value=100)
+    assert _database("PATCH", commit=True) == primary
+    clock.return_value = 104
+    assert _database("GET") == primary
+    # other users did not write
+    assert _database("GET", user_id="b") == replica
+    clock.return_value = 106
+    assert _database("GET") == replica
+
+
+def test_read_your_writes_across_origins(databases, mocker):
+    # assert that a browser on another origin, which sends no cookies,
+    # reads its writes, and that preflight requests are no writes
+    primary, replica = databases
+    clock = mocker.patch("core.database.session.time.time", return_value=100)
+    app = FastAPI()
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[ORIGIN],
+        allow_methods=["*"],
+        allow_headers=["Content-Type", "Authorization"],
+    )
+
+    @app.get("/")
+    def read(session: SessionDependency) -> str:
+        return str(session.get_bind().url)
+
+    @app.post("/")
+    def write(session: SessionDependency) -> str:
+        session.execute(text("SELECT 1"))
+        session.commit()
+        return str(session.get_bind().url)
+
+    client = TestClient(app, headers={"Origin": ORIGIN})
+    auth = {"Authorization": f"Bearer {_token('a')}"}
+
+    preflight = client.options(
+        "/",
+        headers={
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "authorization",
+        },
+    )
+    assert preflight.status_code == 200, preflight.text
+    assert client.get("/", headers=auth).json() == replica
+
+    assert client.post("/", headers=auth).json() == primary
+    assert not client.cookies
+    clock.return_value = 104
+    assert client.get("/", headers=auth).json() == primary
+    clock.return_value = 106
+    assert client.get("/", headers=auth).json() == replica
+
+
+def test_use_primary(databases):
+    # assert that routes that depend on use_primary read from the primary
+    primary, replica = databases
+    app = FastAPI()
+
+    @app.get("/", dependencies=[Depends(use_primary)])
+    def read(session: SessionDependency) -> str:
+        return str(session.get_bind().url)
+
+    assert TestClient(app).get("/").json() == primary
+
+
+def test_user_id_from_token():
+    # assert that the user is read from the token, which may be refreshed
+    assert db_session._get_user_id(_request("GET", user_id="a")) == "a"
+    assert db_session._get_user_id(Request({"type": "http", "headers": []})) == ""
+    request = Request({"type": "http", "headers": [(b"authorization", b"Bearer x")]})
+    assert db_session._get_user_id(request) == ""
+
+
+def test_without_replica(databases, mocker, settings):
+    # assert that all requests go to the primary without a replica,
+    # and that writes are not recorded then
+    primary, _ = databases
+    settings = db_session.get_settings().model_copy(
+        update={"POSTGRES_READ_REPLICA_URL": None}
+    )
+    mocker.patch.object(db_session, "get_settings", return_value=settings)
+    record = mocker.patch.object(db_session, "_record_write")
+    assert _database("POST", commit=True) == primary
+    assert _database("GET") == primary
+    record.assert_not_called()
+
+
+def test_engine_pool_size(settings, mocker):
+    # assert that the engines get a connection pool of the configured size
+    settings = settings.model_copy(
+        update={"DATABASE_POOL_SIZE": 3, "DATABASE_MAX_OVERFLOW": 2}
+    )
+    mocker.patch.object(db_session, "get_settings", return_value=settings)
+    for engine in [db_session.get_engine(), db_session.get_read_engine()]:
+        assert engine.pool.size() == 3
+        assert engine.pool._max_overflow == 2
+
+
+def test_pool_exceeds_thread_pool(settings):
+    # assert that a pool with fewer connections than threads is rejected
+    settings = settings.model_copy(
+        update={
+            "THREAD_POOL_SIZE": 10,
+            "DATABASE_POOL_SIZE": 5,
+            "DATABASE_MAX_OVERFLOW": 5,
+        }
+    )
+    with pytest.raises(ValueError, match="THREAD_POOL_SIZE"):
+        settings.validate_pool_settings()
+    settings.DATABASE_MAX_OVERFLOW = 6
+    assert settings.validate_pool_settings() is settings
+
+
+def test_pool_within_connection_budget(settings, mocker):
+    # assert that all workers together may not open more connections than
+    # the budget, counting the pool of the postgres rate limit store
+    mocker.patch("core.settings.os.cpu_count", return_value=4)
+    settings = settings.model_copy(
+        update={
+            "THREAD_POOL_SIZE": 8,
+            "DATABASE_POOL_SIZE": 4,
+            "DATABASE_MAX_OVERFLOW": 5,
+            "DATABASE_MAX_CONNECTIONS": 36,
+        }
+    )
+    assert settings.validate_pool_settings() is settings
+    settings.RATE_LIMIT_STORE = "postgres"
+    with pytest.raises(ValueError, match="DATABASE_MAX_CONNECTIONS"):
+        settings.validate_pool_settings()
+    settings.SERVER_WORKERS = 3
+    assert settings.validate_pool_settings() is settings
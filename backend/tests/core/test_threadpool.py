@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from core.metrics import metrics
+from core.threadpool import ThreadPool
+
+
+def test_run_in_thread():
+    # assert that calls run in another thread and return their result
+    pool = ThreadPool(size=2)
+
+    async def main():
+        return await pool.run(lambda x: (x, threading.get_ident()), 1)
+
+    result, thread = asyncio.run(main())
+    assert result == 1
+    assert thread != threading.get_ident()
+
+
+def test_run_raises():
+    # assert that exceptions of calls are raised in the route
+    pool = ThreadPool(size=2)
+
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError, match="failed"):
+        asyncio.run(pool.run(fail))
+
+
+def test_slow_call_does_not_block():
+    # assert that the event loop serves other work during a slow call
+    pool = ThreadPool(size=2)
+    ticks = []
+
+    async def tick():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(pool.run(time.sleep, 0.2), tick())
+
+    asyncio.run(main())
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.2
+
+
+def test_pool_is_bounded():
+    # assert that no more calls run at once than the pool has threads,
+    # and that the calls that wait for a thread are counted
+    pool = ThreadPool(size=2)
+    running, max_running = 0, 0
+    lock = threading.Lock()
+    saturated = metrics.value("threadpool_saturated_total")
+
+    def call():
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    async def main():
+        await asyncio.gather(*(pool.run(call) for _ in range(6)))
+
+    asyncio.run(main())
+    assert max_running == 2
+    assert metrics.value("threadpool_saturated_total") - saturated == 4
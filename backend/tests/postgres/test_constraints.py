@@ -0,0 +1,36 @@
+import pytest
+from core import exceptions
+from models.team import TeamPostIn
+from repositories.database import DatabaseRepositories
+from sqlalchemy.exc import IntegrityError
+
+
+@pytest.fixture
+def database(postgres_session):
+    return DatabaseRepositories(session=postgres_session)
+
+
+def test_unique_violation_is_translated(database):
+    # assert that a unique violation raises the domain exception of the repository
+    team = TeamPostIn(name="Team 1", community_id=1, implementing_partner_id=1)
+    with pytest.raises(exceptions.TeamAlreadyExistsError):
+        database.teams.create(team)
+
+
+def test_foreign_key_violation_is_not_translated(database):
+    # assert that other integrity errors are not mistaken for duplicates
+    team = TeamPostIn(name="New team", community_id=0, implementing_partner_id=1)
+    with pytest.raises(IntegrityError):
+        database.teams.create(team)
+
+
+def test_delete_cascades_in_database(database, explain):
+    # assert that deleting a community is a single DELETE statement and the
+    # database deletes its teams, children, workshops and attendances
+    community = database.communities.read(object_id=1)
+    plans = explain(lambda: database.communities.delete(object_id=community.id))
+    assert len(plans) == 1
+    assert plans[0].startswith("Delete on communities"), plans[0]
+    assert not database.teams.exists_where([("community_id", 1)])
+    assert not database.workshops.exists_where([("team_id", 1)])
+    assert not database.children.exists_where([("team_id", 1)])
@@ -0,0 +1,36 @@
+import pytest
+from repositories.database import DatabaseRepositories
+
+
+@pytest.fixture
+def database(postgres_session):
+    return DatabaseRepositories(session=postgres_session)
+
+
+def test_delete_where_returns_count(database, explain):
+    # assert that deleting by attribute is a single statement returning the count
+    deleted = []
+    plans = explain(
+        lambda: deleted.append(
+            database.attendances.delete_where(attr="child_id", value=1)
+        )
+    )
+    assert deleted == [6]
+    assert len(plans) == 1
+    assert not database.attendances.exists_where([("child_id", 1)])
+
+
+def test_delete_bulk_returns_count(database, explain):
+    # assert that deleting by a list of IDs is a single statement returning the count
+    deleted = []
+    plans = explain(
+        lambda: deleted.append(database.workshops.delete_bulk("id", [1, 2, 3, 0]))
+    )
+    assert deleted == [3]
+    assert len(plans) == 1
+    assert not database.workshops.where_in("id", [1, 2, 3])
+
+
+def test_delete_bulk_empty(database, explain):
+    # assert that no statement is executed for an empty list
+    assert explain(lambda: database.workshops.delete_bulk("id", [])) == []
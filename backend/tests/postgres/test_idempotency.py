@@ -0,0 +1,80 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from core import exceptions
+from core.database import schema
+from repositories.database import IdempotencyKeyRepository
+from sqlmodel import Session, delete
+
+SINCE = datetime.now() - timedelta(hours=1)
+CLAIM = {"user_id": "auth0|1", "key": "key", "request_hash": "hash", "since": SINCE}
+
+
+@pytest.fixture
+def sessions(postgres_engine):
+    """Sessions of two concurrent requests."""
+    with Session(postgres_engine, autoflush=False) as first, Session(
+        postgres_engine, autoflush=False
+    ) as second:
+        yield first, second
+    with postgres_engine.begin() as connection:
+        connection.execute(delete(schema.IdempotencyKey))
+
+
+def _claim_in_thread(session: Session) -> dict:
+    """Claim the key in a thread, which blocks while another
+    transaction holds a claim that is not committed yet."""
+    outcome = {}
+
+    def claim():
+        try:
+            outcome["record"] = IdempotencyKeyRepository(session).claim(**CLAIM)
+        except exceptions.BaseAPIException as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=claim)
+    thread.start()
+    outcome["thread"] = thread
+    return outcome
+
+
+def test_concurrent_claims(sessions):
+    # assert that a request with the key of a request in progress waits for
+    # its transaction, and then gets a conflict until the response is recorded
+    first, second = sessions
+    assert IdempotencyKeyRepository(first).claim(**CLAIM) is None
+
+    outcome = _claim_in_thread(second)
+    outcome["thread"].join(timeout=0.5)
+    assert outcome["thread"].is_alive()
+
+    # the changes of the request are committed along with the claim
+    first.commit()
+    outcome["thread"].join(timeout=5)
+    assert isinstance(outcome["error"], exceptions.IdempotencyKeyInProgressError)
+
+    repository = IdempotencyKeyRepository(first)
+    repository.complete(
+        user_id="auth0|1",
+        key="key",
+        request_hash="hash",
+        status_code=201,
+        response="{}",
+    )
+    first.commit()
+    second.rollback()
+    record = IdempotencyKeyRepository(second).claim(**CLAIM)
+    assert (record.status_code, record.response) == (201, "{}")
+
+
+def test_claim_rolled_back(sessions):
+    # assert that the key is free again if the request that claimed it fails
+    first, second = sessions
+    IdempotencyKeyRepository(first).claim(**CLAIM)
+
+    outcome = _claim_in_thread(second)
+    first.rollback()
+    outcome["thread"].join(timeout=5)
+    assert "error" not in outcome
+    assert outcome["record"] is None
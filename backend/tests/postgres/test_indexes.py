@@ -0,0 +1,55 @@
+import pytest
+from repositories.database import DatabaseRepositories
+
+
+@pytest.fixture
+def database(postgres_session):
+    return DatabaseRepositories(session=postgres_session)
+
+
+@pytest.mark.parametrize(
+    "query,index",
+    [
+        (
+            lambda db: db.children.where([("team_id", 10)]),
+            "unique_child_name_per_team",
+        ),
+        (
+            lambda db: db.teams.where([("community_id", 10)]),
+            "ix_teams_community_id",
+        ),
+        (
+            lambda db: db.workshops.where([("team_id", 10)]),
+            "unique_workshop_number_per_team",
+        ),
+        (
+            lambda db: db.workshops.where([("team_id", 10), ("workshop_number", 2)]),
+            "unique_workshop_number_per_team",
+        ),
+        (
+            lambda db: db.workshops.get_last_workshop_per_team(team_ids=[1, 2, 3]),
+            "unique_workshop_number_per_team",
+        ),
+        (
+            lambda db: db.attendances.where([("workshop_id", 10)]),
+            "ix_attendances_workshop_id_attendance",
+        ),
+        (
+            lambda db: db.attendances.read_by_team(team_id=10),
+            "ix_attendances_workshop_id_attendance",
+        ),
+        (
+            lambda db: db.attendances.where([("child_id", 10)]),
+            "ix_attendances_child_id",
+        ),
+        (
+            lambda db: db.roles.where([("user_id", "auth0|10")]),
+            "ix_roles_user_id",
+        ),
+    ],
+)
+def test_query_uses_index(database, explain, query, index):
+    # assert that the query planner uses the index for the repository query
+    plans = explain(lambda: query(database))
+    assert len(plans) == 1
+    assert index in plans[0], plans[0]
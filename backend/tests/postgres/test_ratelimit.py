@@ -0,0 +1,47 @@
+import pytest
+from core.database import schema
+from core.database import session as db_session
+from core.ratelimit import PostgresRateLimitStore, get_rate_limit_store
+from sqlmodel import create_engine, delete
+
+
+@pytest.fixture
+def store(postgres_engine):
+    yield PostgresRateLimitStore(engine=postgres_engine)
+    # the store commits its buckets
+    with postgres_engine.begin() as connection:
+        connection.execute(delete(schema.RateLimit))
+
+
+def test_acquire(store, mocker):
+    # assert that the buckets in the table allow a burst, and then
+    # one request per interval
+    clock = mocker.patch("core.ratelimit.time.time", return_value=1000)
+    assert [store.acquire("a", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert store.acquire("a", rate=2, burst=3) == pytest.approx(0.5)
+    assert store.acquire("b", rate=2, burst=3) == 0
+
+    clock.return_value = 1000.5
+    assert store.acquire("a", rate=2, burst=3) == 0
+    assert store.acquire("a", rate=2, burst=3) == pytest.approx(0.5)
+
+
+def test_acquire_with_exhausted_pool(store, postgres_engine, settings, mocker):
+    # assert that the store does not need a connection of the pool of the
+    # app, of which the sessions of the requests that wait for a token may
+    # hold every connection
+    url = postgres_engine.url.render_as_string(hide_password=False)
+    app_engine = create_engine(url, pool_size=1, max_overflow=0, pool_timeout=1)
+    mocker.patch.object(db_session, "get_engine", return_value=app_engine)
+    settings = settings.model_copy(
+        update={"RATE_LIMIT_STORE": "postgres", "POSTGRES_DATABASE_URL": url}
+    )
+    shared_store = get_rate_limit_store(settings)
+    try:
+        with app_engine.connect():
+            assert shared_store.acquire("a", rate=1, burst=1) == 0
+            assert shared_store.acquire("a", rate=1, burst=1) > 0
+        assert shared_store.engine.pool.size() == settings.RATE_LIMIT_POOL_SIZE
+    finally:
+        shared_store.engine.dispose()
+        app_engine.dispose()
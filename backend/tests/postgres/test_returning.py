@@ -0,0 +1,77 @@
+import pytest
+from models.child import ChildPostIn
+from models.team import TeamPatchIn, TeamPostIn
+from repositories.database import DatabaseRepositories
+from sqlalchemy import event
+
+
+@pytest.fixture
+def database(postgres_session):
+    return DatabaseRepositories(session=postgres_session)
+
+
+@pytest.fixture
+def statements(postgres_session):
+    """Statements executed on the session during a test."""
+    executed = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    connection = postgres_session.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    yield executed
+    event.remove(connection, "before_cursor_execute", capture)
+
+
+def test_create_returns_generated_columns(database, statements):
+    # assert that a create is a single INSERT .. RETURNING statement
+    team = database.teams.create(
+        TeamPostIn(name="New team", community_id=2, implementing_partner_id=1)
+    )
+    assert (
+        team.resource_path == f"/implementingPartners/1/communities/2/teams/{team.id}"
+    )
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO teams")
+    assert "RETURNING" in statements[0]
+
+
+def test_update_returns_generated_columns(database, statements):
+    # assert that an update is a single UPDATE .. RETURNING statement,
+    # apart from loading the record that is updated
+    team = database.teams.read(object_id=1)
+    statements.clear()
+    team = database.teams.update(object_id=1, obj=TeamPatchIn(community_id=3))
+    assert team.resource_path == "/implementingPartners/1/communities/3/teams/1"
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE teams")
+    assert "RETURNING" in statements[0]
+
+
+def test_create_refresh(database, statements):
+    # assert that callers can still opt in to a full refresh
+    database.teams.create(
+        TeamPostIn(name="New team", community_id=2, implementing_partner_id=1),
+        refresh=True,
+    )
+    assert len(statements) == 2
+    assert statements[1].startswith("SELECT")
+
+
+def test_create_bulk_single_statement(database, statements):
+    # assert that a bulk create is a single multi-row INSERT .. RETURNING
+    # statement that returns the records in order, with and without NULLs
+    children = [
+        ChildPostIn(first_name=f"Imported {i}", last_name="", team_id=1, age=i or None)
+        for i in range(50)
+    ]
+    created = database.children.create_bulk(children)
+    assert [child.first_name for child in created] == [
+        f"Imported {i}" for i in range(50)
+    ]
+    assert all(child.id for child in created)
+    assert created[0].age is None
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO children")
+    assert "RETURNING" in statements[0]
@@ -0,0 +1,20 @@
+from core.scheduler import Scheduler
+
+
+def test_one_leader(postgres_engine, mocker):
+    # assert that only one scheduler at a time holds the leader lock,
+    # and that another one takes over once the leader is gone
+    mocker.patch("core.scheduler.get_engine", return_value=postgres_engine)
+    first, second = Scheduler(), Scheduler()
+    try:
+        assert first._elect()
+        assert not second._elect()
+        # the leader checks its lock connection instead of locking again
+        assert first._elect()
+
+        first._release_leadership()
+        assert second._elect()
+        assert not first._elect()
+    finally:
+        first._release_leadership()
+        second._release_leadership()
@@ -0,0 +1,53 @@
+from core.database import schema
+from repositories.database import DatabaseRepositories
+
+from tests.postgres.conftest import (
+    N_CHILDREN_PER_TEAM,
+    N_COMMUNITIES,
+    N_TEAMS_PER_COMMUNITY,
+    N_WORKSHOPS_PER_TEAM,
+)
+
+
+def test_refresh_stats(postgres_session):
+    # assert that the materialized views only include the seeded data
+    # after a refresh, which does not block reads of the views
+    database = DatabaseRepositories(session=postgres_session)
+    postgres_session.add(
+        schema.Role(
+            user_id="admin",
+            role="Admin",
+            level="Implementing Partner",
+            resource_path="/implementingPartners/1",
+        )
+    )
+    postgres_session.flush()
+    assert not database.stats.read_teams_by_user_access(
+        "admin", level="implementing_partner", filters=[]
+    )
+
+    assert database.stats.refresh()
+
+    n_teams = N_COMMUNITIES * N_TEAMS_PER_COMMUNITY
+    [(_, name, teams, active_teams, completed_teams, children)] = (
+        database.stats.read_teams_by_user_access(
+            "admin", level="implementing_partner", filters=[]
+        )
+    )
+    assert (name, teams, active_teams) == ("Little Lions", n_teams, n_teams)
+    assert completed_teams == 0
+    assert children == n_teams * N_CHILDREN_PER_TEAM
+
+    workshops = database.stats.read_workshops_by_user_access(
+        "admin", level="community", filters=[("community_id", 1)]
+    )
+    assert [number for _, number, *_ in workshops] == list(
+        range(1, N_WORKSHOPS_PER_TEAM + 1)
+    )
+    assert {row[2:] for row in workshops} == {
+        (
+            N_TEAMS_PER_COMMUNITY,
+            N_TEAMS_PER_COMMUNITY * N_CHILDREN_PER_TEAM,
+            N_TEAMS_PER_COMMUNITY * N_CHILDREN_PER_TEAM,
+        )
+    }
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+import pytest
+from repositories.database import DatabaseRepositories
+
+
+@pytest.fixture
+def database(postgres_session):
+    return DatabaseRepositories(session=postgres_session)
+
+
+def test_read_changed_by_user_access(database):
+    # assert that only records of the teams of the user are synced,
+    # and only the ones that changed since the cursor
+    user_id = "auth0|1"
+    assert [
+        t.id for t in database.teams.read_changed_by_user_access(user_id, None)
+    ] == [1]
+    assert len(database.children.read_changed_by_user_access(user_id, None)) == 10
+    assert len(database.attendances.read_changed_by_user_access(user_id, None)) == 60
+
+    since = datetime.now() + timedelta(seconds=1)
+    assert not database.workshops.read_changed_by_user_access(user_id, since)
+    assert not database.attendances.read_changed_by_user_access(user_id, since)
+
+
+def test_tombstones_by_user_access(database):
+    # assert that tombstones are recorded before deleting and scoped by role
+    since = datetime.now()
+    assert database.tombstones.create_for_children([("team_id", 1)]) == 10
+    assert database.tombstones.create_for_teams([("id", 1)]) == 1
+    assert database.tombstones.create_for_teams([("id", 2)]) == 1
+    database.teams.delete_bulk("id", [1, 2])
+
+    deleted = database.tombstones.read_by_user_access("auth0|1", since=since)
+    assert len(deleted) == 11
+    assert {t.resource_type for t in deleted} == {"child", "team"}
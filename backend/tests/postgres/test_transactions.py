@@ -0,0 +1,65 @@
+import pytest
+from core.database import session as db_session
+from core.database.session import get_session
+from sqlalchemy import text
+from sqlalchemy.exc import InternalError, OperationalError
+from starlette.requests import Request
+
+
+@pytest.fixture
+def get_request_session(postgres_engine, settings, mocker):
+    """Open the session that get_session gives a request with a method."""
+    settings = settings.model_copy(
+        update={
+            "POSTGRES_DATABASE_URL": postgres_engine.url.render_as_string(False),
+            "READ_STATEMENT_TIMEOUT": 0.5,
+        }
+    )
+    mocker.patch.object(db_session, "get_settings", return_value=settings)
+    sessions = []
+
+    def open_session(method: str):
+        request = Request({"type": "http", "method": method, "headers": []})
+        sessions.append(get_session(request))
+        return next(sessions[-1])
+
+    yield open_session
+    for session in sessions:
+        session.close()
+
+
+def test_read_transaction(get_request_session):
+    # assert that reads run in read only transactions with a statement timeout
+    session = get_request_session("GET")
+    assert session.scalar(text("SHOW transaction_read_only")) == "on"
+    assert session.scalar(text("SHOW statement_timeout")) == "500ms"
+    with pytest.raises(InternalError, match="read-only transaction"):
+        session.execute(text("UPDATE teams SET name = name WHERE id = 1"))
+    session.rollback()
+
+    # assert that the next transaction of the session is read only as well
+    assert session.scalar(text("SHOW transaction_read_only")) == "on"
+    with pytest.raises(OperationalError, match="statement timeout"):
+        session.execute(text("SELECT pg_sleep(1)"))
+
+
+def test_write_transaction(get_request_session):
+    # assert that writes run in regular transactions
+    session = get_request_session("POST")
+    assert session.scalar(text("SHOW transaction_read_only")) == "off"
+    assert session.scalar(text("SHOW statement_timeout")) == "0"
+
+
+def test_recent_writes(get_request_session, mocker):
+    # assert that the writes of a user are upserted into the recent writes
+    clock = mocker.patch("core.database.session.time.time", return_value=100)
+    db_session._record_write("auth0|a")
+    clock.return_value = 110
+    db_session._record_write("auth0|a")
+    clock.return_value = 114
+    assert db_session._wrote_recently("auth0|a", window=5)
+    assert not db_session._wrote_recently("auth0|b", window=5)
+    clock.return_value = 116
+    assert not db_session._wrote_recently("auth0|a", window=5)
+    with db_session.get_engine().begin() as connection:
+        connection.execute(text("DELETE FROM recent_writes"))
@@ -0,0 +1,45 @@
+import pytest
+from repositories.database import DatabaseRepositories
+
+
+@pytest.fixture
+def database(session):
+    database = DatabaseRepositories(session=session)
+    for full_at, key in enumerate(["a", "b", "c"]):
+        database.rate_limits.create({"key": key, "full_at": full_at})
+    session.commit()
+    return database
+
+
+def _keys(database: DatabaseRepositories) -> list[str]:
+    return sorted(bucket.key for bucket in database.rate_limits.read_all())
+
+
+def test_delete_bulk(database, count_queries):
+    # assert that the matching records are deleted without loading them,
+    # and that the count leaves out unknown values
+    with count_queries() as counts:
+        deleted = database.rate_limits.delete_bulk("key", ["a", "b", "unknown"])
+    assert deleted == 2
+    assert not counts
+    assert _keys(database) == ["c"]
+
+
+def test_delete_bulk_by_attribute(database):
+    # assert that records can be deleted by another column than the primary key
+    assert database.rate_limits.delete_bulk("full_at", [0, 2]) == 2
+    assert _keys(database) == ["b"]
+
+
+def test_delete_bulk_empty(database, count_queries):
+    # assert that nothing is deleted or queried for an empty list
+    with count_queries() as counts:
+        assert database.rate_limits.delete_bulk("key", []) == 0
+    assert not counts
+    assert _keys(database) == ["a", "b", "c"]
+
+
+def test_delete_bulk_unknown(database):
+    # assert that unknown values delete nothing
+    assert database.rate_limits.delete_bulk("key", ["d", "e"]) == 0
+    assert _keys(database) == ["a", "b", "c"]
@@ -0,0 +1,105 @@
+import pytest
+from core.database.session import get_session
+from fastapi import Request, status
+from main import app
+from sqlmodel import Session
+
+ENDPOINT = "/batch"
+
+
+@pytest.fixture(name="client")
+def client_with_team(client, implementing_partner):
+    # arrange a team with two children and a workshop
+    client.post(
+        "/communities",
+        json={"name": "Community 1"},
+        params={"implementing_partner_id": implementing_partner["id"]},
+    ).raise_for_status()
+    client.post("/teams", json={"community_id": 1, "name": "Team 1"}).raise_for_status()
+    for child in ["Child 1", "Child 2"]:
+        client.post(
+            "/children", json={"first_name": child, "last_name": "", "team_id": 1}
+        ).raise_for_status()
+    attendance = [
+        {"attendance": "present", "child_id": 1},
+        {"attendance": "absent", "child_id": 2},
+    ]
+    client.post(
+        "/teams/1/workshops",
+        json={"date": "2024-01-01", "workshop_number": 1, "attendance": attendance},
+    ).raise_for_status()
+    yield client
+
+
+def test_post_batch(client):
+    # assert that every request gets the response of its endpoint, in order
+    paths = ["/teams/1", "/teams/1/workshops", "/teams/1/workshops/1", "/teams/2"]
+    response = client.post(
+        ENDPOINT, json={"requests": [{"path": path} for path in paths]}
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    responses = response.json().get("data").get("responses")
+    assert [r["status_code"] for r in responses] == [200, 200, 200, 404]
+    for path, sub_response in zip(paths, responses):
+        assert sub_response["body"] == client.get(path).json()
+    assert responses[0]["headers"]["etag"] == client.get(paths[0]).headers["ETag"]
+
+
+def test_post_batch_query_string(client):
+    # assert that the query string is passed on to the endpoint
+    response = client.post(
+        ENDPOINT, json={"requests": [{"path": "/children?team_id=1"}]}
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    sub_response = response.json().get("data").get("responses")[0]
+    assert sub_response["body"] == client.get("/children?team_id=1").json()
+
+
+def test_post_batch_not_modified(client):
+    # assert that a request with a matching ETag is not sent again
+    etag = client.get("/teams/1").headers["ETag"]
+    response = client.post(
+        ENDPOINT,
+        json={"requests": [{"path": "/teams/1", "headers": {"If-None-Match": etag}}]},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    sub_response = response.json().get("data").get("responses")[0]
+    assert sub_response["status_code"] == status.HTTP_304_NOT_MODIFIED
+    assert sub_response["body"] is None
+    assert sub_response["headers"]["etag"] == etag
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        {"path": "/batch"},
+        {"path": "https://example.com/teams/1"},
+        {"path": "/teams", "method": "POST"},
+    ],
+)
+def test_post_batch_invalid(client, request_):
+    # assert that only reads of other endpoints can be batched
+    response = client.post(ENDPOINT, json={"requests": [request_]})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_post_batch_shares_session(client, session, settings, mocker):
+    # assert that the requests of a batch use the session of the batch
+    sessions = []
+
+    def get_test_session(request: Request):
+        for session_ in get_session(request):
+            sessions.append(session_)
+            yield session_
+
+    mocker.patch("core.database.session.get_settings", return_value=settings)
+    mocker.patch("core.database.session.get_engine", return_value=session.get_bind())
+    app.dependency_overrides[get_session] = get_test_session
+    paths = ["/teams/1", "/teams/1/workshops", "/children?team_id=1"]
+    response = client.post(
+        ENDPOINT, json={"requests": [{"path": path} for path in paths]}
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert len(sessions) == 1 + len(paths)
+    assert all(isinstance(session_, Session) for session_ in sessions)
+    assert len(set(map(id, sessions))) == 1
@@ -1,5 +1,9 @@
+from datetime import timedelta
+
 import pytest
+from core.database import schema
 from fastapi import status
+from sqlmodel import select
 
 ENDPOINT = "/children"
 
@@ -49,6 +53,92 @@ def test_post_child_success(client):
     assert response_get.json().get("data").get("first_name") == child_name
 
 
+def test_post_child_duplicate(client):
+    # assert that a child can't be added twice to the same team
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 1}
+    response = client.post(ENDPOINT, json=data)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    response = client.post(ENDPOINT, json=data)
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+
+    # assert that the failed insert did not leave the session unusable
+    response = client.post(ENDPOINT, json={**data, "first_name": "Other"})
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+
+def test_post_child_idempotent(client, count_queries):
+    # assert that a retry with the same idempotency key gets the response
+    # to the first request, without reading or writing children or teams
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 1}
+    headers = {"Idempotency-Key": "child-1"}
+    response = client.post(ENDPOINT, json=data, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert "Idempotent-Replayed" not in response.headers
+
+    with count_queries() as counts:
+        retry = client.post(ENDPOINT, json=data, headers=headers)
+    assert retry.status_code == status.HTTP_201_CREATED, retry.text
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == response.json()
+    assert set(counts) == {"idempotency_keys"}
+
+    # assert that a request with another key is applied again
+    response = client.post(ENDPOINT, json=data, headers={"Idempotency-Key": "other"})
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+
+
+def test_post_child_idempotency_key_reused(client):
+    # assert that a key can not be reused for another request
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 1}
+    headers = {"Idempotency-Key": "child-1"}
+    client.post(ENDPOINT, json=data, headers=headers).raise_for_status()
+    response = client.post(
+        ENDPOINT, json={**data, "first_name": "Other"}, headers=headers
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, response.text
+
+
+def test_post_child_idempotent_error(client):
+    # assert that client errors are replayed as well
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 0}
+    headers = {"Idempotency-Key": "child-1"}
+    response = client.post(ENDPOINT, json=data, headers=headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+    retry = client.post(ENDPOINT, json=data, headers=headers)
+    assert retry.status_code == status.HTTP_400_BAD_REQUEST, retry.text
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_post_child_idempotency_key_in_progress(client, session):
+    # assert that a retry while the first request is in progress gets a
+    # conflict, rather than being applied a second time
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 1}
+    headers = {"Idempotency-Key": "child-1"}
+    client.post(ENDPOINT, json=data, headers=headers).raise_for_status()
+    record = session.exec(select(schema.IdempotencyKey)).one()
+    record.status_code, record.response = None, None
+    session.commit()
+
+    retry = client.post(ENDPOINT, json=data, headers=headers)
+    assert retry.status_code == status.HTTP_409_CONFLICT, retry.text
+    assert "in progress" in retry.json()["message"]
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_post_child_idempotency_key_expired(client, session, settings):
+    # assert that a retry after the retention is applied again
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 1}
+    headers = {"Idempotency-Key": "child-1"}
+    client.post(ENDPOINT, json=data, headers=headers).raise_for_status()
+    record = session.exec(select(schema.IdempotencyKey)).one()
+    record.created_at -= timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS + 1)
+    session.commit()
+
+    retry = client.post(ENDPOINT, json=data, headers=headers)
+    assert retry.status_code == status.HTTP_409_CONFLICT, retry.text
+    assert "Idempotent-Replayed" not in retry.headers
+
+
 def test_update_child_success(client):
     # test updating a child
     data = {
@@ -72,3 +162,114 @@ def test_update_child_success(client):
     assert response_json.get("last_name") == "New Lastname"
     assert not response_json.get("is_active")
     assert response_json.get("last_updated_at") != response_json.get("created_at")
+
+
+def test_post_child_reads_team_once(client, count_queries):
+    # assert that the team is fetched once to validate that it exists
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 1}
+    with count_queries() as counts:
+        response = client.post(ENDPOINT, json=data)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert counts["teams"] == 1
+
+
+def test_update_child_not_found(client):
+    # assert that a 404 is returned when updating a non-existing child
+    response = client.patch(f"{ENDPOINT}/0", json={"first_name": "Firstname"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+
+def test_update_child_reads_once(client, count_queries):
+    # assert that the child is fetched once before the update, generated
+    # columns are returned by the UPDATE and the other read is the reload
+    # of the expired record after the commit
+    data = {"first_name": "Firstname", "last_name": "Lastname", "team_id": 1}
+    id_ = client.post(ENDPOINT, json=data).json().get("data").get("id")
+    with count_queries() as counts:
+        response = client.patch(f"{ENDPOINT}/{id_}", json={"last_name": "New"})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert counts["children"] == 2
+
+
+def test_delete_child_not_found(client):
+    # assert that a 404 is returned when deleting a non-existing child
+    response = client.delete(f"{ENDPOINT}/0", params={"cascade": True})
+    assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
+
+
+IMPORT_ENDPOINT = "/teams/1/children/import"
+
+
+def test_import_children_json(client):
+    # assert that all children are imported, in order
+    children = [{"first_name": f"Child {i}", "last_name": "Lastname"} for i in range(5)]
+    response = client.post(IMPORT_ENDPOINT, json={"children": children})
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    data = response.json().get("data")
+    assert data.get("errors") == []
+    assert len(data.get("created")) == 5
+
+    response = client.get(f"{ENDPOINT}/{data.get('created')[-1]}")
+    assert response.json().get("data").get("first_name") == "Child 4"
+
+
+def test_import_children_csv(client):
+    # assert that children can be imported from CSV, with missing values
+    body = "first_name,last_name,age,gender\nNelson,Mandela,10,male\nDesmond,,,\n"
+    response = client.post(
+        IMPORT_ENDPOINT, content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    created = response.json().get("data").get("created")
+
+    child = client.get(f"{ENDPOINT}/{created[0]}").json().get("data")
+    assert (child["first_name"], child["age"], child["gender"]) == (
+        "Nelson",
+        10,
+        "male",
+    )
+    child = client.get(f"{ENDPOINT}/{created[1]}").json().get("data")
+    assert (child["last_name"], child["age"], child["gender"]) == ("", None, None)
+
+
+def test_import_children_invalid_rows(client):
+    # assert that all invalid rows are reported and no children are imported
+    client.post(
+        ENDPOINT, json={"first_name": "Existing", "last_name": "Child", "team_id": 1}
+    ).raise_for_status()
+    children = [
+        {"first_name": "New", "last_name": "Child"},
+        {"first_name": "Existing", "last_name": "Child"},
+        {"first_name": "New", "last_name": "Child"},
+        {"first_name": "Other", "last_name": "Child", "gender": "unknown"},
+        {"last_name": "Child"},
+    ]
+    response = client.post(IMPORT_ENDPOINT, json={"children": children})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+    data = response.json().get("data")
+    assert data.get("created") == []
+    assert [error["row"] for error in data.get("errors")] == [2, 3, 4, 5]
+    assert len(client.get(ENDPOINT).json().get("data")) == 1
+
+
+@pytest.mark.parametrize(
+    "body,content_type",
+    [
+        ('{"children": []}', "application/json"),
+        ('{"children": ["Nelson"]}', "application/json"),
+        ("not json", "application/json"),
+        (b"\xff\xfe", "text/csv"),
+    ],
+)
+def test_import_children_invalid_body(client, body, content_type):
+    response = client.post(
+        IMPORT_ENDPOINT, content=body, headers={"Content-Type": content_type}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+
+
+def test_import_children_team_not_found(client):
+    response = client.post(
+        "/teams/0/children/import", json={"children": [{"first_name": "A"}]}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
@@ -1,4 +1,5 @@
 import pytest
+from core.database import schema
 from fastapi import status
 
 ENDPOINT = "/communities"
@@ -122,3 +123,78 @@ def test_delete_community_with_teams_success(client, community_with_team):
     community_id = community_with_team.get("id")
     response = client.delete(f"{ENDPOINT}/{community_id}", params={"cascade": True})
     assert response.status_code == status.HTTP_204_NO_CONTENT, response.text
+
+
+def test_get_communities_etag(client, session, community_with_team):
+    # assert that communities are only sent again when they are modified
+    session.add(
+        schema.Role(
+            user_id="something",
+            role="Admin",
+            level="Implementing Partner",
+            resource_path="/implementingPartners/1",
+        )
+    )
+    session.commit()
+    params = {"implementing_partner_id": 1}
+    response = client.get(ENDPOINT, params=params)
+    assert len(response.json().get("data")) == 1
+    etag = response.headers["ETag"]
+
+    headers = {"If-None-Match": etag}
+    response = client.get(ENDPOINT, params=params, headers=headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    community_id = community_with_team.get("id")
+    client.patch(f"{ENDPOINT}/{community_id}", json={"name": "Community 2"})
+    response = client.get(ENDPOINT, params=params, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("data")[0].get("name") == "Community 2"
+
+
+def test_get_community_reads_once(client, community_with_team, count_queries):
+    # assert that the community is fetched once, not again after validation
+    community_id = community_with_team.get("id")
+    with count_queries() as counts:
+        response = client.get(f"{ENDPOINT}/{community_id}")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert counts["communities"] == 1
+
+
+def test_patch_community_reads_once(client, community_with_team, count_queries):
+    # assert that the community is fetched once before the update, generated
+    # columns are returned by the UPDATE and the other read is the reload
+    # of the expired record after the commit
+    community_id = community_with_team.get("id")
+    with count_queries() as counts:
+        response = client.patch(f"{ENDPOINT}/{community_id}", json={"name": "New"})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert counts["communities"] == 2
+
+
+def test_post_community_returning(client, implementing_partner, count_queries):
+    # assert that the generated resource path is returned by the INSERT,
+    # the only read is the reload of the expired record after the commit
+    params = {"implementing_partner_id": implementing_partner["id"]}
+    with count_queries() as counts:
+        response = client.post(ENDPOINT, json={"name": "Community"}, params=params)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert counts["communities"] == 1
+    data = response.json().get("data")
+    assert (
+        data.get("resource_path") == f"/implementingPartners/1/communities/{data['id']}"
+    )
+
+
+def test_delete_implementing_partner_cascade(client, community_with_team, session):
+    # assert that an implementing partner with communities is only deleted when
+    # cascading, communities are deleted in one statement and teams by the database
+    implementing_partner_id = community_with_team.get("implementing_partner_id")
+    endpoint = f"/implementing_partners/{implementing_partner_id}"
+    response = client.delete(endpoint)
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+
+    response = client.delete(endpoint, params={"cascade": True})
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert not session.query(schema.Community).all()
+    assert not session.query(schema.Team).all()
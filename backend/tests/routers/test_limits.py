@@ -0,0 +1,104 @@
+from unittest.mock import PropertyMock
+
+import pytest
+from core.metrics import metrics
+from core.ratelimit import get_rate_limit_store, in_flight
+from core.settings import get_settings
+from core.threadpool import ThreadPool
+from fastapi import status
+from main import app
+from routers import _limits
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+ENDPOINT = "/implementing_partners"
+
+
+@pytest.fixture(name="settings")
+def settings_with_limits(client, settings):
+    # a burst of two requests per route, refilled once a minute
+    settings = settings.model_copy(
+        update={
+            "RATE_LIMIT_PER_SECOND": 1 / 60,
+            "RATE_LIMIT_BURST": 2,
+            "MAX_IN_FLIGHT_REQUESTS": 10,
+        }
+    )
+    app.dependency_overrides[get_settings] = lambda: settings
+    get_rate_limit_store(settings).clear()
+    yield settings
+    get_rate_limit_store(settings).clear()
+
+
+def test_rate_limit(client, settings):
+    # assert that requests beyond the burst are rejected, until the
+    # bucket has a token again
+    route = "GET /implementing_partners"
+    limited = metrics.value("ratelimit_limited_total", route=route)
+    for _ in range(2):
+        response = client.get(ENDPOINT)
+        assert response.status_code == status.HTTP_200_OK, response.text
+    response = client.get(ENDPOINT)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS, response.text
+    assert 55 <= int(response.headers["Retry-After"]) <= 60
+    assert metrics.value("ratelimit_limited_total", route=route) == limited + 1
+
+    # assert that other routes have limits of their own
+    response = client.get("/stats/implementing_partners")
+    assert response.status_code == status.HTTP_200_OK, response.text
+
+    # assert that health checks are not limited
+    for _ in range(3):
+        assert client.get("/health").status_code == status.HTTP_200_OK
+
+
+def test_in_flight_limit(client, settings, mocker):
+    # assert that requests are shed while the worker is at its cap
+    shed = metrics.value("ratelimit_shed_total")
+    mocker.patch.object(in_flight, "in_flight", settings.MAX_IN_FLIGHT_REQUESTS)
+    response = client.get(ENDPOINT)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE, response.text
+    assert response.headers["Retry-After"] == str(settings.SHED_RETRY_AFTER)
+    assert metrics.value("ratelimit_shed_total") == shed + 1
+    assert client.get("/health").status_code == status.HTTP_200_OK
+
+    # assert that handled requests leave the count as it was
+    in_flight.in_flight = 0
+    client.get(ENDPOINT).raise_for_status()
+    assert in_flight.in_flight == 0
+
+
+def test_shed_when_pool_exhausted(client, settings, mocker, tmp_path):
+    # assert that requests are shed while every connection of the database
+    # pool is checked out and calls wait for a thread
+    settings = settings.model_copy(
+        update={"DATABASE_POOL_SIZE": 1, "DATABASE_MAX_OVERFLOW": 0}
+    )
+    app.dependency_overrides[get_settings] = lambda: settings
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=QueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    mocker.patch.object(_limits, "get_read_engine", return_value=engine)
+    waiting = mocker.patch.object(
+        ThreadPool, "waiting", new_callable=PropertyMock, return_value=1
+    )
+    shed = metrics.value("ratelimit_shed_total")
+
+    with engine.connect():
+        response = client.get(ENDPOINT)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == str(settings.SHED_RETRY_AFTER)
+        assert metrics.value("ratelimit_shed_total") == shed + 1
+
+        # assert that an exhausted pool alone, without calls waiting for
+        # a thread, does not shed requests
+        waiting.return_value = 0
+        client.get(ENDPOINT).raise_for_status()
+
+    # assert that requests are handled again once a connection is returned
+    waiting.return_value = 1
+    client.get(ENDPOINT).raise_for_status()
+    engine.dispose()
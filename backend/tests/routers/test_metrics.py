@@ -0,0 +1,11 @@
+ENDPOINT = "/metrics"
+
+
+def test_get_metrics(client, settings):
+    # assert that the thread pool metrics are exposed in the Prometheus format
+    client.get("/health")
+    response = client.get(ENDPOINT)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE threadpool_calls_total counter" in response.text
+    assert f"\nthreadpool_size {settings.THREAD_POOL_SIZE}\n" in response.text
@@ -0,0 +1,112 @@
+import pytest
+from core.database import schema
+from fastapi import status
+
+ENDPOINT = "/stats"
+
+
+@pytest.fixture(name="client")
+def client_with_teams(client, implementing_partner, session):
+    # arrange a team with two children in each of two communities, the
+    # children of the first team attended one of them, the second both
+    for community in ["Community 1", "Community 2"]:
+        client.post(
+            "/communities",
+            json={"name": community},
+            params={"implementing_partner_id": implementing_partner["id"]},
+        ).raise_for_status()
+    for team_id, community_id in [(1, 1), (2, 2)]:
+        client.post(
+            "/teams", json={"community_id": community_id, "name": f"Team {team_id}"}
+        ).raise_for_status()
+        for child in ["Child 1", "Child 2"]:
+            client.post(
+                "/children",
+                json={
+                    "first_name": child,
+                    "last_name": f"{team_id}",
+                    "team_id": team_id,
+                },
+            ).raise_for_status()
+    for team_id, attendance in [(1, ["present", "absent"]), (2, ["present"] * 2)]:
+        child_ids = [2 * team_id - 1, 2 * team_id]
+        client.post(
+            f"/teams/{team_id}/workshops",
+            json={
+                "date": "2024-01-01",
+                "workshop_number": 1,
+                "attendance": [
+                    {"attendance": a, "child_id": c}
+                    for a, c in zip(attendance, child_ids)
+                ],
+            },
+        ).raise_for_status()
+    yield client
+
+
+def _grant(session, resource_path: str):
+    session.add(
+        schema.Role(
+            user_id="something",
+            role="Admin",
+            level="Implementing Partner",
+            resource_path=resource_path,
+        )
+    )
+    session.commit()
+
+
+def test_get_implementing_partner_stats(client, session):
+    # assert that the statistics aggregate all teams of the implementing partner
+    _grant(session, "/implementingPartners/1")
+    response = client.get(f"{ENDPOINT}/implementing_partners")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    [stats] = response.json().get("data")
+    assert stats["name"] == "Little Lions"
+    assert stats["teams"] == stats["active_teams"] == 2
+    assert stats["completed_teams"] == 0
+    assert stats["children"] == 4
+    [workshop] = stats["workshops"]
+    assert workshop["workshop_number"] == 1
+    assert workshop["teams"] == 2
+    assert workshop["average_present"] == 1.5
+    assert workshop["attendance_rate"] == 0.75
+
+
+def test_get_community_stats(client, session):
+    # assert that the statistics are per community
+    _grant(session, "/implementingPartners/1")
+    response = client.get(
+        f"{ENDPOINT}/communities", params={"implementing_partner_id": 1}
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    data = response.json().get("data")
+    assert [stats["name"] for stats in data] == ["Community 1", "Community 2"]
+    assert [stats["workshops"][0]["attendance_rate"] for stats in data] == [0.5, 1]
+
+
+def test_get_stats_scoped_by_role(client, session):
+    # assert that only the teams the user has access to are counted
+    _grant(session, "/implementingPartners/1/communities/2/teams/2")
+    response = client.get(f"{ENDPOINT}/implementing_partners")
+    [stats] = response.json().get("data")
+    assert stats["teams"] == 1
+    assert stats["children"] == 2
+
+    response = client.get(f"{ENDPOINT}/communities")
+    assert [stats["name"] for stats in response.json().get("data")] == ["Community 2"]
+
+
+def test_get_stats_without_roles(client):
+    # assert that a user without roles gets no statistics
+    response = client.get(f"{ENDPOINT}/implementing_partners")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert response.json().get("data") == []
+
+
+def test_get_community_stats_implementing_partner_not_found(client):
+    # assert that an unknown implementing partner is not found
+    response = client.get(
+        f"{ENDPOINT}/communities", params={"implementing_partner_id": 2}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND, response.text
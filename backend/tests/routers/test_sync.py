@@ -0,0 +1,177 @@
+from datetime import timedelta
+
+import pytest
+from core.database import schema
+from core.database.session import use_primary
+from fastapi import status
+from main import app
+
+ENDPOINT = "/sync"
+
+
+@pytest.fixture(name="client")
+def client_with_teams(client, implementing_partner, session, mocker):
+    # arrange two teams with two children each, the user is coach of the first
+    client.post(
+        "/communities",
+        json={"name": "Community 1"},
+        params={"implementing_partner_id": implementing_partner["id"]},
+    ).raise_for_status()
+    for team in ["Team 1", "Team 2"]:
+        r = client.post("/teams", json={"community_id": 1, "name": team})
+        r.raise_for_status()
+        team_id = r.json().get("data").get("id")
+        for child in ["Child 1", "Child 2"]:
+            client.post(
+                "/children",
+                json={"first_name": child, "last_name": team, "team_id": team_id},
+            ).raise_for_status()
+    session.add(
+        schema.Role(
+            user_id="something",
+            role="Coach",
+            level="Team",
+            resource_path="/implementingPartners/1/communities/1/teams/1",
+        )
+    )
+    session.commit()
+    # changes made right before a sync are otherwise sent again
+    mocker.patch("services.sync.SYNC_OVERLAP", timedelta(0))
+    yield client
+
+
+def _workshop(team_id: int, number: int, child_ids=(1, 2)) -> dict:
+    return {
+        "team_id": team_id,
+        "date": "2024-01-01",
+        "workshop_number": number,
+        "attendance": [
+            {"attendance": "present", "child_id": child_id} for child_id in child_ids
+        ],
+    }
+
+
+def test_get_sync_full(client):
+    # assert that the first sync contains all data of the teams of the user
+    response = client.get(ENDPOINT)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    data = response.json().get("data")
+    assert data.get("full")
+    assert data.get("cursor")
+    assert [team["id"] for team in data.get("teams")] == [1]
+    assert {child["id"] for child in data.get("children")} == {1, 2}
+    assert data.get("deleted") == []
+
+
+def test_get_sync_delta(client):
+    # assert that a sync with a cursor only contains the changes since
+    cursor = client.get(ENDPOINT).json().get("data").get("cursor")
+
+    data = client.get(ENDPOINT, params={"since": cursor}).json().get("data")
+    assert not data.get("full")
+    assert data.get("teams") == data.get("children") == data.get("workshops") == []
+
+    client.patch("/children/2", json={"first_name": "New name"}).raise_for_status()
+    client.post("/teams/1/workshops", json=_workshop(1, 1)).raise_for_status()
+    # changes to a team of another coach are not synced
+    client.patch("/children/3", json={"first_name": "New name"}).raise_for_status()
+
+    data = client.get(ENDPOINT, params={"since": cursor}).json().get("data")
+    assert not data.get("full")
+    assert [child["id"] for child in data.get("children")] == [2]
+    assert [workshop["workshop_number"] for workshop in data.get("workshops")] == [1]
+    assert {a["child_id"] for a in data.get("attendances")} == {1, 2}
+    # the workshop changed the progress of the team
+    assert [team["id"] for team in data.get("teams")] == [1]
+
+
+def test_get_sync_deleted(client):
+    # assert that deleted children and teams are synced as tombstones
+    cursor = client.get(ENDPOINT).json().get("data").get("cursor")
+    client.delete("/children/1").raise_for_status()
+    client.delete("/children/3").raise_for_status()
+
+    data = client.get(ENDPOINT, params={"since": cursor}).json().get("data")
+    deleted = [(d["resource_type"], d["resource_id"]) for d in data.get("deleted")]
+    assert deleted == [("child", 1)]
+
+    client.delete("/teams/1", params={"cascade": True}).raise_for_status()
+    data = client.get(ENDPOINT, params={"since": cursor}).json().get("data")
+    deleted = [(d["resource_type"], d["resource_id"]) for d in data.get("deleted")]
+    assert deleted == [("child", 1), ("team", 1)]
+
+
+def test_get_sync_roles_changed(client, mocker):
+    # assert that a full sync is sent when the roles of the user changed,
+    # since teams that became accessible may not have changed
+    cursor = client.get(ENDPOINT).json().get("data").get("cursor")
+    mocker.patch("services.sync.SyncService._get_scope", return_value="other")
+    data = client.get(ENDPOINT, params={"since": cursor}).json().get("data")
+    assert data.get("full")
+    assert [team["id"] for team in data.get("teams")] == [1]
+
+
+def test_get_sync_invalid_cursor(client):
+    # assert that a cursor that can not be decoded is rejected
+    response = client.get(ENDPOINT, params={"since": "invalid"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, response.text
+
+
+def test_post_sync(client, session):
+    # assert that offline workshops are applied in order, and that
+    # rejected workshops do not prevent the others from being applied
+    payload = {
+        "workshops": [
+            _workshop(1, 1),
+            _workshop(1, 1),
+            _workshop(1, 3),
+            _workshop(1, 2),
+            _workshop(2, 1, child_ids=(3, 4)),
+        ]
+    }
+    response = client.post(ENDPOINT, json=payload)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    results = response.json().get("data").get("results")
+    assert [r["status_code"] for r in results] == [201, 409, 400, 201, 201]
+    assert results[1]["message"] == "Workshop already exists!"
+
+    workshops = session.query(schema.Workshop).order_by(schema.Workshop.id).all()
+    assert [(w.team_id, w.workshop_number) for w in workshops] == [
+        (1, 1),
+        (1, 2),
+        (2, 1),
+    ]
+    assert len(session.query(schema.Attendance).all()) == 6
+
+
+def test_post_sync_unique_violation(client, session, mocker):
+    # assert that a workshop rejected by the database, e.g. when it was
+    # submitted concurrently, only rolls back its own savepoint
+    mocker.patch(
+        "repositories.database.WorkshopRepository.get_last_workshop_per_team",
+        return_value={},
+    )
+    payload = {
+        "workshops": [
+            _workshop(1, 1),
+            _workshop(1, 1),
+            _workshop(2, 1, child_ids=(3, 4)),
+        ]
+    }
+    response = client.post(ENDPOINT, json=payload)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    results = response.json().get("data").get("results")
+    assert [r["status_code"] for r in results] == [201, 409, 201]
+    assert len(session.query(schema.Workshop).all()) == 2
+    assert len(session.query(schema.Attendance).all()) == 4
+
+
+def test_get_sync_reads_primary():
+    # assert that syncs read from the primary, since a replica that lags
+    # more than the overlap of the cursors would lose changes for good
+    route = next(
+        route
+        for route in app.routes
+        if route.path == ENDPOINT and "GET" in route.methods
+    )
+    assert use_primary in [depends.dependency for depends in route.dependencies]
@@ -1,5 +1,8 @@
 import pytest
+from core.cache import get_response_cache
+from core.database import schema
 from fastapi import status
+from sqlalchemy import event
 
 ENDPOINT = "/teams"
 
@@ -41,6 +44,17 @@ def test_post_team_success(client):
     assert response_get.json().get("data").get("is_active")
 
 
+def test_post_team_duplicate(client):
+    # assert that team names are unique
+    data = {"community_id": 1, "name": "Team 1"}
+    response = client.post(ENDPOINT, json=data)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    response = client.post(ENDPOINT, json={**data, "community_id": 2})
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+    # assert that the error of the database is not shown to the client
+    assert response.json()["detail"] == "A team with this name already exists"
+
+
 # TODO setup testing framework with current_user
 # otherwise it will not return a community
 # def test_get_team_filter_community(client):
@@ -225,6 +239,36 @@ def test_update_workshop_attendance(client_with_team):
     ), "Workshop attendance not updated correctly"
 
 
+def test_add_workshop_idempotent(client_with_team, count_queries):
+    # assert that a retry with the same idempotency key gets the response
+    # to the first request instead of a conflict, without touching workshops
+    payload = {
+        "date": "2021-01-01",
+        "workshop_number": 1,
+        "attendance": [
+            {"attendance": "present", "child_id": 1},
+            {"attendance": "absent", "child_id": 2},
+        ],
+    }
+    headers = {"Idempotency-Key": "workshop-1"}
+    response = client_with_team.post(
+        f"{ENDPOINT}/1/workshops", json=payload, headers=headers
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    with count_queries() as counts:
+        retry = client_with_team.post(
+            f"{ENDPOINT}/1/workshops", json=payload, headers=headers
+        )
+    assert retry.status_code == status.HTTP_201_CREATED, retry.text
+    assert retry.json() == response.json()
+    assert set(counts) == {"idempotency_keys"}
+
+    # assert that the same payload without a key is still a conflict
+    response = client_with_team.post(f"{ENDPOINT}/1/workshops", json=payload)
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+
+
 def test_add_workshop_missing_child_id(client_with_team):
     # test that we get a bad request when we are missing children
     team_id = 1
@@ -303,6 +347,30 @@ def test_workshop_already_exists(client_with_team):
     assert response.status_code == status.HTTP_409_CONFLICT, response.text
 
 
+def test_workshop_already_exists_concurrently(client_with_team, mocker):
+    # given a workshop is created while another request for the same workshop
+    # is being validated, assert that the unique constraint results in a conflict
+    team_id = 1
+    payload = {
+        "date": "2021-01-01",
+        "workshop_number": 1,
+        "attendance": [
+            {"attendance": "present", "child_id": 1},
+            {"attendance": "absent", "child_id": 2},
+        ],
+    }
+    response = client_with_team.post(f"{ENDPOINT}/{team_id}/workshops", json=payload)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    # the concurrent request has not seen the first workshop yet
+    mocker.patch(
+        "repositories.database.WorkshopRepository.get_last_workshop_per_team",
+        return_value={},
+    )
+    response = client_with_team.post(f"{ENDPOINT}/{team_id}/workshops", json=payload)
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+
+
 def test_workshop_number_not_subsequent(client_with_team):
     # given a team has done a workshop, assert that the next workshop added
     # can only have the workshop number of the last + 1
@@ -367,3 +435,298 @@ def test_team_non_active_after_completed_program(client_with_team):
     # assert that team is non-active
     team = client_with_team.get(f"{ENDPOINT}/{team_id}")
     assert team.json().get("data").get("is_active") is False
+
+
+def test_get_team_etag(client_with_team):
+    # assert that a team is not sent again as long as it is not modified
+    team_id = 1
+    response = client_with_team.get(f"{ENDPOINT}/{team_id}")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    response = client_with_team.get(
+        f"{ENDPOINT}/{team_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED, response.text
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # assert that a new workshop (i.e. progress) modifies the team
+    attendance = [
+        {"attendance": "present", "child_id": 1},
+        {"attendance": "absent", "child_id": 2},
+    ]
+    response = client_with_team.post(
+        f"{ENDPOINT}/{team_id}/workshops",
+        json={"date": "2021-01-01", "workshop_number": 1, "attendance": attendance},
+    )
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+
+    response = client_with_team.get(
+        f"{ENDPOINT}/{team_id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["data"]["program"]["progress"]["current"] == 1
+
+
+def test_get_workshops_etag(client_with_team):
+    # assert that workshops are sent again after their attendance is updated
+    team_id = 1
+    attendance = [
+        {"attendance": "present", "child_id": 1},
+        {"attendance": "absent", "child_id": 2},
+    ]
+    response = client_with_team.post(
+        f"{ENDPOINT}/{team_id}/workshops",
+        json={"date": "2021-01-01", "workshop_number": 1, "attendance": attendance},
+    )
+    workshop_id = response.json().get("data").get("id")
+
+    response = client_with_team.get(f"{ENDPOINT}/{team_id}/workshops")
+    etag = response.headers["ETag"]
+    response = client_with_team.get(
+        f"{ENDPOINT}/{team_id}/workshops", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    attendance[0]["attendance"] = "absent"
+    response = client_with_team.patch(
+        f"{ENDPOINT}/workshops/{workshop_id}",
+        json={"date": "2021-01-01", "attendance": attendance},
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+
+    response = client_with_team.get(
+        f"{ENDPOINT}/{team_id}/workshops", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"][0]["attendance"]["absent"] == 2
+
+
+def test_get_teams_etag_role_revoked(client_with_team, session):
+    # arrange a role that gives the user access to all teams
+    role = schema.Role(
+        user_id="something",
+        role="Admin",
+        level="Implementing Partner",
+        resource_path="/implementingPartners/1",
+    )
+    session.add(role)
+    session.commit()
+
+    response = client_with_team.get(ENDPOINT)
+    assert len(response.json().get("data")) == 2
+    etag = response.headers["ETag"]
+    response = client_with_team.get(ENDPOINT, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # assert that the ETag is no longer valid when the role is revoked
+    session.delete(role)
+    session.commit()
+    response = client_with_team.get(ENDPOINT, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json().get("data") == []
+
+
+def test_get_teams_response_cache(client_with_team, session, settings):
+    # assert that listings are cached and invalidated when a team is written
+    session.add(
+        schema.Role(
+            user_id="something",
+            role="Admin",
+            level="Implementing Partner",
+            resource_path="/implementingPartners/1",
+        )
+    )
+    session.commit()
+    cache = get_response_cache(settings)
+    cache.clear()
+
+    response = client_with_team.get(ENDPOINT)
+    assert len(cache) == 1
+    cached = client_with_team.get(ENDPOINT)
+    assert cached.content == response.content
+    assert cached.headers["ETag"] == response.headers["ETag"]
+
+    response = client_with_team.post(ENDPOINT, json={"community_id": 1, "name": "3"})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert len(cache) == 0
+    assert len(client_with_team.get(ENDPOINT).json().get("data")) == 3
+
+
+def test_get_team_reads_once(client_with_team, count_queries):
+    # assert that the team and its community are fetched once for
+    # both the version and the body of the response
+    with count_queries() as counts:
+        response = client_with_team.get(f"{ENDPOINT}/1")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert counts["teams"] == 1
+    assert counts["communities"] == 1
+
+
+def test_get_workshops_reads_team_once(client_with_team, count_queries):
+    # assert that the team is fetched once for both the version and the body
+    with count_queries() as counts:
+        response = client_with_team.get(f"{ENDPOINT}/1/workshops")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert counts["teams"] == 1
+
+
+def test_add_workshop_reads_team_once(client_with_team, count_queries):
+    # assert that the team is fetched once, also when it is updated
+    # after completing the program
+    payload = {
+        "date": "2021-01-01",
+        "workshop_number": 1,
+        "attendance": [
+            {"attendance": "present", "child_id": 1},
+            {"attendance": "absent", "child_id": 2},
+        ],
+    }
+    with count_queries() as counts:
+        response = client_with_team.post(f"{ENDPOINT}/1/workshops", json=payload)
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert counts["teams"] == 1
+    assert counts["children"] == 1
+
+
+@pytest.fixture
+def client_with_workshop(client_with_team):
+    payload = {
+        "date": "2021-01-01",
+        "workshop_number": 1,
+        "attendance": [
+            {"attendance": "present", "child_id": 1},
+            {"attendance": "absent", "child_id": 2},
+        ],
+    }
+    response = client_with_team.post(f"{ENDPOINT}/1/workshops", json=payload)
+    response.raise_for_status()
+    yield client_with_team
+
+
+def test_delete_team_cascades_in_database(client_with_workshop, session, count_queries):
+    # assert that children, workshops and attendances are deleted by the
+    # database, without loading them first
+    with count_queries() as counts:
+        response = client_with_workshop.delete(
+            f"{ENDPOINT}/1", params={"cascade": True}
+        )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    # only the EXISTS check on children
+    assert counts["children"] == 1
+    assert counts["workshops"] == 0
+    assert counts["attendances"] == 0
+
+    assert not session.query(schema.Child).filter_by(team_id=1).all()
+    assert not session.query(schema.Workshop).filter_by(team_id=1).all()
+    assert len(session.query(schema.Attendance).all()) == 0
+    # the other team is untouched
+    assert len(session.query(schema.Child).filter_by(team_id=2).all()) == 2
+
+
+def test_delete_child_with_attendance(client_with_workshop, session):
+    # assert that a child with attendance is only deleted when cascading,
+    # in a fixed number of statements regardless of the number of attendance records
+    response = client_with_workshop.delete("/children/1")
+    assert response.status_code == status.HTTP_409_CONFLICT, response.text
+
+    statements = []
+    engine = session.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        response = client_with_workshop.delete("/children/1", params={"cascade": True})
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert [" ".join(statement.split()[:3]) for statement in statements] == [
+        "DELETE FROM attendances",
+        "INSERT INTO tombstones",
+        "DELETE FROM children",
+    ]
+    assert not session.query(schema.Attendance).filter_by(child_id=1).all()
+    assert session.query(schema.Attendance).filter_by(child_id=2).all()
+
+
+def test_get_team_dashboard(client_with_workshop):
+    # assert that the dashboard contains the attendance matrix of the team
+    response = client_with_workshop.get(f"{ENDPOINT}/1/dashboard")
+    assert response.status_code == status.HTTP_200_OK, response.text
+    data = response.json().get("data")
+    assert data["team"]["program"]["progress"]["current"] == 1
+    assert data["children"]["id"] == [1, 2]
+    assert data["children"]["first_name"] == ["Child 1", "Child 2"]
+    assert data["workshops"]["number"] == [1]
+    assert data["attendance"] == [["present"], ["absent"]]
+
+    # assert that a child added after the workshop has no attendance to it
+    client_with_workshop.post(
+        "/children", json={"first_name": "Child 0", "last_name": "", "team_id": 1}
+    ).raise_for_status()
+    data = client_with_workshop.get(f"{ENDPOINT}/1/dashboard").json().get("data")
+    assert data["children"]["first_name"] == ["Child 0", "Child 1", "Child 2"]
+    assert data["attendance"] == [[None], ["present"], ["absent"]]
+
+
+def test_get_team_dashboard_etag(client_with_workshop):
+    # assert that the dashboard is sent again after the attendance changes
+    etag = client_with_workshop.get(f"{ENDPOINT}/1/dashboard").headers["ETag"]
+    response = client_with_workshop.get(
+        f"{ENDPOINT}/1/dashboard", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = client_with_workshop.patch(
+        f"{ENDPOINT}/workshops/1",
+        json={
+            "date": "2021-01-01",
+            "attendance": [
+                {"attendance": "absent", "child_id": 1},
+                {"attendance": "absent", "child_id": 2},
+            ],
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    response = client_with_workshop.get(
+        f"{ENDPOINT}/1/dashboard", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"]["attendance"] == [["absent"], ["absent"]]
+
+
+def test_get_team_dashboard_not_found(client):
+    response = client.get(f"{ENDPOINT}/1/dashboard")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_team_dashboard_queries(client_with_workshop, count_queries):
+    # assert that the number of queries does not grow with the workshops
+    def count():
+        with count_queries() as counts:
+            response = client_with_workshop.get(f"{ENDPOINT}/1/dashboard")
+        assert response.status_code == status.HTTP_200_OK, response.text
+        return counts
+
+    before = count()
+    attendance = [
+        {"attendance": "present", "child_id": 1},
+        {"attendance": "present", "child_id": 2},
+    ]
+    for number in [2, 3, 4]:
+        client_with_workshop.post(
+            f"{ENDPOINT}/1/workshops",
+            json={
+                "date": "2021-01-01",
+                "workshop_number": number,
+                "attendance": attendance,
+            },
+        ).raise_for_status()
+    assert count() == before
+    assert before["teams"] == 1
+    assert before["workshops"] == 1
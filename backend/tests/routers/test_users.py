@@ -64,7 +64,7 @@ def test_add_user_success(client, mocker):
     auth0.tickets.create_pswd_change.return_value = {"ticket": ticket_link}
 
     mocker.patch("repositories.auth0.Auth0", return_value=auth0)
-    resend = mocker.patch("core.email.resend")
+    resend = mocker.patch("core.email._import_resend").return_value
     mocker.patch("core.email.os")
 
     # act
@@ -73,6 +73,7 @@ def test_add_user_success(client, mocker):
     # assert
     assert response.status_code == status.HTTP_201_CREATED
     assert resend.Emails.send.call_args.args[0]["to"][0] == EMAIL
+    assert ticket_link in resend.Emails.send.call_args.args[0]["html"]
 
 
 def test_add_user_duplicate(client, mocker):
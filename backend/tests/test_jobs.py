@@ -0,0 +1,162 @@
+import time
+from datetime import datetime, timedelta
+
+import jobs
+import pytest
+from core.database import schema
+from core.metrics import metrics
+from sqlmodel import select
+
+
+def _tombstone(resource_id: int, days_ago: int) -> schema.Tombstone:
+    return schema.Tombstone(
+        resource_type="team",
+        resource_id=resource_id,
+        resource_path=f"/1/1/{resource_id}",
+        deleted_at=datetime.now() - timedelta(days=days_ago),
+    )
+
+
+def test_purge_tombstones(session, settings):
+    # assert that only tombstones past the retention are deleted
+    retention = settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    session.add_all([_tombstone(1, retention + 1), _tombstone(2, retention - 1)])
+    session.commit()
+
+    assert jobs.purge_tombstones(session, settings) == "Deleted 1 tombstones"
+    remaining = session.exec(select(schema.Tombstone)).all()
+    assert [t.resource_id for t in remaining] == [2]
+
+
+def test_purge_idempotency_keys(session, settings):
+    # assert that only idempotency keys past the retention are deleted
+    retention = settings.IDEMPOTENCY_KEY_RETENTION_HOURS
+    session.add_all(
+        [
+            schema.IdempotencyKey(
+                user_id="auth0|a",
+                key=key,
+                request_hash="hash",
+                status_code=201,
+                response="{}",
+                created_at=datetime.now() - timedelta(hours=hours_ago),
+            )
+            for key, hours_ago in [("old", retention + 1), ("new", retention - 1)]
+        ]
+    )
+    session.commit()
+
+    assert (
+        jobs.purge_idempotency_keys(session, settings) == "Deleted 1 idempotency keys"
+    )
+    remaining = session.exec(select(schema.IdempotencyKey)).all()
+    assert [k.key for k in remaining] == ["new"]
+
+
+def test_purge_rate_limits(session, settings):
+    # assert that only the rate limit buckets that are full again are deleted
+    now = time.time()
+    session.add_all(
+        [
+            schema.RateLimit(key="full", full_at=now - 1),
+            schema.RateLimit(key="empty", full_at=now + 60),
+        ]
+    )
+    session.commit()
+
+    assert jobs.purge_rate_limits(session, settings) == "Deleted 1 rate limit buckets"
+    remaining = session.exec(select(schema.RateLimit)).all()
+    assert [r.key for r in remaining] == ["empty"]
+
+
+def test_purge_recent_writes(session, settings):
+    # assert that only the writes outside the read-your-writes window are deleted
+    now = time.time()
+    session.add_all(
+        [
+            schema.RecentWrite(user_id="old", written_at=now - 60),
+            schema.RecentWrite(user_id="new", written_at=now),
+        ]
+    )
+    session.commit()
+
+    assert jobs.purge_recent_writes(session, settings) == "Deleted 1 recent writes"
+    remaining = session.exec(select(schema.RecentWrite)).all()
+    assert [w.user_id for w in remaining] == ["new"]
+
+
+def _role(user_id: str) -> schema.Role:
+    return schema.Role(user_id=user_id, role="coach", level="team", resource_path="/1")
+
+
+def test_sync_auth0_users(session, settings, mocker):
+    # assert that the roles of users that are not in Auth0 anymore are deleted
+    settings = settings.model_copy(update={"FEATURE_AUTH0": True})
+    auth0 = mocker.patch("repositories.auth0.Auth0Repository").return_value
+    auth0.list_user_ids.return_value = {"auth0|a"}
+    session.add_all([_role("auth0|a"), _role("auth0|b"), _role("auth0|b")])
+    session.commit()
+
+    assert jobs.sync_auth0_users(session, settings) == "Deleted 2 roles of 1 users"
+    remaining = session.exec(select(schema.Role)).all()
+    assert [r.user_id for r in remaining] == ["auth0|a"]
+
+    # assert that no roles are deleted if Auth0 seems empty
+    auth0.list_user_ids.return_value = set()
+    assert jobs.sync_auth0_users(session, settings) == "Skipped, Auth0 has no users"
+
+
+def test_sync_auth0_users_invited_while_listing(session, settings, mocker):
+    # assert that the role of a user who is invited while the users are
+    # listed is kept, although the user is missing from the list
+    settings = settings.model_copy(update={"FEATURE_AUTH0": True})
+    auth0 = mocker.patch("repositories.auth0.Auth0Repository").return_value
+    session.add_all([_role("auth0|a"), _role("auth0|b")])
+    session.commit()
+
+    def list_user_ids():
+        session.add(_role("auth0|invited"))
+        session.commit()
+        return {"auth0|a"}
+
+    auth0.list_user_ids.side_effect = list_user_ids
+    assert jobs.sync_auth0_users(session, settings) == "Deleted 1 roles of 1 users"
+    remaining = session.exec(select(schema.Role)).all()
+    assert sorted(r.user_id for r in remaining) == ["auth0|a", "auth0|invited"]
+
+
+def test_refresh_stats(session, settings):
+    # assert that the stats views are only refreshed when they are materialized
+    assert (
+        jobs.refresh_stats(session, settings)
+        == "Skipped, the stats views are not materialized"
+    )
+
+
+def test_run_job(session, settings, mocker):
+    # assert that running a job commits its session and records its metrics
+    mocker.patch("core.scheduler.get_engine", return_value=session.get_bind())
+    runs = metrics.value("scheduler_job_runs_total", job="fails", status="failure")
+
+    @jobs.scheduler.job(interval=60, description="Fails")
+    def fails(session, settings):
+        raise ValueError("failed")
+
+    try:
+        with pytest.raises(ValueError):
+            jobs.scheduler.run_job("fails", settings)
+    finally:
+        del jobs.scheduler.jobs["fails"]
+    assert (
+        metrics.value("scheduler_job_runs_total", job="fails", status="failure")
+        == runs + 1
+    )
+    assert jobs.scheduler.run_job("purge_tombstones", settings).startswith("Deleted")
+
+
+def test_cli_list(capsys):
+    # assert that the CLI lists the jobs
+    jobs.main(["list"])
+    output = capsys.readouterr().out
+    assert "purge_tombstones" in output
+    assert "sync_auth0_users" in output
@@ -0,0 +1,23 @@
+from server import Server, get_server_options
+
+
+def test_server_options(settings):
+    # assert that the server is configured from the settings
+    settings = settings.model_copy(
+        update={"PORT": 8080, "SERVER_WORKERS": 3, "SERVER_MAX_REQUESTS": 100}
+    )
+    server = Server("main:app", get_server_options(settings))
+    assert server.cfg.bind == ["0.0.0.0:8080"]
+    assert server.cfg.workers == 3
+    assert server.cfg.max_requests == 100
+    assert server.cfg.keepalive == settings.SERVER_KEEP_ALIVE
+    assert server.cfg.worker_class_str == "uvicorn.workers.UvicornWorker"
+    # assert that workers do not share what the app opens on import
+    assert not server.cfg.preload_app
+
+
+def test_server_workers_per_core(settings, mocker):
+    # assert that there is a worker per CPU core by default
+    mocker.patch("core.settings.os.cpu_count", return_value=4)
+    settings = settings.model_copy(update={"SERVER_WORKERS": 0})
+    assert get_server_options(settings)["workers"] == 4